@@ -3,9 +3,9 @@ from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 from unfold.admin import TabularInline, ModelAdmin
 from core.admin.base import BaseModelAdmin, LinkedAdminMixin
-from core.utils.text import question_text_preview
 from apps.catalog.models import QuestionFormat, FormatVariant, Question, Option, MatchPair
 from apps.catalog.forms.question import QuestionAdminForm, OptionAdminForm, MatchPairAdminForm
+from apps.catalog.services import refresh_question_signature
 
 
 # Question format admin
@@ -58,8 +58,12 @@ class QuestionAdmin(LinkedAdminMixin, BaseModelAdmin):
         }),
     )
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        refresh_question_signature(form.instance)
+
     def text_preview(self, obj):
-        return mark_safe(question_text_preview(obj.text))
+        return mark_safe(obj.text_preview)
 
     def admin_link(self, obj, *args, **kwargs):
         return self.parent_link(obj, 'topic')
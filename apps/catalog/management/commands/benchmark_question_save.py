@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.catalog.models import Question, QuestionFormat, Topic
+from apps.catalog.services import create_question, create_questions
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares saving imported questions one by one (create_question) with the bulk create_questions: '
+        'database round trips and time. Everything is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=150, help='Number of questions to save.')
+        parser.add_argument('--options', type=int, default=4, help='Answer options per question.')
+        parser.add_argument('--topic', type=int, default=None, help='Topic id (default: the first topic).')
+
+    def handle(self, *args, count, options, topic, **kwargs):
+        topic = Topic.objects.filter(pk=topic).first() if topic else Topic.objects.first()
+        question_format = QuestionFormat.objects.filter(code='test').first()
+        if topic is None or question_format is None:
+            raise CommandError('A topic and the "test" question format are required.')
+
+        author = Question._meta.get_field('author').related_model.objects.first()
+        variant = question_format.variants.filter(code='single').first()
+        questions = [
+            {
+                'text': f'<p>Benchmark question {index}</p>',
+                'variant': variant,
+                'level': Question.Level.MEDIUM,
+                'time_limit': 30,
+                'options': [
+                    {'answer': f'<p>Option {option}</p>', 'is_correct': option == 0}
+                    for option in range(options)
+                ],
+            }
+            for index in range(count)
+        ]
+
+        def one_by_one():
+            for item in questions:
+                create_question(topic=topic, author=author, format=question_format, **item)
+
+        def bulk():
+            create_questions(topic=topic, author=author, format=question_format, questions=questions)
+
+        for name, run in (('create_question x N', one_by_one), ('create_questions', bulk)):
+            queries, elapsed = self._measure(run)
+            self.stdout.write(f'{name:<22} {queries:>6} queries {elapsed * 1000:>9.1f} ms')
+
+    def _measure(self, run):
+        try:
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    run()
+                    elapsed = time.perf_counter() - started
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        return len(context.captured_queries), elapsed
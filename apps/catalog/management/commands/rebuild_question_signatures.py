@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.catalog.models import Question
+from apps.catalog.services import rebuild_question_signatures
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes the stored derived fields of questions: MinHash/LSH near-duplicate signatures, '
+        'full-text search text, plain text and list preview (all, or only the missing ones).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing', action='store_true', help='Only questions without a signature, search text or plain text.')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Questions per bulk update.')
+
+    def handle(self, *args, missing, chunk_size, **kwargs):
+        questions = Question.objects.order_by('pk')
+        if missing:
+            questions = questions.filter(Q(minhash=[]) | Q(search_text='') | Q(text_plain=''))
+
+        started = time.perf_counter()
+        updated = rebuild_question_signatures(questions, chunk_size=chunk_size)
+        self.stdout.write(f'{updated} questions updated in {time.perf_counter() - started:.1f} s')
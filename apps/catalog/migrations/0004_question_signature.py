@@ -0,0 +1,30 @@
+# Generated by Django 6.0.5 on 2026-10-18 12:40
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_remove_teacher_subject'),
+        ('catalog', '0003_seed_matching_question_format'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='lsh_buckets',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, size=None, verbose_name='LSH buckets'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='minhash',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, size=None, verbose_name='MinHash signature'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['lsh_buckets'], name='question_lsh_buckets_gin'),
+        ),
+    ]
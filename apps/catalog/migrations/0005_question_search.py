@@ -0,0 +1,64 @@
+# Generated by Django 6.0.5 on 2026-10-18 14:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from core.utils.minhash import html_signature
+from core.utils.text import normalize_html_text
+
+BACKFILL_CHUNK_SIZE = 500
+
+
+def fill_question_search(apps, schema_editor):
+    # Бұрыннан бар сұрақтардың іздеу мәтіні (және 0004-тен бері бос қалған сигнатуралары).
+    Question = apps.get_model('catalog', 'Question')
+    chunk = []
+
+    for question in Question.objects.prefetch_related('options', 'match_pairs').iterator(chunk_size=BACKFILL_CHUNK_SIZE):
+        parts = [question.text]
+        parts.extend(option.answer for option in question.options.all())
+        for pair in question.match_pairs.all():
+            parts.extend((pair.left, pair.right))
+
+        question.search_text = ' '.join(filter(None, (normalize_html_text(part) for part in parts)))
+        question.minhash, question.lsh_buckets = html_signature(*parts)
+        chunk.append(question)
+        if len(chunk) >= BACKFILL_CHUNK_SIZE:
+            Question.objects.bulk_update(chunk, ['search_text', 'minhash', 'lsh_buckets'])
+            chunk = []
+
+    if chunk:
+        Question.objects.bulk_update(chunk, ['search_text', 'minhash', 'lsh_buckets'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_question_signature'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='question',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Search text'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('search_text', config='simple'), output_field=django.contrib.postgres.search.SearchVectorField(), verbose_name='Search vector'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='question_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='question_search_text_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        # Схема өзгерістерінен кейін: деректі жаңартқан транзакцияда кестені ALTER ету қиындық туғызуы мүмкін.
+        migrations.RunPython(fill_question_search, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.0.5 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+from core.utils.text import html_to_plain_text, question_text_preview
+
+BACKFILL_CHUNK_SIZE = 500
+
+
+def fill_question_text(apps, schema_editor):
+    Question = apps.get_model('catalog', 'Question')
+    chunk = []
+
+    for question in Question.objects.only('pk', 'text').iterator(chunk_size=BACKFILL_CHUNK_SIZE):
+        question.text_plain = html_to_plain_text(question.text)
+        question.text_preview = question_text_preview(question.text)
+        chunk.append(question)
+        if len(chunk) >= BACKFILL_CHUNK_SIZE:
+            Question.objects.bulk_update(chunk, ['text_plain', 'text_preview'])
+            chunk = []
+
+    if chunk:
+        Question.objects.bulk_update(chunk, ['text_plain', 'text_preview'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_question_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='text_plain',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Plain text'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='text_preview',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Text preview'),
+        ),
+        migrations.RunPython(fill_question_text, migrations.RunPython.noop),
+    ]
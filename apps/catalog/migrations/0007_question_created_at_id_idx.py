@@ -0,0 +1,18 @@
+# Generated by Django 6.0.5 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_remove_teacher_subject'),
+        ('catalog', '0006_question_text_preview'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['-created_at', 'id'], name='question_created_at_id_idx'),
+        ),
+    ]
@@ -1,3 +1,6 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from core.models import BaseModel
@@ -54,6 +57,9 @@ class Question(BaseModel):
         related_name='questions', verbose_name=_('Author')
     )
     text = models.TextField(_('Text'))
+    # Тізімдер мен админ әр жолда HTML талдамауы үшін сақталған мәтін мен қысқа алдын ала көрініс.
+    text_plain = models.TextField(_('Plain text'), default='', blank=True, editable=False)
+    text_preview = models.TextField(_('Text preview'), default='', blank=True, editable=False)
     format = models.ForeignKey(
         QuestionFormat, on_delete=models.PROTECT,
         related_name='questions', verbose_name=_('Format')
@@ -64,10 +70,26 @@ class Question(BaseModel):
     )
     level = models.CharField(_('Level'), choices=Level.choices, max_length=16, default=Level.EASY)
     time_limit = models.PositiveSmallIntegerField(_('Time limit (sec)'), default=30)
+    # Мәтін + нұсқалар/жұптар бойынша MinHash және оның LSH себеттері — ұқсас сұрақтарды іздеу үшін.
+    minhash = ArrayField(models.IntegerField(), verbose_name=_('MinHash signature'), default=list, blank=True)
+    lsh_buckets = ArrayField(models.BigIntegerField(), verbose_name=_('LSH buckets'), default=list, blank=True)
+    # Мәтін + нұсқалар/жұптар, тегтерсіз — толық мәтінді (tsvector) және pg_trgm іздеуі үшін.
+    search_text = models.TextField(_('Search text'), default='', blank=True, editable=False)
+    search_vector = models.GeneratedField(
+        expression=SearchVector('search_text', config='simple'),
+        output_field=SearchVectorField(), db_persist=True, verbose_name=_('Search vector'),
+    )
 
     class Meta:
         verbose_name = _('Question')
         verbose_name_plural = _('Questions')
+        indexes = [
+            # Тізім реті және оның keyset беттері (`get_questions`).
+            models.Index(fields=['-created_at', 'id'], name='question_created_at_id_idx'),
+            GinIndex(fields=['lsh_buckets'], name='question_lsh_buckets_gin'),
+            GinIndex(fields=['search_vector'], name='question_search_vector_gin'),
+            GinIndex(fields=['search_text'], name='question_search_text_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return _('#{} question').format(self.pk)
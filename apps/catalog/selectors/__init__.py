@@ -5,19 +5,25 @@ from .subject import (
     get_topics, get_topic,
 )
 from .question import (
-    get_questions_for_topic, get_questions, get_question_authors, get_question_stats, get_question,
+    get_questions_for_topic, get_questions, get_question,
     get_question_formats, get_question_format, get_question_format_by_code,
     get_format_variants, get_format_variants_by_format_code, get_all_format_variants,
-    count_topic_questions_by_level, get_topic_question_formats,
+    count_topic_questions_by_level, get_topic_question_formats, iter_question_html,
 )
+from .question_similarity import question_signature, find_similar_questions, find_similar_questions_bulk
+from .question_search import question_search_text, search_questions
+from .question_facets import QuestionFacets, get_question_facets
 
 __all__ = [
     'get_cities', 'get_schools_by_city', 'get_active_grades',
     'get_subject', 'get_subject_tree', 'get_subject_grades', 'get_active_subjects',
     'get_chapters', 'get_chapter', 'get_chapter_topics', 'count_subject_topics',
     'get_topics', 'get_topic',
-    'get_questions_for_topic', 'get_questions', 'get_question_authors', 'get_question_stats', 'get_question',
+    'get_questions_for_topic', 'get_questions', 'get_question',
     'get_question_formats', 'get_question_format', 'get_question_format_by_code',
     'get_format_variants', 'get_format_variants_by_format_code', 'get_all_format_variants',
-    'count_topic_questions_by_level', 'get_topic_question_formats',
+    'count_topic_questions_by_level', 'get_topic_question_formats', 'iter_question_html',
+    'question_signature', 'find_similar_questions', 'find_similar_questions_bulk',
+    'question_search_text', 'search_questions',
+    'QuestionFacets', 'get_question_facets',
 ]
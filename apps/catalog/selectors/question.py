@@ -1,6 +1,7 @@
-from django.db.models import Count
+from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404
-from apps.catalog.models import FormatVariant, Question, QuestionFormat
+from apps.catalog.models import FormatVariant, MatchPair, Option, Question, QuestionFormat
+from apps.catalog.selectors.question_search import search_questions
 
 
 def get_questions_for_topic(topic_id, level=None):
@@ -28,34 +29,13 @@ def get_questions(*, subject=None, author=None, grade_id=None, chapter_id=None,
         questions = questions.filter(format_id=format_id)
     if variant_id:
         questions = questions.filter(variant_id=variant_id)
-    if search:
-        questions = questions.filter(text__icontains=search)
-
-    return questions.select_related(
+    questions = questions.select_related(
         'topic', 'topic__chapter', 'format', 'variant', 'author', 'author__user',
-    ).order_by('-created_at')
-
-
-def get_question_authors(subject):
-    return Question.objects.filter(
-        topic__chapter__subject=subject, is_active=True, author__isnull=False,
-    ).values_list('author_id', flat=True).distinct()
-
-
-def get_question_stats(questions):
-    unordered = questions.order_by()
-
-    counts_by_level = dict(unordered.values_list('level').annotate(count=Count('id')))
-    level_breakdown = [(label, counts_by_level.get(value, 0)) for value, label in Question.Level.choices]
-
-    counts_by_format = dict(unordered.values_list('format_id').annotate(count=Count('id')))
-    format_breakdown = [(fmt.name, counts_by_format.get(fmt.id, 0)) for fmt in get_question_formats()]
+    )
+    if search:
+        return search_questions(questions, search)
 
-    return {
-        'total': questions.count(),
-        'level_breakdown': level_breakdown,
-        'format_breakdown': format_breakdown,
-    }
+    return questions.order_by('-created_at', 'id')
 
 
 def get_question(pk):
@@ -102,3 +82,14 @@ def get_topic_question_formats(topic):
         Question.objects.filter(topic=topic, is_active=True)
         .values_list('format__name', flat=True).distinct()
     )
+
+
+def iter_question_html(contains):
+    """Сұрақ, нұсқа және сәйкестендіру жұптарының `contains` бар HTML мәтіндері (белсенді емес сұрақтар да)."""
+    yield from Question.objects.filter(text__contains=contains).values_list('text', flat=True).iterator()
+    yield from Option.objects.filter(answer__contains=contains).values_list('answer', flat=True).iterator()
+    for left, right in MatchPair.objects.filter(
+        Q(left__contains=contains) | Q(right__contains=contains),
+    ).values_list('left', 'right').iterator():
+        yield left
+        yield right
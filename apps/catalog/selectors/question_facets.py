@@ -0,0 +1,65 @@
+from dataclasses import dataclass, field
+
+from django.db.models import Count
+from apps.catalog.models import Question
+
+FACET_COLUMNS = {
+    'grade': 'topic__chapter__grade_id',
+    'chapter': 'topic__chapter_id',
+    'topic': 'topic_id',
+    'format': 'format_id',
+    'variant': 'variant_id',
+    'author': 'author_id',
+    'level': 'level',
+}
+# Әр facet-тің санағы өзін және өзіне тәуелді сүзгілерді елемейді: таңдалған форматтың тізімінде басқа
+# форматтар да қалады, ал сынып ауысса тараулар мен тақырыптар қайта саналады.
+IGNORED_FILTERS = {
+    'grade': {'grade', 'chapter', 'topic'},
+    'chapter': {'chapter', 'topic'},
+    'topic': {'topic'},
+    'format': {'format', 'variant'},
+    'variant': {'variant'},
+    'author': {'author'},
+    'level': set(),
+}
+
+
+@dataclass
+class QuestionFacets:
+    total: int = 0
+    counts: dict = field(default_factory=lambda: {name: {} for name in FACET_COLUMNS})
+
+    @property
+    def level_breakdown(self):
+        return [(label, self.counts['level'].get(value, 0)) for value, label in Question.Level.choices]
+
+    def format_breakdown(self, formats):
+        return [(fmt.name, self.counts['format'].get(fmt.pk, 0)) for fmt in formats]
+
+
+def _matches(row, filters, ignored):
+    return all(row[FACET_COLUMNS[name]] == value for name, value in filters.items() if name not in ignored)
+
+
+def get_question_facets(questions, **filters):
+    """`questions` (сүзгісіз базалық жиын: пән, іздеу) үшін жалпы сан мен әр facet мәнінің санағы.
+
+    Бір GROUP BY сұрауы facet бағандарының әр тіркесімін санайды; `filters` (`grade`, `chapter`, `topic`,
+    `format`, `variant`, `author` → ID) сол жолдар бойынша Python-да қолданылады. `total` пен `level`
+    барлық сүзгіні, қалған facet-тер `IGNORED_FILTERS`-тен басқасын ескереді.
+    """
+    filters = {name: value for name, value in filters.items() if value}
+    rows = list(questions.order_by().values(*FACET_COLUMNS.values()).annotate(count=Count('id')))
+
+    facets = QuestionFacets()
+    for row in rows:
+        if _matches(row, filters, ()):
+            facets.total += row['count']
+
+        for name, column in FACET_COLUMNS.items():
+            value = row[column]
+            if value is not None and _matches(row, filters, IGNORED_FILTERS[name]):
+                facets.counts[name][value] = facets.counts[name].get(value, 0) + row['count']
+
+    return facets
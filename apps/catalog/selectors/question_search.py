@@ -0,0 +1,29 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, Q
+from apps.catalog.selectors.question_similarity import question_html_parts
+from core.utils.text import normalize_html_text
+
+SEARCH_CONFIG = 'simple'
+
+
+def question_search_text(text, options=None, match_pairs=None):
+    """`Question.search_text` мәні: мәтін, нұсқалар және жұптар тегтерсіз, кіші әріппен, бір жолда."""
+    return ' '.join(filter(None, (normalize_html_text(part) for part in question_html_parts(text, options, match_pairs))))
+
+
+def search_questions(questions, search):
+    """`questions`-ты іздеу сөзіне сәйкес келетіндерімен шектеп, сәйкестігі кемуі бойынша реттейді.
+
+    Сөздер `search_vector` (GIN) бойынша, ал сөз бөлігі мен қате терілген сөз `search_text`-тің pg_trgm
+    индексі бойынша табылады. Тілдер аралас болғандықтан, stemming-сіз 'simple' конфигурациясы қолданылады.
+    """
+    term = normalize_html_text(search)
+    if not term:
+        return questions
+
+    query = SearchQuery(term, config=SEARCH_CONFIG)
+    return questions.filter(
+        Q(search_vector=query) | Q(search_text__contains=term) | Q(search_text__trigram_word_similar=term),
+    ).annotate(
+        search_rank=SearchRank(F('search_vector'), query) + TrigramWordSimilarity(term, 'search_text'),
+    ).order_by('-search_rank', '-created_at', 'id')
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import BigIntegerField, F, Func, IntegerField, Value
+from apps.catalog.models import Question
+from core.utils.minhash import html_signature, signature_similarity
+
+# Әр сигнатураға ең көбі осынша кандидат (ортақ себеті көбі бірінші); бір сұрауда осынша сигнатура.
+SIMILAR_CANDIDATES_LIMIT = 500
+SIMILAR_SIGNATURES_PER_QUERY = 100
+
+
+class _SharedBuckets(Func):
+    # Кандидаттың сигнатурамен ортақ LSH себеттерінің саны: шын көшірме көп себетте кездеседі.
+    template = 'cardinality(ARRAY(SELECT unnest(%(expressions)s)))'
+    arg_joiner = ') INTERSECT SELECT unnest('
+    output_field = IntegerField()
+
+
+def question_html_parts(text, options=None, match_pairs=None):
+    """Сұрақтың барлық HTML бөліктері: мәтін, нұсқалар, жұптардың екі жағы."""
+    parts = [text]
+    parts.extend(option['answer'] for option in options or [])
+    for pair in match_pairs or []:
+        parts.extend((pair['left'], pair['right']))
+
+    return parts
+
+
+def question_signature(text, options=None, match_pairs=None):
+    """Сұрақ мәтіні мен нұсқалары/жұптары бойынша `(minhash, lsh_buckets)`."""
+    return html_signature(*question_html_parts(text, options, match_pairs))
+
+
+def _candidate_ids(subject, signatures, exclude_ids):
+    """`{сигнатура индексі: [кандидат ID-лері]}` — әр сигнатураның өз шегі бар, сондықтан үлкен импортта
+    немесе үлкен пәнде бір сұрақтың кандидаттары басқаларынікін ығыстырмайды."""
+    base = (
+        Question.objects
+        .filter(is_active=True, topic__chapter__subject=subject)
+        .exclude(pk__in=exclude_ids)
+    )
+    subqueries = []
+    for index, (_minhash, buckets) in enumerate(signatures):
+        if not buckets:
+            continue
+
+        buckets = list(buckets)
+        bucket_array = Value(buckets, output_field=ArrayField(BigIntegerField()))
+        subqueries.append(
+            base.filter(lsh_buckets__overlap=buckets)
+            .annotate(signature=Value(index, output_field=IntegerField()))
+            .order_by(_SharedBuckets(F('lsh_buckets'), bucket_array).desc(), 'pk')
+            .values_list('pk', 'signature')[:SIMILAR_CANDIDATES_LIMIT]
+        )
+
+    candidate_ids = {}
+    for start in range(0, len(subqueries), SIMILAR_SIGNATURES_PER_QUERY):
+        first, *rest = subqueries[start:start + SIMILAR_SIGNATURES_PER_QUERY]
+        for pk, index in first.union(*rest, all=True):
+            candidate_ids.setdefault(index, []).append(pk)
+
+    return candidate_ids
+
+
+def find_similar_questions_bulk(*, subject, signatures, exclude_ids=(), threshold=None):
+    """Әр `(minhash, lsh_buckets)` үшін пәндегі ұқсас белсенді сұрақтардың `(question, similarity)` тізімі,
+    ұқсастығы кемуі бойынша.
+
+    Әр сигнатураның кандидаттары (GIN-индекстелген `&&`, ортақ себеттер саны бойынша `SIMILAR_CANDIDATES_LIMIT`)
+    `UNION ALL`-мен бір сұрауға жиналады, содан соң MinHash ұқсастығымен сүзіледі.
+    """
+    threshold = threshold if threshold is not None else settings.QUESTION_DUPLICATE_THRESHOLD
+    candidate_ids = _candidate_ids(subject, signatures, exclude_ids)
+    if not candidate_ids:
+        return [[] for _signature in signatures]
+
+    candidates = Question.objects.only('pk', 'text', 'topic_id', 'minhash', 'lsh_buckets').in_bulk(
+        {pk for ids in candidate_ids.values() for pk in ids},
+    )
+
+    results = []
+    for index, (minhash, _buckets) in enumerate(signatures):
+        matches = []
+        for pk in candidate_ids.get(index, []):
+            similarity = signature_similarity(minhash, candidates[pk].minhash)
+            if similarity >= threshold:
+                matches.append((candidates[pk], similarity))
+
+        results.append(sorted(matches, key=lambda match: -match[1]))
+
+    return results
+
+
+def find_similar_questions(*, subject, signature, exclude_ids=(), threshold=None):
+    return find_similar_questions_bulk(
+        subject=subject, signatures=[signature], exclude_ids=exclude_ids, threshold=threshold,
+    )[0]
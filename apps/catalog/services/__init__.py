@@ -1,11 +1,15 @@
 from .subject import update_subject, remove_subject_cover
 from .chapter import create_chapter, update_chapter, delete_chapter
 from .topic import create_topic, update_topic, delete_topic
-from .question import create_question, update_question, deactivate_question
+from .question import (
+    create_question, create_questions, update_question, deactivate_question,
+    refresh_question_signature, rebuild_question_signatures,
+)
 
 __all__ = [
     'update_subject', 'remove_subject_cover',
     'create_chapter', 'update_chapter', 'delete_chapter',
     'create_topic', 'update_topic', 'delete_topic',
-    'create_question', 'update_question', 'deactivate_question',
+    'create_question', 'create_questions', 'update_question', 'deactivate_question',
+    'refresh_question_signature', 'rebuild_question_signatures',
 ]
@@ -1,12 +1,29 @@
+from django.db import transaction
 from apps.catalog.models import MatchPair, Option, Question
+from apps.catalog.selectors.question_search import question_search_text
+from apps.catalog.selectors.question_similarity import find_similar_questions, question_signature
+from core.utils.text import html_to_plain_text, question_text_preview
+
+
+def _text_fields(text):
+    return {'text_plain': html_to_plain_text(text), 'text_preview': question_text_preview(text)}
 
 
 def create_question(*, topic, author, text, format, variant=None, level=Question.Level.EASY,
                      time_limit=30, options=None, match_pairs=None):
+    """Сұрақты сақтайды. `question.similar_questions` — пәндегі ұқсас (қайталанған болуы мүмкін) сұрақтардың
+    `(question, similarity)` тізімі, шақырушы мұғалімге ескерту көрсете алады."""
+    minhash, lsh_buckets = question_signature(text, options, match_pairs)
+    similar_questions = find_similar_questions(
+        subject=topic.chapter.subject_id, signature=(minhash, lsh_buckets),
+    )
+
     question = Question.objects.create(
         topic=topic, author=author, text=text, format=format, variant=variant,
-        level=level, time_limit=time_limit,
+        level=level, time_limit=time_limit, minhash=minhash, lsh_buckets=lsh_buckets,
+        search_text=question_search_text(text, options, match_pairs), **_text_fields(text),
     )
+    question.similar_questions = similar_questions
 
     if options:
         Option.objects.bulk_create([
@@ -23,10 +40,91 @@ def create_question(*, topic, author, text, format, variant=None, level=Question
     return question
 
 
+def create_questions(*, topic, author, format, questions):
+    """Көп сұрақты бір транзакцияда, үш INSERT-пен сақтайды (сұрақтар, нұсқалар, жұптар).
+
+    `questions` — `text`, `variant`, `level`, `time_limit`, `options`, `match_pairs` кілттері бар
+    dict-тер тізімі (`create_question` аргументтерімен бірдей). Аралас импортта сұрақтың өз `format`
+    кілті ортақ `format`-ты алмастырады. Бірі сәтсіз болса, ешқайсысы сақталмайды.
+    """
+    signatures = [question_signature(item['text'], item.get('options'), item.get('match_pairs')) for item in questions]
+
+    with transaction.atomic():
+        created = Question.objects.bulk_create([
+            Question(
+                topic=topic, author=author, text=item['text'], format=item.get('format', format), variant=item.get('variant'),
+                level=item.get('level', Question.Level.EASY), time_limit=item.get('time_limit', 30),
+                minhash=minhash, lsh_buckets=lsh_buckets,
+                search_text=question_search_text(item['text'], item.get('options'), item.get('match_pairs')),
+                **_text_fields(item['text']),
+            )
+            for item, (minhash, lsh_buckets) in zip(questions, signatures)
+        ])
+
+        Option.objects.bulk_create([
+            Option(question=question, answer=option['answer'], is_correct=option.get('is_correct', False))
+            for question, item in zip(created, questions)
+            for option in item.get('options') or []
+        ])
+
+        MatchPair.objects.bulk_create([
+            MatchPair(question=question, left=pair['left'], right=pair['right'], order=index)
+            for question, item in zip(created, questions)
+            for index, pair in enumerate(item.get('match_pairs') or [])
+        ])
+
+    return created
+
+
+DERIVED_FIELDS = ['minhash', 'lsh_buckets', 'search_text', 'text_plain', 'text_preview']
+
+
+def _refresh_derived_fields(question):
+    options = [{'answer': option.answer} for option in question.options.all()]
+    match_pairs = [{'left': pair.left, 'right': pair.right} for pair in question.match_pairs.all()]
+    question.minhash, question.lsh_buckets = question_signature(question.text, options, match_pairs)
+    question.search_text = question_search_text(question.text, options, match_pairs)
+    for name, value in _text_fields(question.text).items():
+        setattr(question, name, value)
+
+
+def refresh_question_signature(question):
+    """Мәтін, нұсқалар немесе жұптар өзгергеннен кейін (форма мен formset-тер сақталған соң) MinHash/LSH
+    сигнатурасын, іздеу мәтінін және мәтіннің сақталған түрлерін жаңартады."""
+    _refresh_derived_fields(question)
+    question.save(update_fields=DERIVED_FIELDS)
+    return question
+
+
+def rebuild_question_signatures(questions, chunk_size=500):
+    """Сигнатураларды, іздеу мәтінін және мәтіннің сақталған түрлерін топтап қайта есептейді (бар сұрақтарды
+    толтыру үшін); жаңартылған сұрақ санын қайтарады."""
+    updated = 0
+    chunk = []
+    for question in questions.prefetch_related('options', 'match_pairs').iterator(chunk_size=chunk_size):
+        _refresh_derived_fields(question)
+        chunk.append(question)
+        if len(chunk) >= chunk_size:
+            updated += Question.objects.bulk_update(chunk, DERIVED_FIELDS)
+            chunk = []
+
+    if chunk:
+        updated += Question.objects.bulk_update(chunk, DERIVED_FIELDS)
+
+    return updated
+
+
 def update_question(question, **fields):
+    """Мәтін өзгерсе, сигнатура, іздеу мәтіні және алдын ала көрініс сол `save`-пен бірге жаңартылады."""
     for name, value in fields.items():
         setattr(question, name, value)
-    question.save(update_fields=list(fields.keys()))
+
+    update_fields = list(fields.keys())
+    if 'text' in fields:
+        _refresh_derived_fields(question)
+        update_fields.extend(name for name in DERIVED_FIELDS if name not in update_fields)
+
+    question.save(update_fields=update_fields)
     return question
 
 
@@ -0,0 +1,47 @@
+from django.test import TestCase
+
+from apps.catalog.models import Chapter, Question, QuestionFormat, Subject, Topic
+from apps.catalog.selectors import find_similar_questions_bulk
+from apps.catalog.selectors.question_similarity import SIMILAR_CANDIDATES_LIMIT
+
+SIGNATURES = [
+    ([1] * 64, list(range(100, 116))),
+    ([3] * 64, list(range(200, 216))),
+]
+
+
+class FindSimilarQuestionsBulkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        subject = Subject.objects.create(name='Math')
+        cls.subject = subject
+        topic = Topic.objects.create(title='Topic', chapter=Chapter.objects.create(title='Chapter', subject=subject))
+        question_format, _created = QuestionFormat.objects.get_or_create(
+            code='test', defaults={'name': 'Test', 'order': 99},
+        )
+
+        def question(minhash, buckets):
+            return Question(topic=topic, format=question_format, text='<p>Q</p>', minhash=minhash, lsh_buckets=buckets)
+
+        # Әр сигнатураның бір себетіне түсетін, бірақ ұқсас емес кандидаттар шектен көп — көшірмелер соңында.
+        noise = [
+            question([2] * 64, [buckets[0], 10_000 * (index + 1) + number])
+            for index, (_minhash, buckets) in enumerate(SIGNATURES)
+            for number in range(SIMILAR_CANDIDATES_LIMIT + 100)
+        ]
+        Question.objects.bulk_create(noise)
+        cls.duplicates = Question.objects.bulk_create([question(minhash, buckets) for minhash, buckets in SIGNATURES])
+
+    def test_duplicates_beyond_the_limit_are_found_for_every_signature(self):
+        matches = find_similar_questions_bulk(subject=self.subject, signatures=SIGNATURES)
+
+        self.assertEqual(
+            [[(match.pk, similarity) for match, similarity in similar] for similar in matches],
+            [[(duplicate.pk, 1.0)] for duplicate in self.duplicates],
+        )
+
+    def test_signature_without_buckets_has_no_matches(self):
+        matches = find_similar_questions_bulk(subject=self.subject, signatures=[([], []), SIGNATURES[0]])
+
+        self.assertEqual(matches[0], [])
+        self.assertEqual([match.pk for match, _similarity in matches[1]], [self.duplicates[0].pk])
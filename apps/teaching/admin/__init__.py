@@ -0,0 +1 @@
+from . import question_import  # noqa: F401
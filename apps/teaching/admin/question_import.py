@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+from django.contrib import admin
+from django.urls import path
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from django.views.generic import TemplateView
+from unfold.views import UnfoldModelAdminViewMixin
+from core.admin.base import BaseModelAdmin
+from apps.teaching.models import ImportBatch
+from apps.teaching.selectors.import_batch import METRIC_PERCENTILES, import_metrics_summary
+
+
+METRIC_LABELS = {
+    'total': _('Total time, s'),
+    'first_token': _('Time to first token, s'),
+    'conversion': _('Conversion, s'),
+    'llm': _('AI extraction, s'),
+    'storage': _('Image storage, s'),
+    'input_tokens': _('Input tokens'),
+    'output_tokens': _('Output tokens (incl. thinking)'),
+    'cache_creation_input_tokens': _('Cache write tokens'),
+    'cache_read_input_tokens': _('Cached input tokens'),
+    'pages': _('Pages'),
+    'images': _('Images'),
+    'questions': _('Questions'),
+    'retries': _('AI retries'),
+}
+
+
+# Import batch admin
+# ----------------------------------------------------------------------------------------------------------------------
+# -------------- ImportMetricsView --------------
+class ImportMetricsView(UnfoldModelAdminViewMixin, TemplateView):
+    title = _('Import metrics')
+    permission_required = ('teaching.view_importbatch',)
+    template_name = 'admin/teaching/importbatch/metrics.html'
+    periods = (1, 7, 30, 90)
+
+    def get_context_data(self, **kwargs):
+        days = self.request.GET.get('days', '30')
+        days = int(days) if days.isdigit() and int(days) in self.periods else 30
+
+        groups = import_metrics_summary(since=timezone.now() - timedelta(days=days))
+        for group in groups:
+            for row in group['rows']:
+                row['label'] = METRIC_LABELS[row['name']]
+
+        return super().get_context_data(
+            **kwargs,
+            days=days,
+            periods=self.periods,
+            percentiles=[f'p{percent}' for percent in METRIC_PERCENTILES],
+            groups=groups,
+        )
+
+
+# -------------- ImportBatchAdmin --------------
+@admin.register(ImportBatch)
+class ImportBatchAdmin(BaseModelAdmin):
+    list_display = ('import_id', 'author', 'format', 'status', 'method', 'ai_model', 'duration', 'questions', 'created_at')
+    list_filter = ('status', 'format')
+    search_fields = ('import_id', 'group_id', 'file_name', 'author__user__username', 'author__user__email')
+    list_select_related = ('author__user', 'format')
+    readonly_fields = (
+        'import_id', 'group_id', 'file_name', 'author', 'subject', 'topic', 'format', 'source', 'status', 'stage',
+        'attempts', 'error', 'image_paths', 'metrics', 'started_at', 'finished_at',
+    )
+    exclude = ('payload',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                'metrics/',
+                self.admin_site.admin_view(ImportMetricsView.as_view(model_admin=self)),
+                name='teaching_importbatch_metrics',
+            ),
+            *super().get_urls(),
+        ]
+
+    @admin.display(description=_('Method'))
+    def method(self, obj):
+        return obj.metrics.get('method', '-')
+
+    @admin.display(description=_('Model'))
+    def ai_model(self, obj):
+        return obj.metrics.get('model') or '-'
+
+    @admin.display(description=_('Duration (s)'))
+    def duration(self, obj):
+        total = obj.metrics.get('timings', {}).get('total')
+        return f'{total:.1f}' if total is not None else '-'
+
+    @admin.display(description=_('Questions'))
+    def questions(self, obj):
+        return obj.metrics.get('questions', '-')
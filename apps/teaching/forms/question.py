@@ -5,7 +5,7 @@ from core.forms.base import INPUT_CLASS, RichTextTextarea
 from apps.accounts.selectors import get_teachers_by_ids
 from apps.catalog.models import Chapter, FormatVariant, Grade, MatchPair, Option, Question, QuestionFormat, Topic
 from apps.catalog.selectors import (
-    get_chapters, get_format_variants, get_question_authors, get_question_formats, get_subject_grades, get_topics,
+    get_chapters, get_format_variants, get_question_formats, get_subject_grades, get_topics,
 )
 
 
@@ -24,13 +24,39 @@ class QuestionFilterForm(forms.Form):
         grade_id = self.data.get('grade')
         chapter_id = self.data.get('chapter')
         format_id = self.data.get('format')
+        author_id = self.data.get('author')
 
         self.fields['grade'].queryset = get_subject_grades(subject)
         self.fields['chapter'].queryset = get_chapters(subject, grade_id=grade_id)
         self.fields['topic'].queryset = get_topics(subject, chapter_id=chapter_id, grade_id=grade_id)
         self.fields['format'].queryset = get_question_formats()
         self.fields['variant'].queryset = get_format_variants(format_id)
-        self.fields['author'].queryset = get_teachers_by_ids(get_question_authors(subject))
+        # Тексеру үшін таңдалған автор жеткілікті; тізімдегі авторларды `set_facet_choices` береді.
+        self.fields['author'].queryset = get_teachers_by_ids([author_id] if author_id and author_id.isdigit() else [])
+
+    def set_facet_choices(self, facets, *, formats):
+        """Тізімдердің нұсқаларын бір рет оқып, `facets` санағымен бекітеді (әйтпесе әр тізім шаблонда
+        екі рет сұрау жасайды). Авторлар — тек осы жиында сұрағы барлары, таңдалғаны сақталады."""
+        author_ids = set(facets.counts['author'])
+        selected_author = getattr(self, 'cleaned_data', {}).get('author')
+        if selected_author:
+            author_ids.add(selected_author.pk)
+
+        options = {
+            'grade': self.fields['grade'].queryset,
+            'chapter': self.fields['chapter'].queryset,
+            'topic': self.fields['topic'].queryset,
+            'format': formats,
+            'variant': self.fields['variant'].queryset,
+            'author': get_teachers_by_ids(author_ids),
+        }
+
+        for name, objects in options.items():
+            form_field = self.fields[name]
+            counts = facets.counts[name]
+            form_field.choices = [('', form_field.empty_label)] + [
+                (obj.pk, f'{form_field.label_from_instance(obj)} ({counts.get(obj.pk, 0)})') for obj in objects
+            ]
 
 
 class QuestionForm(forms.ModelForm):
@@ -1,7 +1,13 @@
+import io
+import zipfile
+from pathlib import PurePosixPath
+
 from django import forms
 from django.conf import settings
+from django.core.files.base import ContentFile
 from django.utils.translation import gettext_lazy as _
-from core.forms.base import INPUT_CLASS, RichTextTextarea
+from core.forms.base import INPUT_CLASS, MultipleFileField, RichTextTextarea
+from core.utils.pdf import is_pdf
 from apps.catalog.models import Chapter, FormatVariant, Grade, Question, QuestionFormat, Topic
 from apps.catalog.selectors import (
     get_chapters, get_format_variants_by_format_code, get_question_formats, get_subject_grades, get_topics,
@@ -10,14 +16,81 @@ from apps.catalog.selectors import (
 DOCX_CONTENT_TYPES = (
     'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
 )
+PDF_CONTENT_TYPES = ('application/pdf', 'application/x-pdf')
+# UTF-8 белгісі жоқ ZIP атаулары: Windows-тың орысша/қазақша жүйелері оларды cp866-мен жазады.
+ZIP_LEGACY_ENCODING = 'cp866'
+ZIP_UTF8_FLAG = 0x800
+
+
+def _zip_member_name(info):
+    name = info.filename
+    if not info.flag_bits & ZIP_UTF8_FLAG:
+        name = name.encode('cp437').decode(ZIP_LEGACY_ENCODING, errors='replace')
+
+    return PurePosixPath(name).name
+
+
+def _too_many_files_error():
+    return forms.ValidationError(
+        _('Too many files: upload at most %(count)s at once.') % {'count': settings.QUESTION_IMPORT_MAX_FILES}
+    )
+
+
+def _is_valid_document(name, data):
+    if name.lower().endswith('.pdf'):
+        return is_pdf(data)
+
+    return zipfile.is_zipfile(io.BytesIO(data))
+
+
+def _document_files_from_zip(upload):
+    if upload.size > settings.QUESTION_IMPORT_MAX_ARCHIVE_SIZE:
+        raise forms.ValidationError(_('The file is too large.'))
+
+    try:
+        archive = zipfile.ZipFile(upload)
+    except zipfile.BadZipFile:
+        raise forms.ValidationError(_('The ZIP archive could not be read.'))
+
+    files = []
+    with archive:
+        for info in archive.infolist():
+            name = _zip_member_name(info)
+            # Қалталар, macOS қызметтік файлдары және Word-тың уақытша `~$` файлдары өткізіледі.
+            if info.is_dir() or info.filename.startswith('__MACOSX/') or name.startswith(('~$', '.')):
+                continue
+
+            if not name.lower().endswith(('.docx', '.pdf')):
+                continue
+
+            if info.file_size > settings.QUESTION_IMPORT_MAX_FILE_SIZE:
+                raise forms.ValidationError(_('%(name)s is too large.') % {'name': name})
+
+            if len(files) >= settings.QUESTION_IMPORT_MAX_FILES:
+                raise _too_many_files_error()
+
+            with archive.open(info) as member:
+                data = member.read(settings.QUESTION_IMPORT_MAX_FILE_SIZE + 1)
+
+            if len(data) > settings.QUESTION_IMPORT_MAX_FILE_SIZE:
+                raise forms.ValidationError(_('%(name)s is too large.') % {'name': name})
+
+            if not _is_valid_document(name, data):
+                raise forms.ValidationError(_('%(name)s is not a valid .docx or PDF file.') % {'name': name})
+
+            files.append(ContentFile(data, name=name))
+
+    return files
 
 
 class QuestionImportUploadForm(forms.Form):
     grade = forms.ModelChoiceField(queryset=Grade.objects.none(), required=False, empty_label=_('Select grade'))
     chapter = forms.ModelChoiceField(queryset=Chapter.objects.none(), required=False, empty_label=_('Select chapter'))
     topic = forms.ModelChoiceField(queryset=Topic.objects.none(), empty_label=_('Select topic'))
-    format = forms.ModelChoiceField(queryset=QuestionFormat.objects.none(), empty_label=None)
-    file = forms.FileField(label=_('Word file (.docx)'))
+    format = forms.ModelChoiceField(
+        queryset=QuestionFormat.objects.none(), required=False, empty_label=_('All formats (mixed file)'),
+    )
+    file = MultipleFileField(label=_('Word (.docx) or PDF files, or a ZIP archive'))
 
     def __init__(self, *args, subject, **kwargs):
         super().__init__(*args, **kwargs)
@@ -31,18 +104,33 @@ class QuestionImportUploadForm(forms.Form):
         self.fields['format'].queryset = get_question_formats()
 
     def clean_file(self):
-        upload = self.cleaned_data['file']
+        """Жүктелген .docx/PDF файлдары мен ZIP ішіндегі .docx/PDF файлдарының ортақ тізімі."""
+        files = []
+        for upload in self.cleaned_data['file']:
+            name = upload.name.lower()
+            if name.endswith('.zip'):
+                files.extend(_document_files_from_zip(upload))
+                continue
+
+            if name.endswith('.pdf'):
+                if upload.content_type not in PDF_CONTENT_TYPES or not is_pdf(upload.read(1024)):
+                    raise forms.ValidationError(_('Please upload a .docx or PDF file.'))
+                upload.seek(0)
+            elif not name.endswith('.docx') or upload.content_type not in DOCX_CONTENT_TYPES:
+                raise forms.ValidationError(_('Please upload a .docx or PDF file.'))
+
+            if upload.size > settings.QUESTION_IMPORT_MAX_FILE_SIZE:
+                raise forms.ValidationError(_('The file is too large.'))
 
-        if not upload.name.lower().endswith('.docx'):
-            raise forms.ValidationError(_('Please upload a .docx file.'))
+            files.append(upload)
 
-        if upload.content_type not in DOCX_CONTENT_TYPES:
-            raise forms.ValidationError(_('Please upload a .docx file.'))
+        if not files:
+            raise forms.ValidationError(_('No .docx or PDF files were found in the upload.'))
 
-        if upload.size > settings.QUESTION_IMPORT_MAX_FILE_SIZE:
-            raise forms.ValidationError(_('The file is too large.'))
+        if len(files) > settings.QUESTION_IMPORT_MAX_FILES:
+            raise _too_many_files_error()
 
-        return upload
+        return files
 
 
 class ImportedQuestionForm(forms.Form):
@@ -0,0 +1,166 @@
+import json
+import resource
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from apps.teaching.services.question_import import QuestionImportError, run_question_import
+from core.utils.ai_client import set_replay_scope
+
+CORPUS_SUFFIXES = ('.docx', '.pdf')
+STAGES = ('image_extraction', 'storage', 'rules', 'conversion', 'llm', 'substitution')
+IN_MEMORY_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs the question import pipeline over a directory of .docx and PDF files and reports per-stage timings '
+        'and peak memory. Files are kept in memory and database writes are rolled back. '
+        'Use --backend replay (with fixtures captured by --backend record) to run without the AI API, '
+        'and --budget to fail with a non-zero exit code when a run goes over its thresholds.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('corpus', help='Directory with .docx and PDF files.')
+        parser.add_argument('--format', default='test', help='Question format code: test, matching or mixed.')
+        parser.add_argument('--repeat', type=int, default=1, help='Runs per file.')
+        parser.add_argument(
+            '--backend', choices=('anthropic', 'record', 'replay'), default=None,
+            help='AI client backend (default: AI_CLIENT_BACKEND).',
+        )
+        parser.add_argument('--output', default=None, help='Write the results as JSON to this file.')
+        parser.add_argument(
+            '--budget', default=None,
+            help='JSON file with thresholds: stage medians in seconds (e.g. {"total": 2.5, "llm": 2.0}), '
+                 '"peak_memory" in bytes and the allowed number of "failed" runs.',
+        )
+
+    def handle(self, *args, corpus, format, repeat, backend, output, budget, **kwargs):
+        files = sorted(path for path in Path(corpus).iterdir() if path.suffix.lower() in CORPUS_SUFFIXES)
+        if not files:
+            raise CommandError(f'No .docx or PDF files in {corpus}.')
+
+        overrides = {'STORAGES': IN_MEMORY_STORAGES}
+        if backend:
+            overrides['AI_CLIENT_BACKEND'] = backend
+
+        runs = []
+        with override_settings(**overrides):
+            for path in files:
+                # Әр файлдың replay fixture-лері өз қалтасында: AI_REPLAY_DIR/<файл аты>/.
+                set_replay_scope(path.stem)
+                file_bytes = path.read_bytes()
+                for _index in range(repeat):
+                    run = self._run(path.name, file_bytes, format)
+                    runs.append(run)
+                    self._write_run(run)
+            set_replay_scope('')
+
+        summary = self._summary(runs)
+        self._write_summary(summary)
+
+        if output:
+            Path(output).write_text(json.dumps({'runs': runs, 'summary': summary}, indent=2), encoding='utf-8')
+
+        if budget:
+            regressions = self._over_budget(summary, json.loads(Path(budget).read_text(encoding='utf-8')))
+            if regressions:
+                raise CommandError('Over budget: ' + '; '.join(regressions))
+            self.stdout.write(self.style.SUCCESS('Within budget.'))
+
+    def _run(self, name, file_bytes, format_code):
+        run = {'file': name, 'questions': 0, 'images': 0, 'timings': {}, 'usage': {}, 'error': ''}
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                result = run_question_import(file_bytes, format_code)
+                run.update(
+                    questions=len(result.questions), images=len(result.image_paths),
+                    timings=result.metrics.timings, usage=result.metrics.usage,
+                )
+                raise _Rollback
+        except _Rollback:
+            pass
+        except QuestionImportError as error:
+            run['error'] = str(error)
+        finally:
+            run['total'] = time.perf_counter() - started
+            run['peak_memory'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        return run
+
+    def _summary(self, runs):
+        succeeded = [run for run in runs if not run['error']]
+        summary = {'runs': len(runs), 'failed': len(runs) - len(succeeded), 'stages': {}}
+
+        for stage in (*STAGES, 'total'):
+            values = [run['total'] if stage == 'total' else run['timings'].get(stage, 0.0) for run in succeeded]
+            if values:
+                summary['stages'][stage] = {
+                    'median': statistics.median(values),
+                    'max': max(values),
+                    'sum': sum(values),
+                }
+
+        summary['peak_memory'] = max((run['peak_memory'] for run in runs), default=0)
+        # ru_maxrss Linux-та килобайтпен; soffice сияқты бала процестер бөлек саналады.
+        summary['max_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        summary['max_rss_children'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+        return summary
+
+    def _over_budget(self, summary, budget):
+        # Кезеңдер медианамен салыстырылады: бір кездейсоқ баяу жүріс CI-ды құлатпауы керек.
+        regressions = []
+        for name, limit in budget.items():
+            if name == 'failed':
+                value = summary['failed']
+            elif name == 'peak_memory':
+                value = summary['peak_memory']
+            elif name in summary['stages']:
+                value = summary['stages'][name]['median']
+            else:
+                continue
+
+            if value > limit:
+                regressions.append(f'{name} {value:g} > {limit:g}')
+
+        return regressions
+
+    def _write_run(self, run):
+        if run['error']:
+            self.stdout.write(self.style.ERROR(f'{run["file"]}: {run["error"]}'))
+            return
+
+        stages = ' '.join(f'{stage}={run["timings"][stage] * 1000:.0f}ms' for stage in STAGES if stage in run['timings'])
+        self.stdout.write(
+            f'{run["file"]}: {run["questions"]} questions, {run["images"]} images, '
+            f'{run["total"] * 1000:.0f} ms, peak {run["peak_memory"] / 1024 / 1024:.1f} MB | {stages}'
+        )
+
+    def _write_summary(self, summary):
+        self.stdout.write(f'\n{summary["runs"]} runs, {summary["failed"]} failed')
+        for stage, values in summary['stages'].items():
+            self.stdout.write(
+                f'{stage:<18} median {values["median"] * 1000:>9.1f} ms   max {values["max"] * 1000:>9.1f} ms'
+            )
+
+        self.stdout.write(
+            f'peak python memory {summary["peak_memory"] / 1024 / 1024:.1f} MB, '
+            f'max RSS {summary["max_rss"] / 1024 / 1024:.1f} MB '
+            f'(children {summary["max_rss_children"] / 1024 / 1024:.1f} MB)'
+        )
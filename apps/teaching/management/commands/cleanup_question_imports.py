@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.teaching.services.import_cleanup import cleanup_question_imports
+
+
+class Command(BaseCommand):
+    help = 'Deletes abandoned question imports and imported images that no question references.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=None,
+            help='Age in seconds after which an unfinished import is abandoned (default: QUESTION_IMPORT_BATCH_TTL).',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted.')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows deleted per query.')
+
+    def handle(self, *args, older_than, dry_run, chunk_size, **options):
+        stats = cleanup_question_imports(older_than=older_than, dry_run=dry_run, chunk_size=chunk_size)
+
+        prefix = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(
+            f'{prefix} {stats.batches} import batches, {stats.images} images, '
+            f'{stats.files} files ({stats.bytes / (1024 * 1024):.1f} MB).'
+        )
+        self.stdout.write(f'Finished in {stats.elapsed:.1f}s ({stats.files_per_second:.0f} files/s).')
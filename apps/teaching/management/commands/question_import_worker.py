@@ -0,0 +1,57 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from apps.teaching.services.import_batch import claim_next_import_batch, process_import_batch
+
+
+class Command(BaseCommand):
+    help = 'Runs queued AI question imports (DB-backed queue, run as a separate process).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help='Number of imports processed in parallel.')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Process the queue until it is empty, then exit.')
+
+    def handle(self, *args, concurrency, poll_interval, once, **options):
+        self.stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        threads = [
+            threading.Thread(target=self._work, args=(poll_interval, once), name=f'question-import-{index}')
+            for index in range(max(concurrency, 1))
+        ]
+        for thread in threads:
+            thread.start()
+
+        self.stdout.write(f'Question import worker started ({len(threads)} threads).')
+
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1)
+
+        self.stdout.write('Question import worker stopped.')
+
+    def _request_stop(self, signum, frame):
+        self.stop_event.set()
+
+    def _work(self, poll_interval, once):
+        try:
+            while not self.stop_event.is_set():
+                close_old_connections()
+                batch = claim_next_import_batch()
+
+                if batch is None:
+                    if once:
+                        return
+                    self.stop_event.wait(poll_interval)
+                    continue
+
+                self.stdout.write(f'Processing import {batch.import_id}')
+                batch = process_import_batch(batch)
+                self.stdout.write(f'Import {batch.import_id}: {batch.status}')
+        finally:
+            connection.close()
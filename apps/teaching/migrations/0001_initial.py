@@ -0,0 +1,48 @@
+# Generated by Django 6.0.5 on 2026-10-18 10:12
+
+import core.utils.files
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0007_remove_teacher_subject'),
+        ('catalog', '0003_seed_matching_question_format'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Is active')),
+                ('import_id', models.CharField(max_length=32, unique=True, verbose_name='Import ID')),
+                ('source', models.FileField(blank=True, upload_to=core.utils.files.question_import_source_upload_path, verbose_name='Source file')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=16, verbose_name='Status')),
+                ('stage', models.CharField(choices=[('queued', 'Queued'), ('converting', 'Converting the document'), ('extracting', 'Reading the questions'), ('storing', 'Saving images'), ('finished', 'Finished')], default='queued', max_length=16, verbose_name='Stage')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('questions', models.JSONField(blank=True, default=list, verbose_name='Questions')),
+                ('unsupported', models.JSONField(blank=True, default=list, verbose_name='Unsupported questions')),
+                ('image_paths', models.JSONField(blank=True, default=list, verbose_name='Image paths')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished at')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_batches', to='accounts.teacher', verbose_name='Author')),
+                ('format', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='import_batches', to='catalog.questionformat', verbose_name='Format')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_batches', to='catalog.subject', verbose_name='Subject')),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_batches', to='catalog.topic', verbose_name='Topic')),
+            ],
+            options={
+                'verbose_name': 'Import batch',
+                'verbose_name_plural': 'Import batches',
+                'ordering': ('-created_at',),
+                'indexes': [models.Index(fields=['status', 'created_at'], name='import_batch_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.5 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teaching', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportResultCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='Key')),
+                ('file_hash', models.CharField(max_length=64, verbose_name='File hash')),
+                ('format_code', models.SlugField(max_length=64, verbose_name='Format code')),
+                ('model', models.CharField(max_length=128, verbose_name='Model')),
+                ('payload', models.JSONField(verbose_name='Payload')),
+                ('size', models.PositiveIntegerField(default=0, verbose_name='Size (bytes)')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='Hits')),
+                ('last_used_at', models.DateTimeField(db_index=True, verbose_name='Last used at')),
+            ],
+            options={
+                'verbose_name': 'Import result cache',
+                'verbose_name_plural': 'Import result cache',
+                'ordering': ('-last_used_at',),
+            },
+        ),
+    ]
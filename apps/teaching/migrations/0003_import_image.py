@@ -0,0 +1,30 @@
+# Generated by Django 6.0.5 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teaching', '0002_import_result_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('file_hash', models.CharField(max_length=64, unique=True, verbose_name='File hash')),
+                ('path', models.CharField(max_length=255, verbose_name='Path')),
+                ('content_type', models.CharField(max_length=64, verbose_name='Content type')),
+                ('size', models.PositiveIntegerField(default=0, verbose_name='Size (bytes)')),
+            ],
+            options={
+                'verbose_name': 'Import image',
+                'verbose_name_plural': 'Import images',
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.5 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teaching', '0003_import_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importimage',
+            name='fallback_path',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Fallback path'),
+        ),
+    ]
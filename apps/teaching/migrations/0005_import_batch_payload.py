@@ -0,0 +1,39 @@
+# Generated by Django 6.0.5 on 2026-10-18 14:10
+
+import json
+import zlib
+
+from django.db import migrations, models
+
+
+def compress_results(apps, schema_editor):
+    ImportBatch = apps.get_model('teaching', 'ImportBatch')
+
+    for batch in ImportBatch.objects.exclude(questions=[], unsupported=[]).iterator():
+        data = {'questions': batch.questions, 'unsupported': batch.unsupported}
+        batch.payload = zlib.compress(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 6)
+        batch.save(update_fields=['payload'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teaching', '0004_import_image_fallback'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importbatch',
+            name='payload',
+            field=models.BinaryField(blank=True, default=b'', verbose_name='Payload'),
+        ),
+        migrations.RunPython(compress_results, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='importbatch',
+            name='questions',
+        ),
+        migrations.RemoveField(
+            model_name='importbatch',
+            name='unsupported',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.5 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teaching', '0005_import_batch_payload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importbatch',
+            name='metrics',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Metrics'),
+        ),
+    ]
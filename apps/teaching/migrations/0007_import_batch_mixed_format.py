@@ -0,0 +1,20 @@
+# Generated by Django 6.0.5 on 2026-10-18 12:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_seed_matching_question_format'),
+        ('teaching', '0006_import_batch_metrics'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='importbatch',
+            name='format',
+            field=models.ForeignKey(blank=True, help_text='Empty — the file may mix question formats.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='import_batches', to='catalog.questionformat', verbose_name='Format'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.5 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teaching', '0007_import_batch_mixed_format'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importbatch',
+            name='file_name',
+            field=models.CharField(blank=True, max_length=255, verbose_name='File name'),
+        ),
+        migrations.AddField(
+            model_name='importbatch',
+            name='group_id',
+            field=models.CharField(blank=True, db_index=True, help_text='Files uploaded together (several .docx files or a ZIP archive) share one group.', max_length=32, verbose_name='Group ID'),
+        ),
+    ]
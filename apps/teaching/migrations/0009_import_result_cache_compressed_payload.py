@@ -0,0 +1,42 @@
+# Generated by Django 6.0.5 on 2026-10-18 15:20
+
+import json
+import zlib
+
+from django.db import migrations, models
+
+
+def compress_payloads(apps, schema_editor):
+    ImportResultCache = apps.get_model('teaching', 'ImportResultCache')
+
+    for entry in ImportResultCache.objects.iterator():
+        payload = zlib.compress(json.dumps(entry.raw_payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 6)
+        entry.payload = payload
+        entry.size = len(payload)
+        entry.save(update_fields=['payload', 'size'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teaching', '0008_import_batch_group'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='importresultcache',
+            old_name='payload',
+            new_name='raw_payload',
+        ),
+        migrations.AddField(
+            model_name='importresultcache',
+            name='payload',
+            field=models.BinaryField(default=b'', verbose_name='Payload'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(compress_payloads, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='importresultcache',
+            name='raw_payload',
+        ),
+    ]
@@ -0,0 +1,3 @@
+from .question_import import ImportBatch, ImportImage, ImportResultCache
+
+__all__ = ['ImportBatch', 'ImportImage', 'ImportResultCache']
@@ -0,0 +1,125 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from core.models import BaseModel, TimeStampedModel
+from core.utils.compression import compress_json, decompress_json
+from core.utils.files import question_import_source_upload_path
+from apps.teaching.services.parsed_question import MIXED_FORMAT_CODE
+
+
+# -------------- ImportBatch --------------
+class ImportBatch(BaseModel):
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        RUNNING = 'running', _('Running')
+        DONE = 'done', _('Done')
+        FAILED = 'failed', _('Failed')
+
+    class Stage(models.TextChoices):
+        QUEUED = 'queued', _('Queued')
+        CONVERTING = 'converting', _('Converting the document')
+        EXTRACTING = 'extracting', _('Reading the questions')
+        STORING = 'storing', _('Saving images')
+        FINISHED = 'finished', _('Finished')
+
+    import_id = models.CharField(_('Import ID'), max_length=32, unique=True)
+    group_id = models.CharField(
+        _('Group ID'), max_length=32, blank=True, db_index=True,
+        help_text=_('Files uploaded together (several .docx files or a ZIP archive) share one group.'),
+    )
+    file_name = models.CharField(_('File name'), max_length=255, blank=True)
+    author = models.ForeignKey(
+        'accounts.Teacher', on_delete=models.CASCADE,
+        related_name='import_batches', verbose_name=_('Author')
+    )
+    subject = models.ForeignKey(
+        'catalog.Subject', on_delete=models.CASCADE,
+        related_name='import_batches', verbose_name=_('Subject')
+    )
+    topic = models.ForeignKey(
+        'catalog.Topic', on_delete=models.CASCADE,
+        related_name='import_batches', verbose_name=_('Topic')
+    )
+    format = models.ForeignKey(
+        'catalog.QuestionFormat', on_delete=models.PROTECT,
+        related_name='import_batches', verbose_name=_('Format'),
+        blank=True, null=True, help_text=_('Empty — the file may mix question formats.'),
+    )
+    source = models.FileField(_('Source file'), upload_to=question_import_source_upload_path, blank=True)
+    status = models.CharField(_('Status'), choices=Status.choices, max_length=16, default=Status.PENDING)
+    stage = models.CharField(_('Stage'), choices=Stage.choices, max_length=16, default=Stage.QUEUED)
+    attempts = models.PositiveSmallIntegerField(_('Attempts'), default=0)
+    error = models.TextField(_('Error'), blank=True)
+    payload = models.BinaryField(_('Payload'), blank=True, default=b'')
+    image_paths = models.JSONField(_('Image paths'), default=list, blank=True)
+    metrics = models.JSONField(_('Metrics'), default=dict, blank=True)
+    started_at = models.DateTimeField(_('Started at'), blank=True, null=True)
+    finished_at = models.DateTimeField(_('Finished at'), blank=True, null=True)
+
+    class Meta:
+        verbose_name = _('Import batch')
+        verbose_name_plural = _('Import batches')
+        ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='import_batch_queue_idx'),
+        ]
+
+    def __str__(self):
+        return self.import_id
+
+    @property
+    def format_code(self):
+        return self.format.code if self.format_id else MIXED_FORMAT_CODE
+
+    @property
+    def is_finished(self):
+        return self.status in (self.Status.DONE, self.Status.FAILED)
+
+    def get_results(self):
+        """`(questions, unsupported)` — сұрақтар HTML-і үлкен болғандықтан zlib-пен сығылған JSON ретінде сақталады."""
+        if not self.payload:
+            return [], []
+
+        data = decompress_json(self.payload)
+        return data['questions'], data['unsupported']
+
+    def set_results(self, questions, unsupported):
+        self.payload = compress_json({'questions': questions, 'unsupported': unsupported})
+
+
+# -------------- ImportResultCache --------------
+class ImportResultCache(TimeStampedModel):
+    key = models.CharField(_('Key'), max_length=64, unique=True)
+    file_hash = models.CharField(_('File hash'), max_length=64)
+    format_code = models.SlugField(_('Format code'), max_length=64)
+    model = models.CharField(_('Model'), max_length=128)
+    # ImportBatch.payload сияқты zlib-пен сығылған JSON (`compress_json`); `size` — сығылған байттар.
+    payload = models.BinaryField(_('Payload'))
+    size = models.PositiveIntegerField(_('Size (bytes)'), default=0)
+    hits = models.PositiveIntegerField(_('Hits'), default=0)
+    last_used_at = models.DateTimeField(_('Last used at'), db_index=True)
+
+    class Meta:
+        verbose_name = _('Import result cache')
+        verbose_name_plural = _('Import result cache')
+        ordering = ('-last_used_at',)
+
+    def __str__(self):
+        return self.key
+
+
+# -------------- ImportImage --------------
+class ImportImage(TimeStampedModel):
+    file_hash = models.CharField(_('File hash'), max_length=64, unique=True)
+    path = models.CharField(_('Path'), max_length=255)
+    # Бұрын жасалған PNG/JPEG көшірмесі (енді жасалмайды) — тазалау оны суретпен бірге өшіреді.
+    fallback_path = models.CharField(_('Fallback path'), max_length=255, blank=True)
+    content_type = models.CharField(_('Content type'), max_length=64)
+    size = models.PositiveIntegerField(_('Size (bytes)'), default=0)
+
+    class Meta:
+        verbose_name = _('Import image')
+        verbose_name_plural = _('Import images')
+        ordering = ('-created_at',)
+
+    def __str__(self):
+        return self.path
@@ -0,0 +1,99 @@
+from collections import defaultdict
+
+from apps.teaching.models import ImportBatch
+from core.utils.ai_limiter import ai_queue_positions
+
+METRIC_PERCENTILES = (50, 90, 99)
+SUMMARY_METRICS = (
+    ('total', 'timings'),
+    ('first_token', 'timings'),
+    ('conversion', 'timings'),
+    ('llm', 'timings'),
+    ('storage', 'timings'),
+    ('input_tokens', 'usage'),
+    ('output_tokens', 'usage'),
+    ('cache_creation_input_tokens', 'usage'),
+    ('cache_read_input_tokens', 'usage'),
+    ('pages', None),
+    ('images', None),
+    ('questions', None),
+    ('retries', None),
+)
+
+
+def get_import_batch(import_id, *, author, subject):
+    return (
+        ImportBatch.objects.filter(is_active=True, import_id=import_id, author=author, subject=subject)
+        .select_related('topic', 'topic__chapter', 'format')
+        .first()
+    )
+
+
+def get_import_group(group_id, *, author, subject, with_results=False):
+    """Бірге жүктелген файлдардың белсенді импорттары, файл аты бойынша."""
+    batches = ImportBatch.objects.filter(is_active=True, group_id=group_id, author=author, subject=subject)
+    if not with_results:
+        batches = batches.defer('payload')
+
+    return list(batches.order_by('file_name', 'pk'))
+
+
+def annotate_ai_queue_positions(batches):
+    """Сұрауы AI limiter кезегінде тұрған импорттарға `ai_queue_position` (1 — келесі) қояды, қалғандарына `None`."""
+    waiting = [batch.import_id for batch in batches if batch.stage == ImportBatch.Stage.EXTRACTING]
+    positions = ai_queue_positions(waiting) if waiting else {}
+
+    for batch in batches:
+        batch.ai_queue_position = positions.get(batch.import_id)
+
+    return batches
+
+
+def _percentile(values, percent):
+    position = (len(values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _metric_value(metrics, name, section):
+    source = metrics.get(section, {}) if section else metrics
+    return source.get(name)
+
+
+def import_metrics_summary(*, since):
+    """`since`-тен кейін біткен импорттардың өлшемдері: (әдіс, модель) тобы бойынша p50/p90/p99."""
+    groups = defaultdict(list)
+    batches = (
+        ImportBatch.objects.filter(finished_at__gte=since).exclude(metrics={})
+        .values_list('status', 'metrics')
+    )
+    for status, metrics in batches.iterator():
+        groups[(metrics.get('method', ''), metrics.get('model', ''))].append((status, metrics))
+
+    summary = []
+    for (method, model), items in sorted(groups.items()):
+        rows = []
+        for name, section in SUMMARY_METRICS:
+            values = sorted(
+                value for _status, metrics in items
+                if (value := _metric_value(metrics, name, section)) is not None
+            )
+            if values:
+                rows.append({
+                    'name': name,
+                    'section': section,
+                    'percentiles': [_percentile(values, percent) for percent in METRIC_PERCENTILES],
+                })
+
+        summary.append({
+            'method': method,
+            'model': model,
+            'count': len(items),
+            'failed': sum(status == ImportBatch.Status.FAILED for status, _metrics in items),
+            'cache_hits': sum(bool(metrics.get('usage', {}).get('cache_read_input_tokens')) for _status, metrics in items),
+            'one_shot_conversions': sum(metrics.get('converter') == 'soffice' for _status, metrics in items),
+            'rows': rows,
+        })
+
+    return summary
@@ -0,0 +1,351 @@
+import re
+from dataclasses import dataclass, field
+from html import escape
+
+from apps.teaching.services.parsed_question import MIXED_FORMAT_CODE, ParsedOption, ParsedQuestion
+from core.utils.omml import M_NS, omml_to_html
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DRAWING_BLIP_TAG = '{http://schemas.openxmlformats.org/drawingml/2006/main}blip'
+RELATIONSHIP_EMBED_ATTR = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed'
+
+OBJECT_CHAR = '￼'
+OPTION_LETTERS = 'ABCDEFGH'
+CYRILLIC_LETTERS = str.maketrans('АВСДЕ', 'ABCDE')
+
+QUESTION_START_RE = re.compile(r'^\s*(\d{1,3})\s*[.)]\s*(?=\S)')
+OPTION_MARKER_RE = re.compile(r'(?:^|(?<=\s))([A-HАВСДЕ])\s*\)\s*')
+LEADING_OPTION_RE = re.compile(r'^\s*([A-HАВСДЕ])\s*[.)]\s*')
+ANSWER_PAIR_RE = re.compile(r'(\d{1,3})\s*[-–—.):]?\s*([A-HАВСДЕ](?:\s*[,;]\s*[A-HАВСДЕ]|[A-HАВСДЕ])*)(?![\w])')
+KEY_HEADING_RE = re.compile(r'^[^\d]{0,40}:\s*')
+
+
+def ordered_image_blips(document):
+    """Құжаттағы суреттерді (blip, part) жұбы ретінде, `{{img:N}}` нөмірлеу ретімен қайтарады."""
+    blips = []
+    for blip in document.element.body.iter(DRAWING_BLIP_TAG):
+        r_id = blip.get(RELATIONSHIP_EMBED_ATTR)
+        if not r_id:
+            continue
+
+        try:
+            part = document.part.related_parts[r_id]
+        except KeyError:
+            continue
+
+        blips.append((blip, part))
+
+    return blips
+
+
+@dataclass
+class _Token:
+    text: str
+    html: str = ''
+    bold: bool | None = None
+    vert: str | None = None
+
+    @property
+    def is_object(self):
+        return self.text == OBJECT_CHAR
+
+
+def _is_on(properties, tag):
+    if properties is None:
+        return False
+
+    node = properties.find(f'{W_NS}{tag}')
+    if node is None:
+        return False
+
+    return node.get(f'{W_NS}val', 'true') not in ('0', 'false', 'none')
+
+
+def _run_tokens(run, image_numbers):
+    properties = run.find(f'{W_NS}rPr')
+    bold = _is_on(properties, 'b')
+    vert_node = properties.find(f'{W_NS}vertAlign') if properties is not None else None
+    vert = vert_node.get(f'{W_NS}val') if vert_node is not None else None
+
+    tokens = []
+    for node in run.iter():
+        if node.tag == f'{W_NS}t' and node.text:
+            tokens.append(_Token(node.text, bold=bold, vert=vert))
+        elif node.tag in (f'{W_NS}tab', f'{W_NS}br', f'{W_NS}cr'):
+            tokens.append(_Token(' ', bold=bold))
+        elif node.tag == DRAWING_BLIP_TAG and node in image_numbers:
+            tokens.append(_Token(OBJECT_CHAR, html='{{img:%d}}' % image_numbers[node]))
+
+    return tokens
+
+
+def _paragraph_tokens(paragraph, image_numbers):
+    tokens = []
+    for child in paragraph:
+        if child.tag == f'{W_NS}r':
+            tokens.extend(_run_tokens(child, image_numbers))
+        elif child.tag in (f'{M_NS}oMath', f'{M_NS}oMathPara'):
+            tokens.append(_Token(OBJECT_CHAR, html=omml_to_html(child)))
+        elif child.tag in (f'{W_NS}hyperlink', f'{W_NS}ins', f'{W_NS}smartTag', f'{W_NS}sdt', f'{W_NS}sdtContent'):
+            tokens.extend(_paragraph_tokens(child, image_numbers))
+
+    return tokens
+
+
+def _plain_text(tokens):
+    return ''.join(token.text for token in tokens)
+
+
+def _slice_tokens(tokens, start, end):
+    result = []
+    offset = 0
+    for token in tokens:
+        token_start, token_end = offset, offset + len(token.text)
+        offset = token_end
+
+        if token_end <= start or token_start >= end:
+            continue
+
+        if token.is_object:
+            result.append(token)
+            continue
+
+        text = token.text[max(start - token_start, 0):end - token_start]
+        result.append(_Token(text, bold=token.bold, vert=token.vert))
+
+    return result
+
+
+def _tokens_html(tokens):
+    parts = []
+    for token in tokens:
+        if token.is_object:
+            parts.append(token.html)
+        elif token.vert == 'superscript':
+            parts.append(f'<sup>{escape(token.text)}</sup>')
+        elif token.vert == 'subscript':
+            parts.append(f'<sub>{escape(token.text)}</sub>')
+        else:
+            parts.append(escape(token.text))
+
+    return ''.join(parts).strip()
+
+
+def _tokens_are_bold(tokens):
+    text_tokens = [token for token in tokens if not token.is_object and token.text.strip()]
+    return bool(text_tokens) and all(token.bold for token in text_tokens)
+
+
+def _normalize_letter(letter):
+    return letter.translate(CYRILLIC_LETTERS)
+
+
+def _split_options(tokens, expected_letter):
+    text = _plain_text(tokens)
+    leading = LEADING_OPTION_RE.match(text)
+    if not leading or _normalize_letter(leading.group(1)) != expected_letter:
+        return []
+
+    markers = [(leading.start(1), leading.end(), expected_letter)]
+    next_index = OPTION_LETTERS.index(expected_letter) + 1
+    for match in OPTION_MARKER_RE.finditer(text, leading.end()):
+        if next_index >= len(OPTION_LETTERS) or _normalize_letter(match.group(1)) != OPTION_LETTERS[next_index]:
+            continue
+
+        markers.append((match.start(1), match.end(), OPTION_LETTERS[next_index]))
+        next_index += 1
+
+    options = []
+    for index, (_marker_start, content_start, letter) in enumerate(markers):
+        content_end = markers[index + 1][0] if index + 1 < len(markers) else len(text)
+        options.append((letter, _slice_tokens(tokens, content_start, content_end)))
+
+    return options
+
+
+def _answer_letters(value):
+    return {_normalize_letter(letter) for letter in re.findall(r'[A-HАВСДЕ]', value)}
+
+
+def _parse_answer_key_text(text):
+    body = KEY_HEADING_RE.sub('', text.strip(), count=1)
+    pairs = ANSWER_PAIR_RE.findall(body)
+    if len(pairs) < 3:
+        return {}
+
+    residue = ANSWER_PAIR_RE.sub('', body)
+    if len(re.sub(r'[\s,;.|]', '', residue)) > len(body) * 0.15:
+        return {}
+
+    return {int(number): _answer_letters(letters) for number, letters in pairs}
+
+
+def _table_rows(table):
+    rows = []
+    for row in table.iter(f'{W_NS}tr'):
+        rows.append([
+            ''.join(node.text or '' for node in cell.iter(f'{W_NS}t')).strip()
+            for cell in row.iter(f'{W_NS}tc')
+        ])
+
+    return rows
+
+
+def _parse_answer_key_table(table):
+    rows = _table_rows(table)
+
+    for numbers, letters in zip(rows, rows[1:]):
+        if len(numbers) >= 2 and all(cell.isdigit() for cell in numbers[1:]) and all(
+            not cell or _answer_letters(cell) and len(re.sub(r'[A-HАВСДЕ,;\s]', '', cell)) == 0 for cell in letters[1:]
+        ):
+            key = {int(number): _answer_letters(letter) for number, letter in zip(numbers, letters) if number.isdigit()}
+            if len(key) >= 2:
+                return key
+
+    return _parse_answer_key_text(' '.join(' '.join(row) for row in rows))
+
+
+def _table_html(table, image_numbers):
+    rows = []
+    for row in table.iter(f'{W_NS}tr'):
+        cells = []
+        for cell in row.iter(f'{W_NS}tc'):
+            paragraphs = [
+                _tokens_html(_paragraph_tokens(paragraph, image_numbers))
+                for paragraph in cell.iter(f'{W_NS}p')
+            ]
+            cells.append('<td>' + '<br>'.join(part for part in paragraphs if part) + '</td>')
+        rows.append('<tr>' + ''.join(cells) + '</tr>')
+
+    return '<table><tbody>' + ''.join(rows) + '</tbody></table>'
+
+
+def _iter_blocks(container):
+    for child in container:
+        if child.tag in (f'{W_NS}p', f'{W_NS}tbl'):
+            yield child
+        elif child.tag == f'{W_NS}sdt':
+            content = child.find(f'{W_NS}sdtContent')
+            if content is not None:
+                yield from _iter_blocks(content)
+
+
+def _is_numbered_paragraph(paragraph):
+    properties = paragraph.find(f'{W_NS}pPr')
+    return properties is not None and properties.find(f'{W_NS}numPr') is not None
+
+
+@dataclass
+class _DraftQuestion:
+    number: int
+    paragraphs: list = field(default_factory=list)
+    options: list = field(default_factory=list)
+
+
+def _draft_is_well_formed(draft, correct_letters):
+    letters = [letter for letter, _tokens in draft.options]
+    return (
+        bool(draft.paragraphs)
+        and 2 <= len(letters) <= len(OPTION_LETTERS)
+        and letters == list(OPTION_LETTERS[:len(letters)])
+        and bool(correct_letters)
+        and correct_letters <= set(letters)
+    )
+
+
+def _bold_option_letters(options):
+    """Bold нұсқалардың әріптері — тек bold оларды қалғандарынан ажыратса. Бүкіл құжат немесе сұрақтың барлық
+    нұсқалары bold болса, бұл жауап белгісі емес: бос жиын қайтады (сұрақ дұрыс құрылмаған деп саналады)."""
+    bold_letters = {letter for letter, tokens in options if _tokens_are_bold(tokens)}
+    if len(bold_letters) == len(options):
+        return set()
+
+    return bold_letters
+
+
+def extract_docx_questions(document, format_code):
+    """Қатаң құрылымды (нөмірлі сұрақ + «A) … E)» нұсқалар, дұрысы bold немесе жауап кілтінде) тест
+    файлдарын LLM-сіз оқиды. `(questions, confidence)` қайтарады; confidence 0..1 — төмен болса Claude-қа
+    жіберу керек, бұзылған сұрақ болса — 0. Аралас импортта да қолданылады: бүкіл файл тест ретінде толық оқылса, сәйкестендіру жоқ."""
+    if format_code not in ('test', MIXED_FORMAT_CODE):
+        return [], 0.0
+
+    image_numbers = {blip: index for index, (blip, _part) in enumerate(ordered_image_blips(document), start=1)}
+    drafts = []
+    answer_key = {}
+    orphans = 0
+
+    for block in _iter_blocks(document.element.body):
+        current = drafts[-1] if drafts else None
+
+        if block.tag == f'{W_NS}tbl':
+            key = _parse_answer_key_table(block)
+            if key:
+                answer_key.update(key)
+            elif current is not None and not current.options:
+                current.paragraphs.append(_table_html(block, image_numbers))
+            elif current is not None:
+                orphans += 1
+            continue
+
+        tokens = _paragraph_tokens(block, image_numbers)
+        text = _plain_text(tokens)
+        if not text.strip():
+            continue
+
+        key = _parse_answer_key_text(text)
+        if key:
+            answer_key.update(key)
+            continue
+
+        expected_letter = OPTION_LETTERS[len(current.options)] if current and len(current.options) < len(OPTION_LETTERS) else None
+        options = _split_options(tokens, expected_letter) if expected_letter else []
+        if options:
+            current.options.extend(options)
+            continue
+
+        question_start = QUESTION_START_RE.match(text)
+        if question_start or (_is_numbered_paragraph(block) and (current is None or current.options)):
+            number = int(question_start.group(1)) if question_start else len(drafts) + 1
+            start = question_start.end() if question_start else 0
+            drafts.append(_DraftQuestion(number=number, paragraphs=[_tokens_html(_slice_tokens(tokens, start, len(text)))]))
+            continue
+
+        if current is not None and not current.options:
+            current.paragraphs.append(_tokens_html(tokens))
+        elif current is not None:
+            orphans += 1
+
+    if not drafts:
+        return [], 0.0
+
+    questions = []
+    well_formed = 0
+    for index, draft in enumerate(drafts):
+        if draft.number in answer_key:
+            correct_letters = answer_key[draft.number]
+        else:
+            correct_letters = _bold_option_letters(draft.options)
+
+        if _draft_is_well_formed(draft, correct_letters):
+            well_formed += 1
+
+        if draft.number != index + 1:
+            orphans += 1
+
+        questions.append(ParsedQuestion(
+            format_code='test',
+            variant_code='multiple' if len(correct_letters) > 1 else 'single',
+            level='medium',
+            text_html=''.join(f'<p>{paragraph}</p>' for paragraph in draft.paragraphs if paragraph),
+            options=[
+                ParsedOption(text_html=_tokens_html(tokens), is_correct=letter in correct_letters)
+                for letter, tokens in draft.options
+            ],
+        ))
+
+    # Бір сұрақ бұзылса да бүкіл файл Claude-қа кетеді: үлкен файлда жалғыз қате сұрақ шектен өтіп кетер еді.
+    if well_formed < len(drafts):
+        return questions, 0.0
+
+    return questions, well_formed / (len(drafts) + orphans)
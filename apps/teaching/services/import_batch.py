@@ -0,0 +1,341 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.catalog.selectors import find_similar_questions_bulk, question_signature
+from apps.teaching.models import ImportBatch
+from apps.teaching.services.question_import import ImportMetrics, QuestionImportError, run_question_import
+from core.utils.ai_limiter import ai_request_key
+from core.utils.text import question_text_preview
+
+logger = logging.getLogger(__name__)
+
+# Ағынмен келген сұрақтар payload-қа осынша сұрақ немесе секунд сайын топтап жазылады.
+STREAM_FLUSH_QUESTIONS = 10
+STREAM_FLUSH_INTERVAL = 2
+
+
+class ImportBatchLost(Exception):
+    """Heartbeat ескіріп, batch-ті басқа worker қайта алды — бұл worker оған енді ештеңе жазбайды."""
+
+
+def enqueue_question_import(*, author, subject, topic, question_format, upload, group_id=''):
+    return ImportBatch.objects.create(
+        import_id=uuid.uuid4().hex, group_id=group_id, file_name=upload.name[:255],
+        author=author, subject=subject, topic=topic, format=question_format, source=upload,
+    )
+
+
+def enqueue_question_imports(*, author, subject, topic, question_format, uploads):
+    """Бірге жүктелген файлдарды бір топқа кезекке қояды; топ ID-ін қайтарады. Worker-лер оларды
+    `QUESTION_IMPORT_GROUP_CONCURRENCY` файлдан қатар өңдейді."""
+    group_id = uuid.uuid4().hex
+
+    with transaction.atomic():
+        for upload in uploads:
+            enqueue_question_import(
+                author=author, subject=subject, topic=topic, question_format=question_format,
+                upload=upload, group_id=group_id,
+            )
+
+    return group_id
+
+
+def _saturated_groups(stale_before):
+    return (
+        ImportBatch.objects
+        .filter(status=ImportBatch.Status.RUNNING, updated_at__gte=stale_before)
+        .exclude(group_id='')
+        .values('group_id')
+        .annotate(running=Count('pk'))
+        .filter(running__gte=settings.QUESTION_IMPORT_GROUP_CONCURRENCY)
+        .values('group_id')
+    )
+
+
+def claim_next_import_batch():
+    stale_before = timezone.now() - timedelta(seconds=settings.QUESTION_IMPORT_JOB_TIMEOUT)
+
+    with transaction.atomic():
+        batch = (
+            ImportBatch.objects
+            .select_for_update(skip_locked=True)
+            .filter(is_active=True)
+            .filter(
+                Q(status=ImportBatch.Status.PENDING)
+                # Жүріп жатқан импорт `updated_at`-ты heartbeat-пен жаңартып тұрады; ескірсе — worker өлген.
+                | Q(status=ImportBatch.Status.RUNNING, updated_at__lt=stale_before)
+            )
+            # Шек жұмсақ: екі worker бір сәтте бір топтан алса, шектен бір файлға асуы мүмкін.
+            .exclude(status=ImportBatch.Status.PENDING, group_id__in=_saturated_groups(stale_before))
+            .order_by('created_at')
+            .first()
+        )
+
+        if batch is None:
+            return None
+
+        batch.status = ImportBatch.Status.RUNNING
+        batch.stage = ImportBatch.Stage.QUEUED
+        batch.attempts += 1
+        batch.started_at = timezone.now()
+        batch.set_results([], [])
+        batch.save(update_fields=['status', 'stage', 'attempts', 'started_at', 'payload', 'updated_at'])
+
+    return batch
+
+
+def _touch(batch, **fields):
+    """Batch әлі осы worker-дікі болса (`attempts` әр claim-де өседі), `fields`-ті жазып, heartbeat-ты
+    жаңартады. Әйтпесе `ImportBatchLost`."""
+    owned = ImportBatch.objects.filter(pk=batch.pk, status=ImportBatch.Status.RUNNING, attempts=batch.attempts)
+    if not owned.update(updated_at=timezone.now(), **fields):
+        raise ImportBatchLost(batch.import_id)
+
+
+class _Heartbeat:
+    """Импорт бойы (AI limiter-ді күткенде, ұзақ ағын кезінде де) batch-тің `updated_at`-ын
+    `QUESTION_IMPORT_HEARTBEAT_INTERVAL` сайын жаңартады. Batch-ті басқа worker алса, `check` қате көтереді."""
+
+    def __init__(self, batch):
+        self.batch = batch
+        self.stopped = threading.Event()
+        self.lost = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f'{threading.current_thread().name}-heartbeat')
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stopped.set()
+        self.thread.join()
+
+    def _run(self):
+        try:
+            while not self.stopped.wait(settings.QUESTION_IMPORT_HEARTBEAT_INTERVAL):
+                try:
+                    _touch(self.batch)
+                except ImportBatchLost:
+                    self.lost.set()
+                    return
+                except DatabaseError:
+                    logger.warning('Heartbeat of question import %s failed', self.batch.import_id, exc_info=True)
+        finally:
+            connection.close()
+
+    def check(self):
+        if self.lost.is_set():
+            raise ImportBatchLost(self.batch.import_id)
+
+
+def _set_stage(batch, stage):
+    batch.stage = stage
+    _touch(batch, stage=stage)
+
+
+def _mark_duplicates(batch, questions):
+    # Барлық сұрақтың ұқсастары бір сұраумен ізделеді; review беті оларды ескертумен көрсетеді.
+    signatures = [
+        question_signature(
+            question.text_html,
+            [{'answer': option.text_html} for option in question.options],
+            [{'left': pair.left_html, 'right': pair.right_html} for pair in question.pairs],
+        )
+        for question in questions
+    ]
+    matches = find_similar_questions_bulk(subject=batch.subject_id, signatures=signatures)
+
+    for question, similar in zip(questions, matches):
+        question.duplicates = [
+            {'id': match.pk, 'preview': question_text_preview(match.text, 80), 'similarity': round(similarity, 2)}
+            for match, similarity in similar
+        ]
+
+
+class _StreamedResults:
+    """Review беті (HTMX polling) сұрақтарды payload-тан алады. Әр сұрақта бүкіл payload қайта сығылмауы үшін олар
+    буферленіп, топпен жазылады; қайталанғандарды белгілеу мен толық нәтиже импорт соңында бір рет жазылады."""
+
+    def __init__(self, batch, heartbeat):
+        self.batch = batch
+        self.heartbeat = heartbeat
+        self.questions = []
+        self.unsupported = []
+        self.pending = 0
+        self.flushed_at = time.monotonic()
+
+    def add(self, question):
+        self.heartbeat.check()
+        target = self.questions if question.is_supported_for(self.batch.format_code) else self.unsupported
+        target.append(asdict(question))
+        self.pending += 1
+
+        if self.pending >= STREAM_FLUSH_QUESTIONS or time.monotonic() - self.flushed_at >= STREAM_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        self.batch.set_results(self.questions, self.unsupported)
+        _touch(self.batch, payload=self.batch.payload)
+        self.pending = 0
+        self.flushed_at = time.monotonic()
+
+
+def _log_metrics(batch):
+    # Бір жолдық JSON — лог жинағышта импорттарды кезең/токен бойынша сүзуге болады.
+    record = {'import_id': batch.import_id, 'status': batch.status, 'attempts': batch.attempts, **batch.metrics}
+    logger.info('question_import %s', json.dumps(record, ensure_ascii=False), extra={'question_import': record})
+
+
+def _finish_batch(batch, status, error='', metrics=None):
+    if status == ImportBatch.Status.FAILED:
+        batch.set_results([], [])
+
+    batch.status = status
+    batch.stage = ImportBatch.Stage.FINISHED
+    batch.error = str(error)
+    batch.finished_at = timezone.now()
+    batch.metrics = metrics.as_dict() if metrics is not None else {}
+    _touch(
+        batch, status=status, stage=batch.stage, error=batch.error, payload=batch.payload,
+        image_paths=batch.image_paths, metrics=batch.metrics, finished_at=batch.finished_at,
+    )
+    _log_metrics(batch)
+
+
+def _delete_source(batch):
+    if batch.source:
+        batch.source.delete(save=False)
+        ImportBatch.objects.filter(pk=batch.pk).update(source='')
+
+
+def process_import_batch(batch):
+    """Batch-ті өңдейді. Оны басқа worker қайта алса (heartbeat ескірсе), бұл жұмыс ештеңе жазбай тоқтайды,
+    ал бастапқы файл жаңа иесіне қалады."""
+    try:
+        with _Heartbeat(batch) as heartbeat:
+            _process_import_batch(batch, heartbeat)
+    except ImportBatchLost:
+        logger.warning('Question import %s was reclaimed by another worker, dropping this run', batch.import_id)
+
+    return batch
+
+
+def _process_import_batch(batch, heartbeat):
+    if batch.attempts > settings.QUESTION_IMPORT_MAX_ATTEMPTS:
+        _finish_batch(batch, ImportBatch.Status.FAILED, _('The import took too long. Please try again.'))
+        _delete_source(batch)
+        return
+
+    streamed = _StreamedResults(batch, heartbeat)
+    metrics = ImportMetrics()
+
+    try:
+        with batch.source.open('rb') as source:
+            file_bytes = source.read()
+
+        with ai_request_key(batch.import_id):
+            result = run_question_import(
+                file_bytes, batch.format_code,
+                on_stage=lambda stage: _set_stage(batch, stage),
+                on_question=streamed.add,
+                metrics=metrics,
+            )
+    except ImportBatchLost:
+        raise
+    except QuestionImportError as error:
+        _finish_batch(batch, ImportBatch.Status.FAILED, error, metrics)
+        _delete_source(batch)
+        return
+    except Exception:
+        logger.exception('Question import %s failed', batch.import_id)
+        _finish_batch(
+            batch, ImportBatch.Status.FAILED,
+            _('Something went wrong while importing the file. Please try again.'), metrics,
+        )
+        _delete_source(batch)
+        return
+
+    supported = [q for q in result.questions if q.is_supported_for(batch.format_code)]
+    unsupported = [q for q in result.questions if not q.is_supported_for(batch.format_code)]
+
+    if not supported:
+        _finish_batch(batch, ImportBatch.Status.FAILED, _('No importable questions were found in this file.'), metrics)
+        _delete_source(batch)
+        return
+
+    _mark_duplicates(batch, supported)
+    batch.set_results(
+        [asdict(question) for question in supported],
+        [asdict(question) for question in unsupported],
+    )
+    batch.image_paths = result.image_paths
+    _finish_batch(batch, ImportBatch.Status.DONE, metrics=result.metrics)
+    _delete_source(batch)
+
+
+def merge_import_batches(batches):
+    """Топтың біткен импорттарын бір review-ға біріктіреді: сұрақтар файл ретімен тізіледі, ал топтағы
+    импорттар жабылады. Жаңа (DONE) импортты қайтарады."""
+    first = batches[0]
+    questions, unsupported, image_paths = [], [], []
+
+    for batch in batches:
+        if batch.status != ImportBatch.Status.DONE:
+            continue
+
+        batch_questions, batch_unsupported = batch.get_results()
+        questions.extend(batch_questions)
+        unsupported.extend(batch_unsupported)
+        image_paths.extend(path for path in batch.image_paths if path not in image_paths)
+
+    now = timezone.now()
+    merged = ImportBatch(
+        import_id=uuid.uuid4().hex, author_id=first.author_id, subject_id=first.subject_id,
+        topic_id=first.topic_id, format_id=first.format_id, status=ImportBatch.Status.DONE,
+        stage=ImportBatch.Stage.FINISHED, image_paths=image_paths, started_at=now, finished_at=now,
+    )
+    merged.set_results(questions, unsupported)
+
+    with transaction.atomic():
+        merged.save()
+        ImportBatch.objects.filter(pk__in=[batch.pk for batch in batches]).update(is_active=False, updated_at=now)
+
+    return merged
+
+
+def save_import_item(batch, index, question):
+    """Review бетінде өңделген бір сұрақты (`ParsedQuestion`) импорт нәтижесіне жазады. Мұғалім бірнеше
+    сұрақты қатар сақтауы мүмкін, сондықтан payload құлыппен қайта оқылады."""
+    with transaction.atomic():
+        locked = ImportBatch.objects.select_for_update().get(pk=batch.pk)
+        questions, unsupported = locked.get_results()
+        questions[index] = asdict(question)
+        locked.set_results(questions, unsupported)
+        locked.save(update_fields=['payload', 'updated_at'])
+
+    batch.payload = locked.payload
+    return batch
+
+
+def discard_import_batch(batch):
+    # Суреттер мазмұн хэші бойынша басқа импорттар мен сұрақтарға ортақ болуы мүмкін, сондықтан мұнда өшірілмейді.
+    if batch.source:
+        batch.source.delete(save=False)
+
+    batch.is_active = False
+    batch.save(update_fields=['is_active', 'source', 'updated_at'])
+    return batch
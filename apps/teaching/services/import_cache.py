@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from apps.teaching.models import ImportResultCache
+from core.utils.compression import compress_json, decompress_json
+
+
+def get_cached_import_payload(key):
+    now = timezone.now()
+    entry = (
+        ImportResultCache.objects
+        .filter(key=key, updated_at__gte=now - timedelta(seconds=settings.QUESTION_IMPORT_CACHE_TTL))
+        .only('pk', 'payload')
+        .first()
+    )
+
+    if entry is None:
+        return None
+
+    ImportResultCache.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=now)
+    return decompress_json(entry.payload)
+
+
+def store_import_payload(key, *, file_hash, format_code, model, payload):
+    encoded = compress_json(payload)
+
+    try:
+        ImportResultCache.objects.update_or_create(
+            key=key,
+            defaults={
+                'file_hash': file_hash, 'format_code': format_code, 'model': model,
+                'payload': encoded, 'size': len(encoded), 'last_used_at': timezone.now(),
+            },
+        )
+    except IntegrityError:
+        # Екі worker бір файлды қатар өңдеп, бірдей кілтті бір мезетте жазды — біреуі жеткілікті.
+        pass
+
+    evict_import_cache()
+
+
+def evict_import_cache():
+    # TTL соңғы жазудан (`updated_at`) саналады: `update_or_create` оны жаңартады, `created_at`-ты емес.
+    expired_before = timezone.now() - timedelta(seconds=settings.QUESTION_IMPORT_CACHE_TTL)
+    ImportResultCache.objects.filter(updated_at__lt=expired_before).delete()
+
+    total = ImportResultCache.objects.aggregate(total=Sum('size'))['total'] or 0
+    overflow = total - settings.QUESTION_IMPORT_CACHE_MAX_SIZE
+    if overflow <= 0:
+        return
+
+    stale_ids = []
+    for pk, size in ImportResultCache.objects.order_by('last_used_at').values_list('pk', 'size').iterator():
+        stale_ids.append(pk)
+        overflow -= size
+        if overflow <= 0:
+            break
+
+    ImportResultCache.objects.filter(pk__in=stale_ids).delete()
@@ -0,0 +1,151 @@
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from apps.catalog.selectors import iter_question_html
+from apps.teaching.models import ImportBatch, ImportImage
+
+IMPORT_MEDIA_PREFIX = 'core/questions/'
+LEGACY_IMPORTS_DIR = 'core/questions/imports/'
+IMPORT_MEDIA_PATH_RE = re.compile(r'core/questions/(?:images|imports)/[^"\'\s<>?#]+')
+
+
+@dataclass
+class CleanupStats:
+    batches: int = 0
+    images: int = 0
+    files: int = 0
+    bytes: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    @property
+    def files_per_second(self):
+        return self.files / self.elapsed if self.elapsed else 0
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _file_size(path):
+    try:
+        return default_storage.size(path)
+    except (OSError, NotImplementedError):
+        return 0
+
+
+def _delete_file(path, stats, dry_run):
+    stats.files += 1
+    stats.bytes += _file_size(path)
+    if not dry_run:
+        default_storage.delete(path)
+
+
+def _live_batches(cutoff):
+    return ImportBatch.objects.filter(is_active=True, updated_at__gte=cutoff)
+
+
+def _referenced_paths(cutoff):
+    paths = set()
+    for html in iter_question_html(IMPORT_MEDIA_PREFIX):
+        paths.update(IMPORT_MEDIA_PATH_RE.findall(html))
+
+    for image_paths in _live_batches(cutoff).values_list('image_paths', flat=True).iterator():
+        paths.update(image_paths)
+
+    return paths
+
+
+def _cleanup_batches(cutoff, stats, dry_run, chunk_size):
+    # Бас тартылған (is_active=False) және ұзақ уақыт ұмытылған (мұғалім бетті жауып кеткен) импорттар.
+    stale = ImportBatch.objects.exclude(pk__in=_live_batches(cutoff).values('pk'))
+
+    for source in stale.exclude(source='').values_list('source', flat=True).iterator():
+        _delete_file(source, stats, dry_run)
+
+    batch_ids = list(stale.values_list('pk', flat=True))
+    stats.batches += len(batch_ids)
+    if dry_run:
+        return
+
+    for chunk in _chunks(batch_ids, chunk_size):
+        ImportBatch.objects.filter(pk__in=chunk).delete()
+
+
+def _cleanup_images(cutoff, referenced, stats, dry_run, chunk_size):
+    # `updated_at` — соңғы қолданылған уақыт: импорт бар суретті қайта алғанда оны жаңартады
+    # (`store_import_images`), ал `image_paths` кейін жазылады.
+    orphans = [
+        (pk, path, fallback_path)
+        for pk, path, fallback_path in (
+            ImportImage.objects.filter(updated_at__lt=cutoff).values_list('pk', 'path', 'fallback_path').iterator()
+        )
+        if path not in referenced
+    ]
+
+    for chunk in _chunks(orphans, chunk_size):
+        if not dry_run:
+            # Тізім жиналғаннан бері қайта қолданылған суреттер қалады.
+            stale_ids = set(
+                ImportImage.objects
+                .filter(pk__in=[pk for pk, _path, _fallback_path in chunk], updated_at__lt=cutoff)
+                .values_list('pk', flat=True)
+            )
+            chunk = [orphan for orphan in chunk if orphan[0] in stale_ids]
+            ImportImage.objects.filter(pk__in=stale_ids, updated_at__lt=cutoff).delete()
+
+        stats.images += len(chunk)
+        for _pk, path, fallback_path in chunk:
+            # Жол өшірілгеннен кейін `store_import_images` сол хэшті қайта жазып үлгерсе — файл жаңа жолдікі.
+            if not dry_run and ImportImage.objects.filter(path=path).exists():
+                continue
+
+            _delete_file(path, stats, dry_run)
+            if fallback_path:
+                _delete_file(fallback_path, stats, dry_run)
+
+
+def _cleanup_legacy_files(cutoff, referenced, stats, dry_run):
+    # Мазмұн хэшіне көшкенге дейінгі `imports/<batch_id>/<index>` суреттері мен қалып кеткен бастапқы файлдар.
+    if not default_storage.exists(LEGACY_IMPORTS_DIR):
+        return
+
+    live_import_ids = set(_live_batches(cutoff).values_list('import_id', flat=True))
+    directories, _files = default_storage.listdir(LEGACY_IMPORTS_DIR)
+
+    for directory in directories:
+        if directory in live_import_ids:
+            continue
+
+        _subdirectories, files = default_storage.listdir(f'{LEGACY_IMPORTS_DIR}{directory}')
+        for name in files:
+            path = f'{LEGACY_IMPORTS_DIR}{directory}/{name}'
+            if path in referenced or default_storage.get_modified_time(path) >= cutoff:
+                continue
+
+            _delete_file(path, stats, dry_run)
+
+
+def cleanup_question_imports(*, older_than=None, dry_run=False, chunk_size=500):
+    """Ұмытылған импорттарды, ешбір сұрақ сілтемейтін импорт суреттерін және бастапқы файлдарды өшіреді."""
+    older_than = older_than if older_than is not None else settings.QUESTION_IMPORT_BATCH_TTL
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    stats = CleanupStats()
+
+    _cleanup_batches(cutoff, stats, dry_run, chunk_size)
+
+    referenced = _referenced_paths(cutoff)
+    _cleanup_images(cutoff, referenced, stats, dry_run, chunk_size)
+    _cleanup_legacy_files(cutoff, referenced, stats, dry_run)
+
+    return stats
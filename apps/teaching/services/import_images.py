@@ -0,0 +1,51 @@
+import hashlib
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from apps.teaching.models import ImportImage
+from core.utils.files import question_image_path
+from core.utils.images import process_images, save_image_file, save_processed_image
+
+
+def _image_extension(content_type):
+    extension = '.' + content_type.split('/')[-1].split('+')[0]
+    return '.jpg' if extension == '.jpeg' else extension
+
+
+def store_import_images(images):
+    """Суреттерді мазмұн хэші бойынша сақтайды: бұрын сақталғандары (басқа импорттардан да) бір сұраумен
+    табылып, қайта өңделмейді де, жазылмайды да (тек `updated_at` жаңарады). Жаңалары WebP болып сақталады.
+    `(urls, paths)` — `images` ретімен."""
+    hashes = [hashlib.sha256(image['blob']).hexdigest() for image in images]
+    # Алдымен `updated_at` жаңарады, сонда қайта қолданылатын суретті тазалау (`import_cleanup`) импорт
+    # `image_paths`-ын жазғанша өшірмейді; оқудан бұрын өшіріліп үлгерсе — төменде қайта сақталады.
+    ImportImage.objects.filter(file_hash__in=set(hashes)).update(updated_at=timezone.now())
+    stored = dict(ImportImage.objects.filter(file_hash__in=set(hashes)).values_list('file_hash', 'path'))
+
+    missing = {}
+    for file_hash, image in zip(hashes, images):
+        if file_hash not in stored:
+            missing.setdefault(file_hash, image)
+
+    processed_images = process_images([(image['blob'], image['content_type']) for image in missing.values()])
+
+    created = []
+    for (file_hash, image), processed in zip(missing.items(), processed_images):
+        if processed is None:
+            path = save_image_file(question_image_path(file_hash, _image_extension(image['content_type'])), image['blob'])
+            created.append(ImportImage(
+                file_hash=file_hash, path=path, content_type=image['content_type'], size=len(image['blob']),
+            ))
+        else:
+            path = save_processed_image(question_image_path(file_hash, ''), processed)
+            created.append(ImportImage(
+                file_hash=file_hash, path=path, content_type='image/webp', size=len(processed.webp),
+            ))
+
+        stored[file_hash] = path
+
+    ImportImage.objects.bulk_create(created, ignore_conflicts=True)
+
+    paths = [stored[file_hash] for file_hash in hashes]
+    return [default_storage.url(path) for path in paths], paths
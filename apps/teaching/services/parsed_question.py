@@ -0,0 +1,39 @@
+from dataclasses import dataclass, field
+
+SUPPORTED_FORMAT_CODES = ('test', 'matching')
+# Пішімі алдын ала таңдалмаған импорт: әр сұрақ өз форматымен (test/matching) оқылады.
+MIXED_FORMAT_CODE = 'mixed'
+
+
+@dataclass
+class ParsedOption:
+    text_html: str
+    is_correct: bool
+
+
+@dataclass
+class ParsedPair:
+    left_html: str
+    right_html: str
+
+
+@dataclass
+class ParsedQuestion:
+    format_code: str
+    level: str
+    text_html: str
+    variant_code: str = 'single'
+    options: list = field(default_factory=list)
+    pairs: list = field(default_factory=list)
+    warning: str = ''
+    # Пәнде бар ұқсас сұрақтар: `[{'id', 'preview', 'similarity'}, ...]`.
+    duplicates: list = field(default_factory=list)
+    # Review бетінде мұғалім өзгертеді: сұрақ сақтала ма және оның уақыт шегі (секунд).
+    include: bool = True
+    time_limit: int = 30
+
+    def is_supported_for(self, format_code):
+        if format_code == MIXED_FORMAT_CODE:
+            return self.format_code in SUPPORTED_FORMAT_CODES
+
+        return self.format_code == format_code
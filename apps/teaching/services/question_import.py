@@ -1,63 +1,89 @@
 import base64
+import contextvars
+import copy
+import hashlib
 import json
+import logging
+import queue
+import random
 import re
-import subprocess
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from pathlib import Path
 
 import anthropic
+import httpx
 from django.conf import settings
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
 from django.utils.translation import gettext_lazy as _
 
-from core.utils.files import question_import_image_path
+from apps.teaching.services.docx_questions import extract_docx_questions, ordered_image_blips
+from apps.teaching.services.import_cache import get_cached_import_payload, store_import_payload
+from apps.teaching.services.import_images import store_import_images
+from apps.teaching.services.parsed_question import (
+    MIXED_FORMAT_CODE, SUPPORTED_FORMAT_CODES, ParsedOption, ParsedPair, ParsedQuestion,
+)
+from core.utils.ai_client import get_ai_client
+from core.utils.ai_limiter import AILimiterTimeout
+from core.utils.json_stream import JsonArrayItemStream
+from core.utils.office import OfficeConversionError, convert_document, converter_backend
+from core.utils.pdf import PdfError, count_images_per_page, extract_images, is_pdf, split_page_range
+from core.utils.text import html_to_plain_text, normalize_html_text
+
+logger = logging.getLogger(__name__)
 
 IMAGE_PLACEHOLDER_RE = re.compile(r'\{\{\s*img\s*:\s*(\d+)\s*\}\}')
+# Ағын ортасында `error` оқиғасымен келетін, қайталауға болатын қателер.
+TRANSIENT_ERROR_TYPES = {'overloaded_error', 'api_error', 'rate_limit_error', 'timeout_error'}
+CONTINUATION_ANCHOR_LENGTH = 200
+# Бөлік шекарасында және жалғастың басында қайталанған деп тексерілетін сұрақтар саны.
+BOUNDARY_QUESTIONS = 3
+
+_OPTIONS_SCHEMA = {
+    'type': 'array',
+    'items': {
+        'type': 'object',
+        'properties': {
+            'text_html': {'type': 'string'},
+            'is_correct': {'type': 'boolean'},
+        },
+        'required': ['text_html', 'is_correct'],
+        'additionalProperties': False,
+    },
+}
+
+_PAIRS_SCHEMA = {
+    'type': 'array',
+    'items': {
+        'type': 'object',
+        'properties': {
+            'left_html': {'type': 'string'},
+            'right_html': {'type': 'string'},
+        },
+        'required': ['left_html', 'right_html'],
+        'additionalProperties': False,
+    },
+}
+
 
 def _build_question_schema(format_code):
-    if format_code == 'matching':
-        item_properties = {
-            'format_code': {'type': 'string', 'enum': [format_code, 'unsupported']},
-            'level': {'type': 'string', 'enum': ['easy', 'medium', 'hard']},
-            'text_html': {'type': 'string'},
-            'pairs': {
-                'type': 'array',
-                'items': {
-                    'type': 'object',
-                    'properties': {
-                        'left_html': {'type': 'string'},
-                        'right_html': {'type': 'string'},
-                    },
-                    'required': ['left_html', 'right_html'],
-                    'additionalProperties': False,
-                },
-            },
-            'warning': {'type': 'string'},
-        }
-        required = ['format_code', 'level', 'text_html', 'pairs', 'warning']
-    else:
-        item_properties = {
-            'format_code': {'type': 'string', 'enum': [format_code, 'unsupported']},
-            'variant_code': {'type': 'string', 'enum': ['single', 'multiple']},
-            'level': {'type': 'string', 'enum': ['easy', 'medium', 'hard']},
-            'text_html': {'type': 'string'},
-            'options': {
-                'type': 'array',
-                'items': {
-                    'type': 'object',
-                    'properties': {
-                        'text_html': {'type': 'string'},
-                        'is_correct': {'type': 'boolean'},
-                    },
-                    'required': ['text_html', 'is_correct'],
-                    'additionalProperties': False,
-                },
-            },
-            'warning': {'type': 'string'},
-        }
-        required = ['format_code', 'variant_code', 'level', 'text_html', 'options', 'warning']
+    format_codes = list(SUPPORTED_FORMAT_CODES) if format_code == MIXED_FORMAT_CODE else [format_code]
+    has_options = format_code != 'matching'
+    has_pairs = format_code != 'test'
+
+    # Аралас файлда бір схема екі пішінді де қамтиды: тестте `pairs`, сәйкестендіруде `options` бос болады.
+    item_properties = {
+        'format_code': {'type': 'string', 'enum': [*format_codes, 'unsupported']},
+        **({'variant_code': {'type': 'string', 'enum': ['single', 'multiple']}} if has_options else {}),
+        'level': {'type': 'string', 'enum': ['easy', 'medium', 'hard']},
+        'text_html': {'type': 'string'},
+        **({'options': _OPTIONS_SCHEMA} if has_options else {}),
+        **({'pairs': _PAIRS_SCHEMA} if has_pairs else {}),
+        'warning': {'type': 'string'},
+    }
+    required = list(item_properties)
 
     return {
         'type': 'object',
@@ -117,6 +143,30 @@ _MATCHING_IMPORT_PROMPT_RULES = """\
    they are laid out in the source.
 """
 
+_MIXED_IMPORT_PROMPT_RULES = """\
+3. "format_code": the document may mix question types. Use "test" for single-choice or multiple-choice \
+   questions that have a list of answer options where one or more are marked/known to be correct, and \
+   "matching" for matching-type questions that present two columns/lists of items where each item on the \
+   left must be paired with exactly one item on the right (сәйкестендіру). Use "unsupported" for anything \
+   else (fill-in-the-blank, open-ended/essay questions, etc.) — for those, still fill in "text_html" with \
+   the question text, and explain briefly in "warning" why it was not imported.
+4. "options" is filled only for "test" questions and "pairs" only for "matching" questions; leave the other \
+   one as an empty array. "variant_code": "single" if exactly one option is correct, "multiple" if more than \
+   one option is correct; for other questions, set it to "single" as a placeholder. List every pair in the \
+   exact order it appears in the source.
+5. "level": infer the difficulty (easy/medium/hard) from the question's complexity. Default to "medium" \
+   if you cannot tell.
+6. "text_html", each option's "text_html" and each pair's "left_html"/"right_html" must be plain HTML \
+   fragments (no <html>/<body> wrapper). Use <p>, <ul>/<ol>/<li>, and <table>/<tr>/<td> tags to preserve \
+   paragraphs, lists, and tables exactly as they are laid out in the source.
+"""
+
+_IMPORT_PROMPT_RULES = {
+    'test': _TEST_IMPORT_PROMPT_RULES,
+    'matching': _MATCHING_IMPORT_PROMPT_RULES,
+    MIXED_FORMAT_CODE: _MIXED_IMPORT_PROMPT_RULES,
+}
+
 _IMPORT_PROMPT_OUTRO = """\
 7. Mathematical formulas: transcribe every formula into LaTeX and wrap it exactly like this — inline: \
    <span class="math-tex">\\(x^2+1\\)</span>, display/block: <span class="math-tex">\\[x^2+1\\]</span>. \
@@ -130,114 +180,110 @@ _IMPORT_PROMPT_OUTRO = """\
 """
 
 
-def _build_import_prompt(format_code):
-    rules = _MATCHING_IMPORT_PROMPT_RULES if format_code == 'matching' else _TEST_IMPORT_PROMPT_RULES
-    return _IMPORT_PROMPT_INTRO + rules + _IMPORT_PROMPT_OUTRO
-
+_IMPORT_PROMPT_SCHEMA = """
+The response must be a single JSON object that matches this JSON schema:
+{schema}
+"""
 
-@dataclass
-class ParsedOption:
-    text_html: str
-    is_correct: bool
+_IMPORT_PROMPT_DOCUMENT = """\
+Extract every question from the attached document.
+"""
 
+_IMPORT_PROMPT_PART = """\
+The attached PDF holds only pages {first}–{last} of a longer document ({total} pages). Extract only the \
+questions that begin on pages {first}–{owned_last}; any later pages are included only so that a question \
+crossing the page boundary can be read to its end. If the first page starts in the middle of a question \
+that began on an earlier page, skip that fragment.
+Number the images of this PDF only, starting at 1 with the first image on its first page, and count the \
+images inside skipped fragments too.
+"""
 
-@dataclass
-class ParsedPair:
-    left_html: str
-    right_html: str
+_IMPORT_PROMPT_CONTINUATION = """\
+An earlier answer for this document was cut off after {count} questions. The last question it finished \
+begins with: "{last_text}"
+Continue with the question that follows it. Do not repeat the questions before it, and keep numbering the \
+images from the start of the PDF as before.
+"""
 
 
 @dataclass
-class ParsedQuestion:
-    format_code: str
-    level: str
-    text_html: str
-    variant_code: str = 'single'
-    options: list = field(default_factory=list)
-    pairs: list = field(default_factory=list)
-    warning: str = ''
+class DocumentPart:
+    first_page: int
+    last_page: int
+    owned_last_page: int
+    total_pages: int
+    image_offset: int = 0
 
-    def is_supported_for(self, format_code):
-        return self.format_code == format_code
 
+def _build_system_prompt(format_code):
+    """Формат бойынша өзгермейтін нұсқау мен схема — prompt cache-тің префиксі, құжатқа тәуелді ештеңе жоқ."""
+    rules = _IMPORT_PROMPT_RULES.get(format_code, _TEST_IMPORT_PROMPT_RULES)
+    schema = json.dumps(_build_question_schema(format_code), sort_keys=True, indent=1)
+    return _IMPORT_PROMPT_INTRO + rules + _IMPORT_PROMPT_OUTRO + _IMPORT_PROMPT_SCHEMA.format(schema=schema)
 
-class QuestionImportError(Exception):
-    pass
 
+def _build_import_prompt(format_code, part=None, done=()):
+    if part is None:
+        prompt = _IMPORT_PROMPT_DOCUMENT
+    else:
+        prompt = _IMPORT_PROMPT_PART.format(
+            first=part.first_page + 1, last=part.last_page + 1,
+            owned_last=part.owned_last_page + 1, total=part.total_pages,
+        )
 
-def _convert_docx_to_pdf(docx_bytes):
-    with tempfile.TemporaryDirectory() as tmpdir:
-        docx_path = Path(tmpdir) / 'source.docx'
-        docx_path.write_bytes(docx_bytes)
+    if done:
+        prompt += _IMPORT_PROMPT_CONTINUATION.format(
+            count=len(done), last_text=_question_plain_text(done[-1])[:CONTINUATION_ANCHOR_LENGTH],
+        )
 
-        profile_dir = Path(tmpdir) / 'lo_profile'
-        try:
-            subprocess.run(
-                [
-                    'soffice', '--headless', '--norestore',
-                    f'-env:UserInstallation=file://{profile_dir}',
-                    '--convert-to', 'pdf', '--outdir', tmpdir, str(docx_path),
-                ],
-                check=True, capture_output=True, timeout=120,
-            )
-        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as error:
-            raise QuestionImportError(_('Could not convert the document. Please check the file and try again.')) from error
+    return prompt
 
-        pdf_path = docx_path.with_suffix('.pdf')
-        if not pdf_path.exists():
-            raise QuestionImportError(_('Could not convert the document. Please check the file and try again.'))
 
-        return pdf_path.read_bytes()
+class QuestionImportError(Exception):
+    pass
 
 
-_DRAWING_BLIP_TAG = '{http://schemas.openxmlformats.org/drawingml/2006/main}blip'
-_RELATIONSHIP_EMBED_ATTR = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed'
+def _convert_docx_to_pdf(docx_bytes):
+    try:
+        return convert_document(docx_bytes, source_suffix='.docx', target='pdf')
+    except OfficeConversionError as error:
+        raise QuestionImportError(_('Could not convert the document. Please check the file and try again.')) from error
 
 
-def _extract_ordered_images(docx_bytes):
+def _load_document(docx_bytes):
     from docx import Document
 
     with tempfile.NamedTemporaryFile(suffix='.docx') as tmp:
         tmp.write(docx_bytes)
         tmp.flush()
-        document = Document(tmp.name)
-
-        images = []
-        for blip in document.element.body.iter(_DRAWING_BLIP_TAG):
-            r_id = blip.get(_RELATIONSHIP_EMBED_ATTR)
-            if not r_id:
-                continue
-
-            try:
-                part = document.part.related_parts[r_id]
-            except KeyError:
-                continue
+        return Document(tmp.name)
 
-            images.append({'blob': part.blob, 'content_type': part.content_type})
 
-        return images
+def _extract_ordered_images(document):
+    return [
+        {'blob': part.blob, 'content_type': part.content_type}
+        for _blip, part in ordered_image_blips(document)
+    ]
 
 
-def _store_images(images, batch_id):
-    urls = []
-    paths = []
-    for index, image in enumerate(images, start=1):
-        extension = '.' + image['content_type'].split('/')[-1].split('+')[0]
-        if extension == '.jpeg':
-            extension = '.jpg'
+def _extract_pdf_images(pdf_bytes):
+    try:
+        return extract_images(pdf_bytes)
+    except PdfError as error:
+        raise QuestionImportError(_('Could not read the PDF file. Please check the file and try again.')) from error
 
-        path = question_import_image_path(batch_id, index, extension)
-        saved_path = default_storage.save(path, ContentFile(image['blob']))
-        urls.append(default_storage.url(saved_path))
-        paths.append(saved_path)
 
-    return urls, paths
+def _store_ordered_images(images):
+    # PDF-тің ашылмаған суреті `None`: оның нөмірі бос қалады, сұрақта «сурет табылмады» болып көрінеді.
+    urls, paths = store_import_images([image for image in images if image is not None])
+    urls = iter(urls)
+    return [None if image is None else next(urls) for image in images], paths
 
 
 def _substitute_image_placeholders(html, image_urls):
     def replace(match):
         index = int(match.group(1))
-        if 1 <= index <= len(image_urls):
+        if 1 <= index <= len(image_urls) and image_urls[index - 1]:
             return f'<img src="{image_urls[index - 1]}" alt="">'
 
         return '<span class="text-danger">[' + str(_('image not found')) + ']</span>'
@@ -245,86 +291,572 @@ def _substitute_image_placeholders(html, image_urls):
     return IMAGE_PLACEHOLDER_RE.sub(replace, html)
 
 
-def _call_claude(pdf_bytes, format_code):
-    client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+def _build_request(encoded, format_code, part=None, done=()):
+    return {
+        'model': settings.QUESTION_IMPORT_MODEL,
+        'max_tokens': 64000,
+        'thinking': {'type': 'adaptive'},
+        'output_config': {
+            'effort': 'high',
+            'format': {'type': 'json_schema', 'schema': _build_question_schema(format_code)},
+        },
+        # Нұсқау мен схема кэштеледі: сол форматтағы келесі импорттар оларды қайта prefill етпейді.
+        'system': [{
+            'type': 'text',
+            'text': _build_system_prompt(format_code),
+            'cache_control': {'type': 'ephemeral'},
+        }],
+        'messages': [{
+            'role': 'user',
+            'content': [
+                {
+                    'type': 'document',
+                    'source': {'type': 'base64', 'media_type': 'application/pdf', 'data': encoded},
+                },
+                {'type': 'text', 'text': _build_import_prompt(format_code, part, done)},
+            ],
+        }],
+    }
+
+
+def _is_transient_error(error):
+    if isinstance(error, (httpx.TransportError, anthropic.APIConnectionError, anthropic.RateLimitError)):
+        return True
+
+    if isinstance(error, anthropic.APIStatusError):
+        # Ағын ортасындағы `error` оқиғасы 200 статуспен келеді — түрі денеде.
+        error_type = (error.body or {}).get('error', {}).get('type') if isinstance(error.body, dict) else None
+        return error.status_code >= 500 or error_type in TRANSIENT_ERROR_TYPES
+
+    return False
+
+
+def _retry_delay(attempt):
+    delay = min(settings.QUESTION_IMPORT_AI_BACKOFF * 2 ** attempt, settings.QUESTION_IMPORT_AI_BACKOFF_MAX)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _stream_response(request, on_item, metrics=None):
+    started_at = time.perf_counter()
+    first_event = True
+
+    with get_ai_client().stream(**request) as stream:
+        # Әр сұрақ JSON-да жабылған сәтте-ақ беріледі — мұғалім бүкіл жауапты күтпейді.
+        items = JsonArrayItemStream('questions')
+        for event in stream:
+            if first_event and metrics is not None:
+                metrics.record_first_token(time.perf_counter() - started_at)
+            first_event = False
+
+            if event.type != 'text':
+                continue
+
+            for raw in items.feed(event.text):
+                on_item(raw)
+
+        response = stream.get_final_message()
+
+    if metrics is not None:
+        metrics.add_usage(response)
+
+    return response
+
+
+def _unfinished_question(done):
+    return {
+        'format_code': 'unsupported',
+        'level': 'medium',
+        'text_html': '<p>' + str(_('Questions after “{}”').format(_question_plain_text(done[-1])[:80])) + '</p>',
+        'options': [],
+        'pairs': [],
+        'warning': str(_('The AI service stopped before the end of the document. Add the remaining questions manually.')),
+    }
+
+
+def _call_claude(pdf_bytes, format_code, part=None, on_question=None, metrics=None):
+    """Құжатты Claude-қа оқытады. Ағын өтпелі қатемен үзілсе немесе `max_tokens`-ке жетсе, сол уақытқа дейін
+    толық келген сұрақтар сақталады, ал келесі әрекет (exponential backoff-пен) тек құжаттың қалғанын сұрайды.
+
+    Әрекеттер біткенде де сұрақтар болса, олар `incomplete` белгісімен және «қалғанын қолмен қосыңыз»
+    элементімен қайтарылады; ештеңе оқылмаса — `QuestionImportError`.
+    """
     encoded = base64.standard_b64encode(pdf_bytes).decode('utf-8')
+    done = []
+    error = None
+    received = 0
+    overlap = set()
+
+    def keep(raw):
+        done.append(raw)
+        if on_question is not None:
+            on_question(raw)
+
+    def collect(raw):
+        nonlocal received
+        position = received
+        received += 1
+        # Жалғасы алдыңғы әрекет сақтаған соңғы сұрақтарды қайталауы мүмкін.
+        if not _is_boundary_repeat(raw, position, overlap):
+            keep(raw)
+
+    for attempt in range(settings.QUESTION_IMPORT_AI_RETRIES + 1):
+        if attempt:
+            if metrics is not None:
+                metrics.add_retry()
+            time.sleep(_retry_delay(attempt - 1))
+
+        received = 0
+        overlap = _boundary_fingerprints(done)
 
-    try:
-        with client.messages.stream(
-            model=settings.QUESTION_IMPORT_MODEL,
-            max_tokens=64000,
-            thinking={'type': 'adaptive'},
-            output_config={
-                'effort': 'high',
-                'format': {'type': 'json_schema', 'schema': _build_question_schema(format_code)},
-            },
-            messages=[{
-                'role': 'user',
-                'content': [
-                    {
-                        'type': 'document',
-                        'source': {'type': 'base64', 'media_type': 'application/pdf', 'data': encoded},
-                    },
-                    {'type': 'text', 'text': _build_import_prompt(format_code)},
-                ],
-            }],
-        ) as stream:
-            response = stream.get_final_message()
-    except anthropic.APIError as error:
+        try:
+            response = _stream_response(_build_request(encoded, format_code, part, tuple(done)), collect, metrics)
+        except (anthropic.APIError, httpx.TransportError) as stream_error:
+            error = stream_error
+            if not _is_transient_error(stream_error):
+                break
+            logger.warning('AI stream failed after %s questions (%r), retrying', len(done), stream_error)
+            continue
+        except AILimiterTimeout as limiter_error:
+            error = limiter_error
+            break
+
+        if response.stop_reason == 'refusal':
+            raise QuestionImportError(_('The AI service declined to process this file.'))
+
+        text_block = next((block.text for block in response.content if block.type == 'text'), '')
+        try:
+            json.loads(text_block)
+        except json.JSONDecodeError:
+            # `max_tokens`-те кесілген немесе бұзылған жауап — жалғасы келесі сұраумен алынады.
+            error = None
+            continue
+
+        return {'questions': done}
+
+    if not done:
+        if isinstance(error, AILimiterTimeout):
+            raise QuestionImportError(_('The AI service is busy right now. Please try again later.')) from error
+        if error is None:
+            raise QuestionImportError(_('The AI service returned an unreadable response.'))
         raise QuestionImportError(_('The AI service could not process the file. Please try again later.')) from error
 
-    if response.stop_reason == 'refusal':
-        raise QuestionImportError(_('The AI service declined to process this file.'))
+    keep(_unfinished_question(done))
+    return {'questions': done, 'incomplete': True}
 
-    text_block = next((block.text for block in response.content if block.type == 'text'), None)
-    if not text_block:
-        raise QuestionImportError(_('The AI service returned an empty response.'))
 
-    try:
-        return json.loads(text_block)
-    except json.JSONDecodeError as error:
-        raise QuestionImportError(_('The AI service returned an unreadable response.')) from error
+def _plan_document_parts(images_per_page):
+    total_pages = len(images_per_page)
+    size = settings.QUESTION_IMPORT_PART_PAGES
+    overlap = settings.QUESTION_IMPORT_PART_OVERLAP
+
+    if total_pages <= size + overlap:
+        return []
+
+    return [
+        DocumentPart(
+            first_page=first_page,
+            last_page=min(first_page + size - 1 + overlap, total_pages - 1),
+            owned_last_page=min(first_page + size - 1, total_pages - 1),
+            total_pages=total_pages,
+            image_offset=sum(images_per_page[:first_page]),
+        )
+        for first_page in range(0, total_pages, size)
+    ]
+
+
+def _renumber_image_placeholders(html, offset):
+    if not offset:
+        return html
+
+    return IMAGE_PLACEHOLDER_RE.sub(lambda match: '{{img:%d}}' % (int(match.group(1)) + offset), html)
+
+
+def _renumber_question(raw, offset):
+    return {
+        **raw,
+        'text_html': _renumber_image_placeholders(raw.get('text_html', ''), offset),
+        'options': [
+            {**option, 'text_html': _renumber_image_placeholders(option.get('text_html', ''), offset)}
+            for option in raw.get('options', [])
+        ],
+        'pairs': [
+            {
+                **pair,
+                'left_html': _renumber_image_placeholders(pair.get('left_html', ''), offset),
+                'right_html': _renumber_image_placeholders(pair.get('right_html', ''), offset),
+            }
+            for pair in raw.get('pairs', [])
+        ],
+    }
+
+
+def _question_plain_text(raw):
+    return html_to_plain_text(raw.get('text_html', ''))
+
+
+def _question_fingerprint(raw):
+    # Түбірі бірдей («Дұрыс жауапты таңдаңыз.») әртүрлі сұрақтар нұсқалары/жұптары арқылы ажыратылады.
+    parts = [raw.get('text_html', '')]
+    parts.extend(option.get('text_html', '') for option in raw.get('options', []))
+    for pair in raw.get('pairs', []):
+        parts.extend((pair.get('left_html', ''), pair.get('right_html', '')))
+
+    return tuple(normalize_html_text(part) for part in parts)
+
+
+def _boundary_fingerprints(questions):
+    return {_question_fingerprint(raw) for raw in questions[-BOUNDARY_QUESTIONS:]}
+
+
+def _is_boundary_repeat(raw, position, boundary_fingerprints):
+    """Бөліктің (немесе жалғастың) алғашқы `BOUNDARY_QUESTIONS` сұрағы ғана алдыңғының соңымен салыстырылады —
+    одан әрі кездескен бірдей сұрақ құжаттың өзінде қайталанған."""
+    return position < BOUNDARY_QUESTIONS and _question_fingerprint(raw) in boundary_fingerprints
+
+
+def _failed_part_question(part):
+    return {
+        'format_code': 'unsupported',
+        'level': 'medium',
+        'text_html': '<p>' + str(_('Pages {}–{}').format(part.first_page + 1, part.owned_last_page + 1)) + '</p>',
+        'options': [],
+        'pairs': [],
+        'warning': str(_('These pages could not be read. Add their questions manually.')),
+    }
+
+
+def _merge_part_payloads(part_payloads):
+    merged = []
+    boundary_fingerprints = set()
+
+    for part, payload in part_payloads:
+        if payload is None:
+            merged.append(_failed_part_question(part))
+            boundary_fingerprints = set()
+            continue
+
+        questions = [_renumber_question(raw, part.image_offset) for raw in payload.get('questions', [])]
+        merged.extend(
+            raw for position, raw in enumerate(questions)
+            if not _is_boundary_repeat(raw, position, boundary_fingerprints)
+        )
+        boundary_fingerprints = _boundary_fingerprints(questions)
+
+    incomplete = any(payload is None or payload.get('incomplete') for _part, payload in part_payloads)
+    return {'questions': merged, 'incomplete': incomplete}
+
+
+class _OrderedPartStream:
+    """Параллель бөліктерден келген сұрақтарды құжат ретімен, `_merge_part_payloads` сияқты шекарадағы
+    қайталануды алып тастап, `emit`-ке береді: келесі бөлік алдыңғысы біткенше буферде тұрады."""
+
+    def __init__(self, parts, emit):
+        self.parts = parts
+        self.emit = emit
+        self.buffers = [[] for _part in parts]
+        self.finished = [False] * len(parts)
+        self.current = 0
+        self.emitted = 0
+        self.boundary_fingerprints = set()
+
+    def add(self, index, raw):
+        self.buffers[index].append(_renumber_question(raw, self.parts[index].image_offset))
+        self._flush()
+
+    def finish(self, index, failed):
+        if failed:
+            self.buffers[index] = self.buffers[index][:self.emitted] if index == self.current else []
+            self.buffers[index].append(_failed_part_question(self.parts[index]))
+
+        self.finished[index] = True
+        self._flush()
+
+    def _flush(self):
+        while self.current < len(self.parts):
+            buffer = self.buffers[self.current]
+            while self.emitted < len(buffer):
+                raw = buffer[self.emitted]
+                if not _is_boundary_repeat(raw, self.emitted, self.boundary_fingerprints):
+                    self.emit(raw)
+                self.emitted += 1
+
+            if not self.finished[self.current]:
+                return
+
+            self.boundary_fingerprints = _boundary_fingerprints(buffer)
+            self.current += 1
+            self.emitted = 0
+
+
+def _extract_in_parts(pdf_bytes, format_code, parts, on_question=None, metrics=None):
+    events = queue.Queue()
+
+    def extract(index, part):
+        try:
+            return _call_claude(
+                split_page_range(pdf_bytes, part.first_page, part.last_page), format_code, part,
+                on_question=lambda raw: events.put((index, raw)), metrics=metrics,
+            )
+        except QuestionImportError:
+            logger.warning('Question import part %s–%s failed', part.first_page + 1, part.last_page + 1, exc_info=True)
+            return None
+        finally:
+            events.put((index, None))
+
+    # Бөліктер өз ағындарында жүреді, ал `on_question` тек осы (шақырушы) ағында шақырылады.
+    stream = _OrderedPartStream(parts, on_question or (lambda raw: None))
+    with ThreadPoolExecutor(max_workers=settings.QUESTION_IMPORT_PARALLEL_PARTS) as executor:
+        # Әр бөлік шақырушының контекстін (limiter тикетінің кілтін) өз көшірмесінде алады.
+        futures = [
+            executor.submit(contextvars.copy_context().run, extract, index, part)
+            for index, part in enumerate(parts)
+        ]
+
+        remaining = len(parts)
+        while remaining:
+            index, raw = events.get()
+            if raw is not None:
+                stream.add(index, raw)
+                continue
+
+            stream.finish(index, failed=futures[index].result() is None)
+            remaining -= 1
+
+        payloads = [future.result() for future in futures]
+
+    if all(payload is None for payload in payloads):
+        raise QuestionImportError(_('The AI service could not process the file. Please try again later.'))
+
+    return _merge_part_payloads(list(zip(parts, payloads)))
+
+
+def _extract_questions(pdf_bytes, format_code, on_question=None, metrics=None, image_count=None):
+    """`image_count` — `{{img:N}}` нөмірленетін суреттер саны (docx blip-тері). Бөліктердің сурет ығысуы PDF
+    суреттерінен саналады; саны сәйкес келмесе (EMF/VML, қайталанған сурет), құжат бөлінбей бір рет оқылады."""
+    images_per_page = count_images_per_page(pdf_bytes)
+    if metrics is not None:
+        metrics.pages = len(images_per_page)
+
+    parts = _plan_document_parts(images_per_page)
+    if parts and image_count is not None and sum(images_per_page) != image_count:
+        logger.warning(
+            'PDF has %s images but the document has %s, reading it in one part', sum(images_per_page), image_count,
+        )
+        parts = []
+
+    if not parts:
+        return _call_claude(pdf_bytes, format_code, on_question=on_question, metrics=metrics)
+
+    return _extract_in_parts(pdf_bytes, format_code, parts, on_question, metrics)
+
+
+USAGE_FIELDS = ('input_tokens', 'output_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens')
+
+
+class ImportMetrics:
+    """Бір импорттың өлшемдері: кезеңдер ұзақтығы (секунд), Claude `usage` (барлық бөліктердің қосындысы),
+    бет/сурет/сұрақ саны. `method` — rules (Claude-сыз), cache (дайын нәтиже) немесе ai. `converter` — docx-ті
+    PDF-ке кім айналдырды: pool немесе бір реттік soffice (`uno` жоқ кезде пул осыған түседі).
+
+    Ойлау (thinking) токендерін API бөлек бермейді — олар `output_tokens` ішінде есептеледі.
+    """
+
+    def __init__(self):
+        self.method = 'rules'
+        self.model = ''
+        self.timings = {}
+        self.usage = dict.fromkeys(USAGE_FIELDS, 0)
+        self.requests = 0
+        self.retries = 0
+        self.pages = None
+        self.converter = ''
+        self.images = 0
+        self.questions = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started_at
+
+    def record_first_token(self, seconds):
+        # Бөліктер параллель жүреді — ең ерте келген алғашқы оқиға саналады.
+        with self._lock:
+            self.timings['first_token'] = min(self.timings.get('first_token', seconds), seconds)
+
+    def add_usage(self, response):
+        # Бөліктер параллель ағындарда бітеді.
+        with self._lock:
+            self.requests += 1
+            self.model = response.model or self.model
+            for name in USAGE_FIELDS:
+                self.usage[name] += getattr(response.usage, name, None) or 0
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def as_dict(self):
+        return {
+            'method': self.method,
+            'model': self.model,
+            'timings': {name: round(seconds, 3) for name, seconds in self.timings.items()},
+            'usage': dict(self.usage),
+            'requests': self.requests,
+            'retries': self.retries,
+            'pages': self.pages,
+            'converter': self.converter,
+            'images': self.images,
+            'questions': self.questions,
+        }
 
 
 @dataclass
 class ImportResult:
     questions: list
     image_paths: list
+    metrics: ImportMetrics = field(default_factory=ImportMetrics)
 
 
-def run_question_import(docx_bytes, batch_id, format_code):
-    pdf_bytes = _convert_docx_to_pdf(docx_bytes)
-    images = _extract_ordered_images(docx_bytes)
-    payload = _call_claude(pdf_bytes, format_code)
+def _notify(on_stage, stage):
+    if on_stage is not None:
+        on_stage(stage)
 
-    image_urls, image_paths = _store_images(images, batch_id)
 
-    questions = []
-    for raw in payload.get('questions', []):
-        text_html = _substitute_image_placeholders(raw.get('text_html', ''), image_urls)
-        options = [
-            ParsedOption(
-                text_html=_substitute_image_placeholders(option.get('text_html', ''), image_urls),
-                is_correct=bool(option.get('is_correct')),
-            )
+def _prompt_version(format_code):
+    source = _build_system_prompt(format_code) + _IMPORT_PROMPT_DOCUMENT + _IMPORT_PROMPT_PART + _IMPORT_PROMPT_CONTINUATION
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def _import_cache_key(file_hash, format_code):
+    parts = (file_hash, format_code, settings.QUESTION_IMPORT_MODEL, _prompt_version(format_code))
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _question_from_raw(raw):
+    return ParsedQuestion(
+        format_code=raw.get('format_code', 'unsupported'),
+        variant_code=raw.get('variant_code', 'single'),
+        level=raw.get('level', 'medium'),
+        text_html=raw.get('text_html', ''),
+        options=[
+            ParsedOption(text_html=option.get('text_html', ''), is_correct=bool(option.get('is_correct')))
             for option in raw.get('options', [])
-        ]
-        pairs = [
-            ParsedPair(
-                left_html=_substitute_image_placeholders(pair.get('left_html', ''), image_urls),
-                right_html=_substitute_image_placeholders(pair.get('right_html', ''), image_urls),
-            )
+        ],
+        pairs=[
+            ParsedPair(left_html=pair.get('left_html', ''), right_html=pair.get('right_html', ''))
             for pair in raw.get('pairs', [])
-        ]
+        ],
+        warning=raw.get('warning', ''),
+    )
+
+
+def _substitute_question_images(question, image_urls):
+    question.text_html = _substitute_image_placeholders(question.text_html, image_urls)
+    for option in question.options:
+        option.text_html = _substitute_image_placeholders(option.text_html, image_urls)
+    for pair in question.pairs:
+        pair.left_html = _substitute_image_placeholders(pair.left_html, image_urls)
+        pair.right_html = _substitute_image_placeholders(pair.right_html, image_urls)
+
+    return question
+
+
+def _extract_with_rules(document, format_code, metrics):
+    # Қатаң үлгідегі файлдар (нөмір, A)–E), bold/кілт) Claude-сыз, құжаттың өзінен оқылады.
+    with metrics.stage('rules'):
+        questions, confidence = extract_docx_questions(document, format_code)
+
+    if confidence < settings.QUESTION_IMPORT_RULES_MIN_CONFIDENCE:
+        return None
+
+    return questions
+
+
+def _extract_with_ai(file_bytes, format_code, on_stage, on_question, metrics, image_count):
+    file_hash = hashlib.sha256(file_bytes).hexdigest()
+    cache_key = _import_cache_key(file_hash, format_code)
+    payload = get_cached_import_payload(cache_key)
+
+    if payload is not None:
+        metrics.method = 'cache'
+        questions = [_question_from_raw(raw) for raw in payload.get('questions', [])]
+        for question in questions:
+            on_question(question)
+
+        return questions
+
+    metrics.method = 'ai'
+    if is_pdf(file_bytes):
+        pdf_bytes = file_bytes
+    else:
+        _notify(on_stage, 'converting')
+        metrics.converter = converter_backend()
+        with metrics.stage('conversion'):
+            pdf_bytes = _convert_docx_to_pdf(file_bytes)
+
+    _notify(on_stage, 'extracting')
+    with metrics.stage('llm'):
+        payload = _extract_questions(
+            pdf_bytes, format_code, lambda raw: on_question(_question_from_raw(raw)), metrics, image_count,
+        )
+    if not payload.get('incomplete'):
+        store_import_payload(
+            cache_key, file_hash=file_hash, format_code=format_code,
+            model=settings.QUESTION_IMPORT_MODEL, payload=payload,
+        )
+
+    return [_question_from_raw(raw) for raw in payload.get('questions', [])]
+
+
+def run_question_import(file_bytes, format_code, on_stage=None, on_question=None, metrics=None):
+    """`file_bytes` — .docx немесе PDF. PDF LibreOffice-сіз, тікелей Claude-қа беріледі, ал суреттері
+    PDF-тің өзінен алынады.
+
+    `on_question(ParsedQuestion)` — әр сұрақ дайын болған сәтте (суреттері орнымен) шақырылады; соңғы
+    `ImportResult.questions` тізімі сол ретпен бірдей, тек бөліктер бұзылғанда ғана өзгеше болуы мүмкін.
+
+    `metrics` (`ImportMetrics`) берілсе, импорт қатемен үзілсе де шақырушыда жиналған өлшемдер қалады.
+    Кезеңдер: image_extraction, storage, rules, conversion, llm, substitution және жалпы total.
+    """
+    metrics = metrics if metrics is not None else ImportMetrics()
+    started_at = time.perf_counter()
+
+    with metrics.stage('image_extraction'):
+        if is_pdf(file_bytes):
+            document = None
+            images = _extract_pdf_images(file_bytes)
+        else:
+            document = _load_document(file_bytes)
+            images = _extract_ordered_images(document)
+
+    # Ағынмен берілетін сұрақтардағы суреттер бірден көрінуі үшін суреттер алдымен сақталады.
+    _notify(on_stage, 'storing')
+    with metrics.stage('storage'):
+        image_urls, image_paths = _store_ordered_images(images)
+    metrics.images = len(image_paths)
+
+    def emit(question):
+        if on_question is not None:
+            on_question(_substitute_question_images(copy.deepcopy(question), image_urls))
+
+    # PDF-те ережелер оқитын Word құрылымы жоқ.
+    questions = _extract_with_rules(document, format_code, metrics) if document is not None else None
+
+    if questions is not None:
+        for question in questions:
+            emit(question)
+    else:
+        # PDF-тің суреттері бөліктердің ығысуы саналатын көзден алынған, docx-тікі — blip-терден.
+        image_count = len(images) if document is not None else None
+        questions = _extract_with_ai(file_bytes, format_code, on_stage, emit, metrics, image_count)
+
+    with metrics.stage('substitution'):
+        questions = [_substitute_question_images(question, image_urls) for question in questions]
 
-        questions.append(ParsedQuestion(
-            format_code=raw.get('format_code', 'unsupported'),
-            variant_code=raw.get('variant_code', 'single'),
-            level=raw.get('level', 'medium'),
-            text_html=text_html,
-            options=options,
-            pairs=pairs,
-            warning=raw.get('warning', ''),
-        ))
-
-    return ImportResult(questions=questions, image_paths=image_paths)
+    metrics.questions = len(questions)
+    metrics.timings['total'] = time.perf_counter() - started_at
+    return ImportResult(questions=questions, image_paths=image_paths, metrics=metrics)
@@ -0,0 +1,73 @@
+from docx import Document
+from django.test import SimpleTestCase
+
+from apps.teaching.services.docx_questions import _parse_answer_key_text, extract_docx_questions
+
+
+def _document(questions, answer_key='', bold_everything=False):
+    """`questions` — `(мәтін, [(нұсқа, bold), ...])` тізімі; әр нұсқа жеке абзац."""
+    document = Document()
+    for number, (text, options) in enumerate(questions, start=1):
+        document.add_paragraph().add_run(f'{number}. {text}').bold = bold_everything
+        for letter, (option, bold) in zip('ABCDE', options):
+            document.add_paragraph().add_run(f'{letter}) {option}').bold = bold or bold_everything
+
+    if answer_key:
+        document.add_paragraph(answer_key)
+
+    return document
+
+
+def _correct(questions):
+    return [[option.is_correct for option in question.options] for question in questions]
+
+
+QUESTIONS = [
+    ('2 + 2 = ?', [('3', False), ('4', True), ('5', False)]),
+    ('Capital of France?', [('Paris', True), ('Rome', False), ('Madrid', False)]),
+]
+
+
+class ExtractDocxQuestionsTests(SimpleTestCase):
+    def test_bold_option_marks_the_answer(self):
+        questions, confidence = extract_docx_questions(_document(QUESTIONS), 'test')
+
+        self.assertEqual(_correct(questions), [[False, True, False], [True, False, False]])
+        self.assertEqual([question.variant_code for question in questions], ['single', 'single'])
+        self.assertEqual(confidence, 1.0)
+
+    def test_fully_bold_document_is_not_an_answer_key(self):
+        questions, confidence = extract_docx_questions(_document(QUESTIONS, bold_everything=True), 'test')
+
+        self.assertEqual(_correct(questions), [[False] * 3, [False] * 3])
+        self.assertEqual(confidence, 0.0)
+
+    def test_one_malformed_question_sends_the_file_to_ai(self):
+        all_bold = ('Pick one', [('x', True), ('y', True), ('z', True)])
+        questions, confidence = extract_docx_questions(_document([*QUESTIONS * 20, all_bold]), 'test')
+
+        self.assertEqual(_correct(questions)[-1], [False] * 3)
+        self.assertEqual(confidence, 0.0)
+
+    def test_answer_key_wins_over_bold(self):
+        questions, confidence = extract_docx_questions(_document(QUESTIONS, answer_key='Answers: 1-C 2-B 3-A'), 'test')
+
+        self.assertEqual(_correct(questions), [[False, False, True], [False, True, False]])
+        self.assertEqual(confidence, 1.0)
+
+    def test_other_formats_are_skipped(self):
+        self.assertEqual(extract_docx_questions(_document(QUESTIONS), 'matching'), ([], 0.0))
+
+
+class ParseAnswerKeyTextTests(SimpleTestCase):
+    def test_parses_pairs_and_cyrillic_letters(self):
+        self.assertEqual(
+            _parse_answer_key_text('Жауаптары: 1-А 2-В, 3-C 4-AC'),
+            {1: {'A'}, 2: {'B'}, 3: {'C'}, 4: {'A', 'C'}},
+        )
+
+    def test_needs_at_least_three_pairs(self):
+        self.assertEqual(_parse_answer_key_text('1-A 2-B'), {})
+
+    def test_ignores_ordinary_sentences(self):
+        self.assertEqual(_parse_answer_key_text('In 1990 A new law 2 B passed 3 C times over the years.'), {})
@@ -0,0 +1,210 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.teaching.services import question_import
+from apps.teaching.services.question_import import (
+    DocumentPart,
+    _call_claude,
+    _extract_questions,
+    _merge_part_payloads,
+    _OrderedPartStream,
+    _question_fingerprint,
+)
+
+
+def _question(text, *options):
+    return {
+        'format_code': 'test',
+        'level': 'medium',
+        'text_html': f'<p>{text}</p>',
+        'options': [{'text_html': option, 'is_correct': index == 0} for index, option in enumerate(options)],
+        'pairs': [],
+    }
+
+
+def _part(first_page, image_offset=0):
+    return DocumentPart(
+        first_page=first_page, last_page=first_page + 1, owned_last_page=first_page, total_pages=10,
+        image_offset=image_offset,
+    )
+
+
+def _texts(questions):
+    return [(raw['text_html'], [option['text_html'] for option in raw['options']]) for raw in questions]
+
+
+# Түбірі бірдей, нұсқалары әртүрлі сұрақтар — тест құжаттарында жиі кездеседі.
+SAME_STEM = [_question('Choose the correct answer.', str(number), str(number + 1)) for number in range(1, 6)]
+
+
+class QuestionFingerprintTests(SimpleTestCase):
+    def test_options_tell_same_stem_questions_apart(self):
+        self.assertNotEqual(_question_fingerprint(SAME_STEM[0]), _question_fingerprint(SAME_STEM[1]))
+
+    def test_markup_case_and_punctuation_are_ignored(self):
+        self.assertEqual(
+            _question_fingerprint(_question('<b>Capital</b> of France?', 'Paris')),
+            _question_fingerprint(_question('capital of  france', '<i>PARIS</i>')),
+        )
+
+    def test_pairs_are_part_of_the_fingerprint(self):
+        first = {'text_html': 'Match', 'pairs': [{'left_html': 'a', 'right_html': '1'}]}
+        second = {'text_html': 'Match', 'pairs': [{'left_html': 'a', 'right_html': '2'}]}
+        self.assertNotEqual(_question_fingerprint(first), _question_fingerprint(second))
+
+
+class MergePartPayloadsTests(SimpleTestCase):
+    def test_overlap_repeat_at_part_start_is_dropped(self):
+        first = [_question('Q1', 'a'), _question('Q2', 'b')]
+        second = [_question('Q2', 'b'), _question('Q3', 'c')]
+
+        merged = _merge_part_payloads([(_part(0), {'questions': first}), (_part(1), {'questions': second})])
+
+        self.assertEqual(_texts(merged['questions']), _texts([*first, second[1]]))
+        self.assertFalse(merged['incomplete'])
+
+    def test_same_stem_questions_are_kept(self):
+        merged = _merge_part_payloads([
+            (_part(0), {'questions': SAME_STEM[:3]}),
+            (_part(1), {'questions': SAME_STEM[3:]}),
+        ])
+
+        self.assertEqual(_texts(merged['questions']), _texts(SAME_STEM))
+
+    def test_repeat_after_leading_questions_is_kept(self):
+        first = [_question('Q1', 'a')]
+        second = [_question(f'Q{number}', 'x') for number in range(2, 6)] + [_question('Q1', 'a')]
+
+        merged = _merge_part_payloads([(_part(0), {'questions': first}), (_part(1), {'questions': second})])
+
+        self.assertEqual(len(merged['questions']), 6)
+
+    def test_failed_part_becomes_placeholder(self):
+        merged = _merge_part_payloads([
+            (_part(0), {'questions': [_question('Q1', 'a')]}),
+            (_part(1), None),
+            (_part(2), {'questions': [_question('Q1', 'a')]}),
+        ])
+
+        self.assertEqual([raw['format_code'] for raw in merged['questions']], ['test', 'unsupported', 'test'])
+        self.assertTrue(merged['incomplete'])
+
+    def test_image_placeholders_are_renumbered(self):
+        merged = _merge_part_payloads([(_part(1, image_offset=3), {'questions': [_question('{{img:1}}', 'a')]})])
+
+        self.assertEqual(merged['questions'][0]['text_html'], '<p>{{img:4}}</p>')
+
+
+class OrderedPartStreamTests(SimpleTestCase):
+    def test_later_parts_wait_for_earlier_ones(self):
+        emitted = []
+        stream = _OrderedPartStream([_part(0), _part(1)], emitted.append)
+
+        stream.add(1, _question('Q3', 'c'))
+        self.assertEqual(emitted, [])
+
+        stream.add(0, _question('Q1', 'a'))
+        stream.add(0, _question('Q2', 'b'))
+        stream.finish(0, failed=False)
+        stream.finish(1, failed=False)
+
+        self.assertEqual([raw['text_html'] for raw in emitted], ['<p>Q1</p>', '<p>Q2</p>', '<p>Q3</p>'])
+
+    def test_matches_merge_for_overlap_and_same_stem(self):
+        parts = [_part(0), _part(1)]
+        payloads = [SAME_STEM[:3], [SAME_STEM[2], *SAME_STEM[3:]]]
+        emitted = []
+        stream = _OrderedPartStream(parts, emitted.append)
+        for index, questions in enumerate(payloads):
+            for raw in questions:
+                stream.add(index, raw)
+            stream.finish(index, failed=False)
+
+        merged = _merge_part_payloads([(part, {'questions': questions}) for part, questions in zip(parts, payloads)])
+
+        self.assertEqual(_texts(emitted), _texts(SAME_STEM))
+        self.assertEqual(_texts(emitted), _texts(merged['questions']))
+
+    def test_failed_part_keeps_emitted_questions(self):
+        emitted = []
+        stream = _OrderedPartStream([_part(0)], emitted.append)
+
+        stream.add(0, _question('Q1', 'a'))
+        stream.finish(0, failed=True)
+
+        self.assertEqual([raw['format_code'] for raw in emitted], ['test', 'unsupported'])
+
+
+def _response(complete):
+    text = '{"questions": []}' if complete else '{"questions": ['
+    return SimpleNamespace(stop_reason='end_turn', content=[SimpleNamespace(type='text', text=text)])
+
+
+@override_settings(QUESTION_IMPORT_AI_RETRIES=2)
+@mock.patch.object(question_import.time, 'sleep')
+@mock.patch.object(question_import, '_build_request', return_value={})
+class CallClaudeTests(SimpleTestCase):
+    def _call(self, attempts):
+        """`attempts` — әр әрекетте ағыннан келетін сұрақтар және жауаптың толық/кесілген болуы."""
+        attempts = iter(attempts)
+
+        def stream_response(request, on_item, metrics=None):
+            questions, complete = next(attempts)
+            for raw in questions:
+                on_item(raw)
+            return _response(complete)
+
+        streamed = []
+        with mock.patch.object(question_import, '_stream_response', side_effect=stream_response):
+            payload = _call_claude(b'%PDF', 'test', on_question=streamed.append)
+
+        return payload, streamed
+
+    def test_single_pass_keeps_same_stem_questions(self, build_request, sleep):
+        payload, streamed = self._call([(SAME_STEM[:2], True)])
+
+        self.assertEqual(_texts(payload['questions']), _texts(SAME_STEM[:2]))
+        self.assertEqual(streamed, payload['questions'])
+
+    def test_continuation_drops_only_the_overlap(self, build_request, sleep):
+        payload, streamed = self._call([
+            (SAME_STEM[:3], False),
+            ([SAME_STEM[2], *SAME_STEM[3:]], True),
+        ])
+
+        self.assertEqual(_texts(payload['questions']), _texts(SAME_STEM))
+        self.assertEqual(streamed, payload['questions'])
+        self.assertNotIn('incomplete', payload)
+
+    def test_exhausted_retries_add_unfinished_placeholder(self, build_request, sleep):
+        payload, streamed = self._call([([SAME_STEM[0]], False)] * 3)
+
+        self.assertTrue(payload['incomplete'])
+        self.assertEqual([raw['format_code'] for raw in payload['questions']], ['test', 'unsupported'])
+        self.assertEqual(streamed, payload['questions'])
+
+
+@override_settings(QUESTION_IMPORT_PART_PAGES=2)
+@mock.patch.object(question_import, '_extract_in_parts', return_value={'questions': []})
+@mock.patch.object(question_import, '_call_claude', return_value={'questions': []})
+@mock.patch.object(question_import, 'count_images_per_page', return_value=[1, 0, 2, 0, 1])
+class ExtractQuestionsTests(SimpleTestCase):
+    def test_matching_image_count_splits_into_parts(self, count_images, call_claude, extract_in_parts):
+        _extract_questions(b'%PDF', 'test', image_count=4)
+
+        parts = extract_in_parts.call_args.args[2]
+        self.assertEqual([part.image_offset for part in parts], [0, 1, 3])
+        call_claude.assert_not_called()
+
+    def test_image_count_mismatch_reads_in_one_part(self, count_images, call_claude, extract_in_parts):
+        _extract_questions(b'%PDF', 'test', image_count=5)
+
+        call_claude.assert_called_once()
+        extract_in_parts.assert_not_called()
+
+    def test_pdf_source_skips_the_check(self, count_images, call_claude, extract_in_parts):
+        _extract_questions(b'%PDF', 'test')
+
+        extract_in_parts.assert_called_once()
@@ -31,10 +31,38 @@ urlpatterns = [
     path('questions/topic-fields/', question.question_topic_fields_view, name='question-topic-fields'),
 
     path('subject/<int:pk>/questions/import/', question_import.question_import_view, name='question-import'),
+    path(
+        'subject/<int:pk>/questions/import-groups/<str:group_id>/',
+        question_import.question_import_group_view, name='question-import-group',
+    ),
+    path(
+        'subject/<int:pk>/questions/import-groups/<str:group_id>/merge/',
+        question_import.question_import_group_merge_view, name='question-import-group-merge',
+    ),
+    path(
+        'subject/<int:pk>/questions/import-groups/<str:group_id>/cancel/',
+        question_import.question_import_group_cancel_view, name='question-import-group-cancel',
+    ),
     path(
         'subject/<int:pk>/questions/import/<str:import_id>/',
         question_import.question_import_review_view, name='question-import-review',
     ),
+    path(
+        'subject/<int:pk>/questions/import/<str:import_id>/progress/',
+        question_import.question_import_progress_view, name='question-import-progress',
+    ),
+    path(
+        'subject/<int:pk>/questions/import/<str:import_id>/items/<int:index>/',
+        question_import.question_import_item_view, name='question-import-item',
+    ),
+    path(
+        'subject/<int:pk>/questions/import/<str:import_id>/items/<int:index>/edit/',
+        question_import.question_import_item_edit_view, name='question-import-item-edit',
+    ),
+    path(
+        'subject/<int:pk>/questions/import/<str:import_id>/items/<int:index>/include/',
+        question_import.question_import_item_include_view, name='question-import-item-include',
+    ),
     path(
         'subject/<int:pk>/questions/import/<str:import_id>/cancel/',
         question_import.question_import_cancel_view, name='question-import-cancel',
@@ -1,24 +1,27 @@
 import json
 
 from django import forms
-from django.core.paginator import Paginator
+from django.contrib import messages
 from django.http import Http404
 from django.shortcuts import redirect, render
 from django.urls import reverse
+from django.utils.http import urlencode
 from django.utils.translation import gettext_lazy as _
 
 from apps.catalog.models import Question
 from apps.catalog.selectors import (
     get_all_format_variants, get_chapters, get_format_variants,
-    get_question, get_question_formats, get_question_stats, get_questions, get_topics,
+    get_question, get_question_facets, get_question_formats, get_questions, get_topics,
 )
-from apps.catalog.services import create_question, deactivate_question
+from apps.catalog.services import create_question, deactivate_question, refresh_question_signature
 from apps.teaching.forms.question import MatchPairFormSet, OptionFormSet, QuestionFilterForm, QuestionForm
 from apps.teaching.views.common import owned_subject
 from apps.accounts.decorators import partner_teacher_required
-from core.utils.text import question_text_preview
+from core.utils.pagination import keyset_page, offset_page
 
 PAGE_SIZE = 100
+# Рейтингпен реттелген іздеу нәтижелері OFFSET-пен беттеледі — тереңдігі шектеулі.
+SEARCH_MAX_RESULTS = 1000
 
 
 def _owned_question(request, pk):
@@ -31,26 +34,48 @@ def _owned_question(request, pk):
     return question
 
 
+def _filter_state(data):
+    return urlencode(sorted((name, str(getattr(value, 'pk', value) or '')) for name, value in data.items()))
+
+
 def _question_panel_context(request, subject):
     filter_form = QuestionFilterForm(request.GET, subject=subject)
     data = filter_form.cleaned_data if filter_form.is_valid() else {}
 
+    filters = {
+        name: data[name].pk if data.get(name) else None
+        for name in ('grade', 'chapter', 'topic', 'format', 'variant', 'author')
+    }
+    search = data.get('q') or None
     questions = get_questions(
         subject=subject,
         author=data.get('author'),
-        grade_id=data['grade'].pk if data.get('grade') else None,
-        chapter_id=data['chapter'].pk if data.get('chapter') else None,
-        topic_id=data['topic'].pk if data.get('topic') else None,
-        format_id=data['format'].pk if data.get('format') else None,
-        variant_id=data['variant'].pk if data.get('variant') else None,
-        search=data.get('q') or None,
+        grade_id=filters['grade'],
+        chapter_id=filters['chapter'],
+        topic_id=filters['topic'],
+        format_id=filters['format'],
+        variant_id=filters['variant'],
+        search=search,
     )
 
-    stats = get_question_stats(questions)
-    page_obj = Paginator(questions, PAGE_SIZE).get_page(request.GET.get('page'))
+    # Статистика да, сүзгі тізімдерінің санағы да бір facet сұрауынан.
+    formats = list(get_question_formats())
+    facets = get_question_facets(get_questions(subject=subject, search=search), **filters)
+    filter_form.set_facet_choices(facets, formats=formats)
+    stats = {
+        'total': facets.total,
+        'level_breakdown': facets.level_breakdown,
+        'format_breakdown': facets.format_breakdown(formats),
+    }
 
-    for question in page_obj:
-        question.text_preview = question_text_preview(question.text)
+    # Тізімге сақталған `text_preview` жетеді — толық HTML мен іздеу/сигнатура бағандары оқылмайды.
+    # Жалпы сан `stats`-тан алынады, беттер OFFSET-сіз (keyset), ал курсор сүзгілерге байланған.
+    questions = questions.defer('text', 'text_plain', 'search_text', 'search_vector', 'minhash', 'lsh_buckets')
+    paging = {'cursor': request.GET.get('cursor'), 'page_size': PAGE_SIZE, 'state': _filter_state(data)}
+    if search:
+        page_obj = offset_page(questions, max_rows=SEARCH_MAX_RESULTS, **paging)
+    else:
+        page_obj = keyset_page(questions, **paging)
 
     return {
         'subject': subject,
@@ -166,12 +191,17 @@ def question_create_view(request, pk):
                         if f.cleaned_data and not f.cleaned_data.get('DELETE')
                     ]
 
-                create_question(
+                question = create_question(
                     topic=form.cleaned_data['topic'], author=teacher, text=form.cleaned_data['text'],
                     format=form.cleaned_data['format'], variant=form.cleaned_data['variant'],
                     level=form.cleaned_data['level'], time_limit=form.cleaned_data['time_limit'],
                     options=options, match_pairs=match_pairs,
                 )
+                if question.similar_questions:
+                    similar, similarity = question.similar_questions[0]
+                    messages.warning(request, _(
+                        'Question saved, but it looks like question #%(id)s of this subject (%(similarity)s%% similar).'
+                    ) % {'id': similar.pk, 'similarity': round(similarity * 100)})
                 return redirect('teaching:question-list', subject.pk)
     else:
         first_format = get_question_formats().first()
@@ -214,6 +244,7 @@ def question_update_view(request, pk):
                 elif format_code == 'matching':
                     match_pair_formset.save()
 
+                refresh_question_signature(question)
                 return redirect('teaching:question-list', subject.pk)
     else:
         form = QuestionForm(instance=question, subject=subject, teacher=teacher)
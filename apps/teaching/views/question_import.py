@@ -1,31 +1,30 @@
 import json
-import uuid
-from dataclasses import asdict
+from dataclasses import replace
 
+from django.conf import settings
 from django.contrib import messages
-from django.core.files.storage import default_storage
+from django.core.paginator import Paginator
 from django.http import Http404, HttpResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.http import require_POST
 
-from apps.catalog.selectors import get_format_variants_by_format_code, get_question_format, get_topic
-from apps.catalog.services import create_question
+from apps.catalog.selectors import get_format_variants_by_format_code, get_question_formats, get_topic
+from apps.catalog.services import create_questions
 from apps.teaching.forms.question_import import (
     ImportedMatchPairFormSet, ImportedOptionFormSet, ImportedQuestionForm, QuestionImportUploadForm,
 )
-from apps.teaching.services.question_import import (
-    ParsedOption, ParsedPair, ParsedQuestion, QuestionImportError, run_question_import,
+from apps.teaching.models import ImportBatch
+from apps.teaching.selectors.import_batch import annotate_ai_queue_positions, get_import_batch, get_import_group
+from apps.teaching.services.import_batch import (
+    discard_import_batch, enqueue_question_import, enqueue_question_imports, merge_import_batches, save_import_item,
 )
+from apps.teaching.services.question_import import ParsedOption, ParsedPair, ParsedQuestion
 from apps.teaching.views.common import owned_subject
 from apps.accounts.decorators import partner_teacher_required
 
-SESSION_KEY_PREFIX = 'question_import'
-
-
-def _session_key(import_id):
-    return f'{SESSION_KEY_PREFIX}:{import_id}'
+REVIEW_PAGE_SIZE = 20
 
 
 def _owned_topic(subject, topic_id):
@@ -37,6 +36,28 @@ def _owned_topic(subject, topic_id):
     return topic
 
 
+def _import_session_key(subject):
+    # Сессияда тек белсенді импорттың ID-і (сілтеме) сақталады — сұрақтардың өзі ImportBatch-та.
+    return f'question_import_{subject.pk}'
+
+
+def _import_group_session_key(subject):
+    return f'question_import_group_{subject.pk}'
+
+
+def _closed_import_url(request, subject, batch, fallback):
+    # Топтағы файл жабылғанда мұғалім топ бетіне оралады; топ бос қалса — `fallback`-қа.
+    if not batch.group_id:
+        request.session.pop(_import_session_key(subject), None)
+        return fallback
+
+    if get_import_group(batch.group_id, author=batch.author_id, subject=subject):
+        return reverse('teaching:question-import-group', args=[subject.pk, batch.group_id])
+
+    request.session.pop(_import_group_session_key(subject), None)
+    return fallback
+
+
 def _parsed_question_from_dict(data):
     return ParsedQuestion(**{
         **data,
@@ -45,65 +66,131 @@ def _parsed_question_from_dict(data):
     })
 
 
-def _variant_codes_json(format_code):
-    if format_code != 'test':
-        return json.dumps({})
-
+def _variant_codes_json():
     return json.dumps({str(variant.id): variant.code for variant in get_format_variants_by_format_code('test')})
 
 
-def _question_forms_from_parsed(questions, format_code):
-    items = []
-    for index, question in enumerate(questions):
-        prefix = f'q{index}'
-        variant = None
-        if format_code == 'test':
-            variant = get_format_variants_by_format_code('test').filter(code=question.variant_code).first()
-
-        question_form = ImportedQuestionForm(prefix=prefix, format_code=format_code, initial={
-            'include': True,
-            'text': question.text_html,
-            'variant': variant.pk if variant else None,
-            'level': question.level,
-            'time_limit': 30,
-        })
-        option_formset = ImportedOptionFormSet(prefix=f'{prefix}-options', initial=[
-            {'text': option.text_html, 'is_correct': option.is_correct}
-            for option in question.options
-        ] if format_code == 'test' else [])
-        pair_formset = ImportedMatchPairFormSet(prefix=f'{prefix}-pairs', initial=[
-            {'left': pair.left_html, 'right': pair.right_html}
-            for pair in question.pairs
-        ] if format_code == 'matching' else [])
-
-        items.append({
-            'index': index, 'question_form': question_form,
-            'option_formset': option_formset, 'pair_formset': pair_formset,
-            'warning': question.warning,
-        })
-
-    return items
+def _test_variant_ids():
+    return {variant.code: variant.pk for variant in get_format_variants_by_format_code('test')}
 
 
-def _question_forms_from_post(post_data, count, format_code):
-    items = []
-    for index in range(count):
-        prefix = f'q{index}'
-        question_form = ImportedQuestionForm(post_data, prefix=prefix, format_code=format_code)
-        option_formset = ImportedOptionFormSet(post_data, prefix=f'{prefix}-options')
-        pair_formset = ImportedMatchPairFormSet(post_data, prefix=f'{prefix}-pairs')
-
-        items.append({
-            'index': index, 'question_form': question_form,
-            'option_formset': option_formset, 'pair_formset': pair_formset,
-            'warning': '',
-        })
+def _question_item_from_parsed(index, question, test_variant_ids):
+    # Аралас импортта әр сұрақтың форматы өзінде — форма, нұсқалар/жұптар соған қарай құрылады.
+    prefix = f'q{index}'
+    format_code = question.format_code
 
-    return items
+    question_form = ImportedQuestionForm(prefix=prefix, format_code=format_code, initial={
+        'include': question.include,
+        'text': question.text_html,
+        'variant': test_variant_ids.get(question.variant_code) if format_code == 'test' else None,
+        'level': question.level,
+        'time_limit': question.time_limit,
+    })
+    option_formset = ImportedOptionFormSet(prefix=f'{prefix}-options', initial=[
+        {'text': option.text_html, 'is_correct': option.is_correct}
+        for option in question.options
+    ] if format_code == 'test' else [])
+    pair_formset = ImportedMatchPairFormSet(prefix=f'{prefix}-pairs', initial=[
+        {'left': pair.left_html, 'right': pair.right_html}
+        for pair in question.pairs
+    ] if format_code == 'matching' else [])
+
+    return {
+        'index': index, 'format_code': format_code, 'question_form': question_form,
+        'option_formset': option_formset, 'pair_formset': pair_formset,
+        'warning': question.warning, 'duplicates': question.duplicates,
+    }
+
+
+def _question_item_from_post(post_data, index, question):
+    prefix = f'q{index}'
+    # Формат POST-тан емес, сақталған нәтижеден алынады — мұғалім оны review бетінде өзгертпейді.
+    format_code = question.format_code
+
+    return {
+        'index': index, 'format_code': format_code,
+        'question_form': ImportedQuestionForm(post_data, prefix=prefix, format_code=format_code),
+        'option_formset': ImportedOptionFormSet(post_data, prefix=f'{prefix}-options'),
+        'pair_formset': ImportedMatchPairFormSet(post_data, prefix=f'{prefix}-pairs'),
+        'warning': question.warning, 'duplicates': question.duplicates,
+    }
+
+
+def _formset_data(prefix, rows):
+    data = {f'{prefix}-TOTAL_FORMS': len(rows), f'{prefix}-INITIAL_FORMS': len(rows)}
+    for row_index, row in enumerate(rows):
+        for name, value in row.items():
+            # Белгіленбеген checkbox POST-та мүлде болмайды.
+            if value is not False:
+                data[f'{prefix}-{row_index}-{name}'] = 'on' if value is True else value
+
+    return data
+
+
+def _stored_question_data(index, question, test_variant_ids):
+    """Сақталған сұрақ — мұғалім оны өңдеу формасынан жібергендей POST деректері. Confirm ашылмаған
+    сұрақтарды да дәл сол формалармен тексереді."""
+    prefix = f'q{index}'
+    data = {
+        f'{prefix}-text': question.text_html,
+        f'{prefix}-variant': test_variant_ids.get(question.variant_code, '') if question.format_code == 'test' else '',
+        f'{prefix}-level': question.level,
+        f'{prefix}-time_limit': question.time_limit,
+    }
+    if question.include:
+        data[f'{prefix}-include'] = 'on'
+
+    data.update(_formset_data(f'{prefix}-options', [
+        {'text': option.text_html, 'is_correct': option.is_correct}
+        for option in question.options
+    ] if question.format_code == 'test' else []))
+    data.update(_formset_data(f'{prefix}-pairs', [
+        {'left': pair.left_html, 'right': pair.right_html}
+        for pair in question.pairs
+    ] if question.format_code == 'matching' else []))
+    return data
+
+
+def _stored_question_item(index, question, test_variant_ids):
+    return _question_item_from_post(_stored_question_data(index, question, test_variant_ids), index, question)
+
+
+def _question_preview(index, question, test_variant_ids):
+    invalid = question.include and not _is_valid_question_item(
+        _stored_question_item(index, question, test_variant_ids),
+    )
+    return {'index': index, 'question': question, 'invalid': invalid}
+
+
+def _surviving_forms(formset):
+    return [form for form in formset.forms if form.cleaned_data and not form.cleaned_data.get('DELETE')]
+
+
+def _reviewed_question(item, question):
+    cleaned_data = item['question_form'].cleaned_data
+    variant = cleaned_data.get('variant')
+    options, pairs = question.options, question.pairs
+
+    if item['format_code'] == 'test':
+        options = [
+            ParsedOption(text_html=form.cleaned_data['text'], is_correct=form.cleaned_data['is_correct'])
+            for form in _surviving_forms(item['option_formset'])
+        ]
+    elif item['format_code'] == 'matching':
+        pairs = [
+            ParsedPair(left_html=form.cleaned_data['left'], right_html=form.cleaned_data['right'])
+            for form in _surviving_forms(item['pair_formset'])
+        ]
+
+    return replace(
+        question, include=cleaned_data['include'], text_html=cleaned_data['text'],
+        variant_code=variant.code if variant else question.variant_code, level=cleaned_data['level'],
+        time_limit=cleaned_data['time_limit'], options=options, pairs=pairs,
+    )
 
 
 def _validate_option_rules(question_form, option_formset):
-    surviving = [f for f in option_formset.forms if f.cleaned_data and not f.cleaned_data.get('DELETE')]
+    surviving = _surviving_forms(option_formset)
     correct_count = sum(1 for f in surviving if f.cleaned_data.get('is_correct'))
 
     if len(surviving) < 2:
@@ -123,7 +210,7 @@ def _validate_option_rules(question_form, option_formset):
 
 
 def _validate_pair_rules(pair_formset):
-    surviving = [f for f in pair_formset.forms if f.cleaned_data and not f.cleaned_data.get('DELETE')]
+    surviving = _surviving_forms(pair_formset)
 
     if len(surviving) < 2:
         pair_formset._non_form_errors = pair_formset.error_class([_('Add at least two match pairs.')])
@@ -145,9 +232,20 @@ def _validate_answer_data(format_code, question_form, option_formset, pair_forms
     return True
 
 
-# Question import (AI, .docx)
+def _is_valid_question_item(item):
+    question_valid = item['question_form'].is_valid()
+    option_valid = item['option_formset'].is_valid()
+    pair_valid = item['pair_formset'].is_valid()
+
+    if not (question_valid and option_valid and pair_valid):
+        return False
+
+    return _validate_answer_data(item['format_code'], item['question_form'], item['option_formset'], item['pair_formset'])
+
+
+# Question import (AI, .docx/PDF)
 # ----------------------------------------------------------------------------------------------------------------------
-# -------------- upload + parse --------------
+# -------------- upload (queues the import, the worker parses it) --------------
 @partner_teacher_required
 def question_import_view(request, pk):
     subject = owned_subject(request, pk)
@@ -156,91 +254,288 @@ def question_import_view(request, pk):
         upload_form = QuestionImportUploadForm(request.POST, request.FILES, subject=subject)
 
         if upload_form.is_valid():
-            import_id = uuid.uuid4().hex
-            question_format = upload_form.cleaned_data['format']
-
-            try:
-                result = run_question_import(upload_form.cleaned_data['file'].read(), import_id, question_format.code)
-            except QuestionImportError as error:
-                messages.error(request, str(error))
-                return render(request, 'teaching/subject/question/import/page.html', {
-                    'subject': subject, 'upload_form': upload_form,
-                    'topic_fields_url': f"{reverse('teaching:question-topic-fields')}?subject={subject.pk}",
-                })
-
-            supported = [q for q in result.questions if q.is_supported_for(question_format.code)]
-            unsupported = [q for q in result.questions if not q.is_supported_for(question_format.code)]
-
-            if not supported:
-                for path in result.image_paths:
-                    default_storage.delete(path)
-
-                messages.error(request, _('No importable questions were found in this file.'))
-                return render(request, 'teaching/subject/question/import/page.html', {
-                    'subject': subject, 'upload_form': upload_form,
-                    'topic_fields_url': f"{reverse('teaching:question-topic-fields')}?subject={subject.pk}",
-                })
-
-            request.session[_session_key(import_id)] = {
-                'topic_id': upload_form.cleaned_data['topic'].pk,
-                'format_id': question_format.pk,
-                'questions': [asdict(question) for question in supported],
-                'unsupported': [asdict(question) for question in unsupported],
-                'image_paths': result.image_paths,
+            uploads = upload_form.cleaned_data['file']
+            import_fields = {
+                'author': request.user.teacher,
+                'subject': subject,
+                'topic': upload_form.cleaned_data['topic'],
+                'question_format': upload_form.cleaned_data['format'],
             }
 
-            return redirect('teaching:question-import-review', subject.pk, import_id)
+            if len(uploads) == 1:
+                batch = enqueue_question_import(**import_fields, upload=uploads[0])
+                request.session[_import_session_key(subject)] = batch.import_id
+                return redirect('teaching:question-import-review', subject.pk, batch.import_id)
+
+            group_id = enqueue_question_imports(**import_fields, uploads=uploads)
+            request.session[_import_group_session_key(subject)] = group_id
+            return redirect('teaching:question-import-group', subject.pk, group_id)
     else:
         upload_form = QuestionImportUploadForm(subject=subject)
 
+    pending_import = None
+    pending_import_id = request.session.get(_import_session_key(subject))
+    if pending_import_id:
+        pending_import = get_import_batch(pending_import_id, author=request.user.teacher, subject=subject)
+        if pending_import is None:
+            request.session.pop(_import_session_key(subject), None)
+
+    pending_group_id = request.session.get(_import_group_session_key(subject))
+    if pending_group_id and not get_import_group(pending_group_id, author=request.user.teacher, subject=subject):
+        request.session.pop(_import_group_session_key(subject), None)
+        pending_group_id = None
+
     return render(request, 'teaching/subject/question/import/page.html', {
-        'subject': subject, 'upload_form': upload_form,
+        'subject': subject, 'upload_form': upload_form, 'pending_import': pending_import,
+        'pending_group_id': pending_group_id, 'max_files': settings.QUESTION_IMPORT_MAX_FILES,
         'topic_fields_url': f"{reverse('teaching:question-topic-fields')}?subject={subject.pk}",
     })
 
 
-# -------------- review (GET, reloadable — no AI call) --------------
+# -------------- group of files (progress per file, HTMX polling) --------------
 @partner_teacher_required
-def question_import_review_view(request, pk, import_id):
+def question_import_group_view(request, pk, group_id):
     subject = owned_subject(request, pk)
-    data = request.session.get(_session_key(import_id))
+    batches = annotate_ai_queue_positions(get_import_group(group_id, author=request.user.teacher, subject=subject))
 
-    if not data:
+    if not batches:
+        request.session.pop(_import_group_session_key(subject), None)
         messages.error(request, _('This import session has expired or was already completed. Please upload the file again.'))
         return redirect('teaching:question-import', subject.pk)
 
-    topic = _owned_topic(subject, data['topic_id'])
-    question_format = get_question_format(data['format_id'])
-    questions = [_parsed_question_from_dict(question) for question in data['questions']]
-    unsupported = [_parsed_question_from_dict(question) for question in data['unsupported']]
-    items = _question_forms_from_parsed(questions, question_format.code)
+    done = [batch for batch in batches if batch.status == ImportBatch.Status.DONE]
+    context = {
+        'subject': subject,
+        'group_id': group_id,
+        'batches': batches,
+        'finished_count': sum(batch.is_finished for batch in batches),
+        'all_finished': all(batch.is_finished for batch in batches),
+        'can_merge': len(done) > 1,
+        'question_count': sum(batch.metrics.get('questions', 0) for batch in done),
+    }
+
+    if request.headers.get('HX-Request') == 'true':
+        return render(request, 'teaching/subject/question/import_group/_files.html', context)
+
+    return render(request, 'teaching/subject/question/import_group/page.html', context)
+
 
-    return render(request, 'teaching/subject/question/import_review/page.html', {
+@partner_teacher_required
+@require_POST
+def question_import_group_merge_view(request, pk, group_id):
+    subject = owned_subject(request, pk)
+    batches = get_import_group(group_id, author=request.user.teacher, subject=subject, with_results=True)
+
+    if not batches:
+        return redirect('teaching:question-import-group', subject.pk, group_id)
+
+    if not all(batch.is_finished for batch in batches):
+        messages.error(request, _('Wait until all files are processed.'))
+        return redirect('teaching:question-import-group', subject.pk, group_id)
+
+    if not any(batch.status == ImportBatch.Status.DONE for batch in batches):
+        messages.error(request, _('No importable questions were found in these files.'))
+        return redirect('teaching:question-import-group', subject.pk, group_id)
+
+    merged = merge_import_batches(batches)
+    request.session.pop(_import_group_session_key(subject), None)
+    request.session[_import_session_key(subject)] = merged.import_id
+
+    return redirect('teaching:question-import-review', subject.pk, merged.import_id)
+
+
+@partner_teacher_required
+@require_POST
+def question_import_group_cancel_view(request, pk, group_id):
+    subject = owned_subject(request, pk)
+
+    for batch in get_import_group(group_id, author=request.user.teacher, subject=subject):
+        discard_import_batch(batch)
+    request.session.pop(_import_group_session_key(subject), None)
+
+    response = HttpResponse(status=204)
+    response['HX-Redirect'] = reverse('teaching:question-import', args=[subject.pk])
+    return response
+
+
+# -------------- progress + streamed questions (HTMX polling) --------------
+def _shown_count(request, name):
+    # Бет қанша сұрақты көрсетіп үлгергенін әр сұраумен өзі жібереді — жауапта тек жаңалары келеді.
+    try:
+        return max(int(request.GET.get(name, 0)), 0)
+    except ValueError:
+        return 0
+
+
+@partner_teacher_required
+def question_import_progress_view(request, pk, import_id):
+    subject = owned_subject(request, pk)
+    batch = get_import_batch(import_id, author=request.user.teacher, subject=subject)
+
+    if batch is None or batch.is_finished:
+        # Бет беттелген, өңделетін review ретінде қайта жүктеледі.
+        response = HttpResponse(status=204)
+        response['HX-Redirect'] = reverse('teaching:question-import-review', args=[subject.pk, import_id])
+        return response
+
+    annotate_ai_queue_positions([batch])
+    shown_questions = _shown_count(request, 'questions')
+    shown_unsupported = _shown_count(request, 'unsupported')
+    questions, unsupported = batch.get_results()
+
+    return render(request, 'teaching/subject/question/import_progress/_progress.html', {
         'subject': subject,
-        'topic': topic,
+        'batch': batch,
         'import_id': import_id,
-        'question_count': len(items),
+        # Ағын кезінде сұрақтар тек оқуға көрсетіледі — өңдеу импорт біткен соң, бет қайта жүктелгенде.
+        'items': [
+            {'index': index, 'question': _parsed_question_from_dict(question)}
+            for index, question in enumerate(questions[shown_questions:], start=shown_questions)
+        ],
+        'unsupported': [_parsed_question_from_dict(question) for question in unsupported[shown_unsupported:]],
+        'shown_questions': max(len(questions), shown_questions),
+        'shown_unsupported': max(len(unsupported), shown_unsupported),
+        'mixed': batch.format_id is None,
+        'editable': False,
+    })
+
+
+# -------------- review (GET, reloadable — no AI call) --------------
+def _review_context(subject, topic, batch, page_obj, items, unsupported):
+    return {
+        'subject': subject,
+        'topic': topic,
+        'import_id': batch.import_id,
+        'question_count': page_obj.paginator.count,
+        'page_obj': page_obj,
         'items': items,
         'unsupported': unsupported,
-        'format_code': question_format.code,
-        'media': ImportedQuestionForm(format_code=question_format.code).media,
-        'variant_codes_json': _variant_codes_json(question_format.code),
+        'mixed': batch.format_id is None,
+        'editable': True,
+        'media': ImportedQuestionForm(format_code=batch.format_code).media,
+        'variant_codes_json': _variant_codes_json(),
+    }
+
+
+@partner_teacher_required
+def question_import_review_view(request, pk, import_id):
+    subject = owned_subject(request, pk)
+    batch = get_import_batch(import_id, author=request.user.teacher, subject=subject)
+
+    if batch is None:
+        request.session.pop(_import_session_key(subject), None)
+        messages.error(request, _('This import session has expired or was already completed. Please upload the file again.'))
+        return redirect('teaching:question-import', subject.pk)
+
+    if not batch.is_finished:
+        topic = _owned_topic(subject, batch.topic_id)
+        annotate_ai_queue_positions([batch])
+        return render(request, 'teaching/subject/question/import_review/page.html', {
+            'subject': subject,
+            'topic': topic,
+            'batch': batch,
+            'import_id': import_id,
+            'streaming': True,
+            'items': [],
+            'unsupported': [],
+            'mixed': batch.format_id is None,
+            'editable': False,
+            'media': ImportedQuestionForm(format_code=batch.format_code).media,
+            'variant_codes_json': _variant_codes_json(),
+        })
+
+    if batch.status == ImportBatch.Status.FAILED:
+        messages.error(request, batch.error)
+        discard_import_batch(batch)
+        return redirect(_closed_import_url(request, subject, batch, reverse('teaching:question-import', args=[subject.pk])))
+
+    topic = _owned_topic(subject, batch.topic_id)
+    questions, unsupported = batch.get_results()
+    # Бетте тек жеңіл, оқуға арналған көріністер: сұрақтың формасы (CKEditor-лармен) ол ашылғанда ғана жүктеледі.
+    page_obj = Paginator(questions, REVIEW_PAGE_SIZE).get_page(request.GET.get('page'))
+    test_variant_ids = _test_variant_ids()
+    items = [
+        _question_preview(index, _parsed_question_from_dict(question), test_variant_ids)
+        for index, question in enumerate(page_obj.object_list, start=page_obj.start_index() - 1)
+    ]
+    unsupported = [_parsed_question_from_dict(question) for question in unsupported]
+
+    return render(
+        request, 'teaching/subject/question/import_review/page.html',
+        _review_context(subject, topic, batch, page_obj, items, unsupported),
+    )
+
+
+# -------------- one question (HTMX: preview, edit form, save) --------------
+def _reviewable_question(request, pk, import_id, index):
+    subject = owned_subject(request, pk)
+    batch = get_import_batch(import_id, author=request.user.teacher, subject=subject)
+
+    if batch is None or batch.status != ImportBatch.Status.DONE:
+        raise Http404
+
+    questions, _unsupported = batch.get_results()
+    if index >= len(questions):
+        raise Http404
+
+    return subject, batch, _parsed_question_from_dict(questions[index])
+
+
+def _render_question_slot(request, subject, batch, item):
+    return render(request, 'teaching/subject/question/import_review/_import_question_slot_content.html', {
+        'subject': subject, 'import_id': batch.import_id, 'item': item,
+        'mixed': batch.format_id is None, 'editable': True,
     })
 
 
+@partner_teacher_required
+def question_import_item_view(request, pk, import_id, index):
+    subject, batch, question = _reviewable_question(request, pk, import_id, index)
+    test_variant_ids = _test_variant_ids()
+
+    if request.method == 'POST':
+        item = _question_item_from_post(request.POST, index, question)
+        if not _is_valid_question_item(item):
+            return _render_question_slot(request, subject, batch, item)
+
+        question = _reviewed_question(item, question)
+        save_import_item(batch, index, question)
+
+    return _render_question_slot(request, subject, batch, _question_preview(index, question, test_variant_ids))
+
+
+@partner_teacher_required
+def question_import_item_edit_view(request, pk, import_id, index):
+    subject, batch, question = _reviewable_question(request, pk, import_id, index)
+    item = _question_item_from_parsed(index, question, _test_variant_ids())
+    return _render_question_slot(request, subject, batch, item)
+
+
+@partner_teacher_required
+@require_POST
+def question_import_item_include_view(request, pk, import_id, index):
+    subject, batch, question = _reviewable_question(request, pk, import_id, index)
+    question = replace(question, include=request.POST.get('include') == 'on')
+    save_import_item(batch, index, question)
+    return _render_question_slot(request, subject, batch, _question_preview(index, question, _test_variant_ids()))
+
+
 # -------------- cancel (HTMX, confirm-gated) --------------
 @partner_teacher_required
 @require_POST
 def question_import_cancel_view(request, pk, import_id):
     subject = owned_subject(request, pk)
-    data = request.session.pop(_session_key(import_id), None)
+    batch = get_import_batch(import_id, author=request.user.teacher, subject=subject)
 
-    if data:
-        for path in data.get('image_paths', []):
-            default_storage.delete(path)
+    redirect_url = reverse('teaching:question-import', args=[subject.pk])
+    if batch is None:
+        request.session.pop(_import_session_key(subject), None)
+    else:
+        discard_import_batch(batch)
+        redirect_url = _closed_import_url(request, subject, batch, redirect_url)
 
     response = HttpResponse(status=204)
-    response['HX-Redirect'] = reverse('teaching:question-import', args=[subject.pk])
+    response['HX-Redirect'] = redirect_url
     return response
 
 
@@ -250,81 +545,71 @@ def question_import_cancel_view(request, pk, import_id):
 def question_import_confirm_view(request, pk, import_id):
     subject = owned_subject(request, pk)
     teacher = request.user.teacher
-    data = request.session.get(_session_key(import_id))
+    batch = get_import_batch(import_id, author=teacher, subject=subject)
 
-    if not data:
+    if batch is None or batch.status != ImportBatch.Status.DONE:
         messages.error(request, _('This import session has expired or was already completed. Please upload the file again.'))
         return redirect('teaching:question-import', subject.pk)
 
-    topic = _owned_topic(subject, data['topic_id'])
-    question_format = get_question_format(data['format_id'])
-    count = len(data['questions'])
-    items = _question_forms_from_post(request.POST, count, question_format.code)
-
-    all_valid = True
-    for item in items:
-        question_valid = item['question_form'].is_valid()
-        option_valid = item['option_formset'].is_valid()
-        pair_valid = item['pair_formset'].is_valid()
-
-        if not (question_valid and option_valid and pair_valid):
-            all_valid = False
-            continue
-
-        if not _validate_answer_data(question_format.code, item['question_form'], item['option_formset'], item['pair_formset']):
-            all_valid = False
-
-    if not all_valid:
-        return render(request, 'teaching/subject/question/import_review/page.html', {
-            'subject': subject,
-            'topic': topic,
-            'import_id': import_id,
-            'question_count': count,
-            'items': items,
-            'unsupported': [],
-            'format_code': question_format.code,
-            'media': ImportedQuestionForm(format_code=question_format.code).media,
-            'variant_codes_json': _variant_codes_json(question_format.code),
-        })
+    topic = _owned_topic(subject, batch.topic_id)
+    questions, _unsupported = batch.get_results()
+    questions = [_parsed_question_from_dict(question) for question in questions]
+    test_variant_ids = _test_variant_ids()
+
+    # Өңдеулер сұрақ-сұрақ бойынша сақталған — мұнда сақталған нәтиже сол формалармен қайта тексеріледі.
+    items = [
+        _stored_question_item(index, question, test_variant_ids)
+        for index, question in enumerate(questions) if question.include
+    ]
+    invalid = [item['index'] for item in items if not _is_valid_question_item(item)]
+
+    if invalid:
+        messages.error(request, _('Fix the marked questions before confirming: {}.').format(
+            ', '.join(str(index + 1) for index in invalid),
+        ))
+        # Алғашқы қатесі бар сұрақтың беті ашылады, ондағы қате сұрақтар бірден өңдеу формасымен көрсетіледі.
+        page_obj = Paginator(questions, REVIEW_PAGE_SIZE).get_page(invalid[0] // REVIEW_PAGE_SIZE + 1)
+        invalid_items = {item['index']: item for item in items if item['index'] in invalid}
+        page_items = [
+            invalid_items.get(index) or _question_preview(index, question, test_variant_ids)
+            for index, question in enumerate(page_obj.object_list, start=page_obj.start_index() - 1)
+        ]
+        return render(
+            request, 'teaching/subject/question/import_review/page.html',
+            _review_context(subject, topic, batch, page_obj, page_items, []),
+        )
 
-    created = 0
+    formats = {question_format.code: question_format for question_format in get_question_formats()}
+    questions_to_create = []
 
     for item in items:
         question_form = item['question_form']
-        if not question_form.cleaned_data.get('include'):
-            continue
-
         options = None
         match_pairs = None
 
-        if question_format.code == 'test':
+        if item['format_code'] == 'test':
             options = [
                 {'answer': option_form.cleaned_data['text'], 'is_correct': option_form.cleaned_data['is_correct']}
-                for option_form in item['option_formset'].forms
-                if option_form.cleaned_data and not option_form.cleaned_data.get('DELETE')
+                for option_form in _surviving_forms(item['option_formset'])
             ]
-        elif question_format.code == 'matching':
+        elif item['format_code'] == 'matching':
             match_pairs = [
                 {'left': pair_form.cleaned_data['left'], 'right': pair_form.cleaned_data['right']}
-                for pair_form in item['pair_formset'].forms
-                if pair_form.cleaned_data and not pair_form.cleaned_data.get('DELETE')
+                for pair_form in _surviving_forms(item['pair_formset'])
             ]
 
-        create_question(
-            topic=topic,
-            author=teacher,
-            text=question_form.cleaned_data['text'],
-            format=question_format,
-            variant=question_form.cleaned_data['variant'],
-            level=question_form.cleaned_data['level'],
-            time_limit=question_form.cleaned_data['time_limit'],
-            options=options,
-            match_pairs=match_pairs,
-        )
-
-        created += 1
+        questions_to_create.append({
+            'format': formats[item['format_code']],
+            'text': question_form.cleaned_data['text'],
+            'variant': question_form.cleaned_data['variant'],
+            'level': question_form.cleaned_data['level'],
+            'time_limit': question_form.cleaned_data['time_limit'],
+            'options': options,
+            'match_pairs': match_pairs,
+        })
 
-    del request.session[_session_key(import_id)]
+    created = create_questions(topic=topic, author=teacher, format=batch.format, questions=questions_to_create)
+    discard_import_batch(batch)
 
-    messages.success(request, _('{} questions imported successfully.').format(created))
-    return redirect('teaching:question-list', subject.pk)
+    messages.success(request, _('{} questions imported successfully.').format(len(created)))
+    return redirect(_closed_import_url(request, subject, batch, reverse('teaching:question-list', args=[subject.pk])))
@@ -191,6 +191,53 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
 ANTHROPIC_API_KEY = config('ANTHROPIC_API_KEY', default='')
 QUESTION_IMPORT_MODEL = config('QUESTION_IMPORT_MODEL', default='claude-opus-4-8')
 QUESTION_IMPORT_MAX_FILE_SIZE = 20 * 1024 * 1024
+QUESTION_IMPORT_MAX_ARCHIVE_SIZE = 200 * 1024 * 1024
+QUESTION_IMPORT_MAX_FILES = config('QUESTION_IMPORT_MAX_FILES', default=50, cast=int)
+# Бір жүктемедегі файлдардың ең көбі осынша қатар өңделеді — қалғандары басқа мұғалімдердің импорттарын кідіртпейді.
+QUESTION_IMPORT_GROUP_CONCURRENCY = config('QUESTION_IMPORT_GROUP_CONCURRENCY', default=4, cast=int)
+# Worker жүріп жатқан импорттың heartbeat-ын жаңартып тұрады; JOB_TIMEOUT бойы жаңармаса, импорт қайта алынады.
+QUESTION_IMPORT_JOB_TIMEOUT = config('QUESTION_IMPORT_JOB_TIMEOUT', default=15 * 60, cast=int)
+QUESTION_IMPORT_HEARTBEAT_INTERVAL = 60
+QUESTION_IMPORT_MAX_ATTEMPTS = 2
+QUESTION_IMPORT_PART_PAGES = config('QUESTION_IMPORT_PART_PAGES', default=10, cast=int)
+QUESTION_IMPORT_PART_OVERLAP = 1
+QUESTION_IMPORT_PARALLEL_PARTS = config('QUESTION_IMPORT_PARALLEL_PARTS', default=4, cast=int)
+QUESTION_IMPORT_AI_RETRIES = config('QUESTION_IMPORT_AI_RETRIES', default=3, cast=int)
+QUESTION_IMPORT_AI_BACKOFF = 2.0         # секунд; әр қайталауда екі есе, `..._MAX`-тан аспайды
+QUESTION_IMPORT_AI_BACKOFF_MAX = 30.0
+QUESTION_IMPORT_CACHE_TTL = config('QUESTION_IMPORT_CACHE_TTL', default=30 * 24 * 60 * 60, cast=int)
+QUESTION_IMPORT_CACHE_MAX_SIZE = config('QUESTION_IMPORT_CACHE_MAX_SIZE', default=200 * 1024 * 1024, cast=int)
+QUESTION_IMPORT_BATCH_TTL = config('QUESTION_IMPORT_BATCH_TTL', default=7 * 24 * 60 * 60, cast=int)
+QUESTION_IMPORT_RULES_MIN_CONFIDENCE = config('QUESTION_IMPORT_RULES_MIN_CONFIDENCE', default=0.95, cast=float)
+
+# -------------- LibreOffice converter pool (docx -> pdf, emf/wmf -> png) --------------
+OFFICE_CONVERTER_POOL_SIZE = config('OFFICE_CONVERTER_POOL_SIZE', default=2, cast=int)   # 0 — бір реттік soffice
+OFFICE_CONVERTER_MAX_CONVERSIONS = config('OFFICE_CONVERTER_MAX_CONVERSIONS', default=50, cast=int)
+OFFICE_CONVERTER_TIMEOUT = config('OFFICE_CONVERTER_TIMEOUT', default=120, cast=int)
+
+# -------------- Image pipeline (CKEditor uploads and imported images) --------------
+IMAGE_MAX_DIMENSION = config('IMAGE_MAX_DIMENSION', default=1600, cast=int)
+IMAGE_WEBP_QUALITY = 80
+IMAGE_PROCESSING_WORKERS = config('IMAGE_PROCESSING_WORKERS', default=4, cast=int)
+
+# -------------- Question near-duplicate detection (MinHash/LSH) --------------
+QUESTION_DUPLICATE_THRESHOLD = config('QUESTION_DUPLICATE_THRESHOLD', default=0.8, cast=float)
+
+# -------------- AI client backend (anthropic | record | replay) --------------
+AI_CLIENT_BACKEND = config('AI_CLIENT_BACKEND', default='anthropic')
+AI_REPLAY_DIR = config('AI_REPLAY_DIR', default=str(BASE_DIR / 'fixtures' / 'ai'))
+AI_REPLAY_SPEED = config('AI_REPLAY_SPEED', default=1.0, cast=float)   # 0 — кідіріссіз
+
+# -------------- AI rate limiter (token bucket + concurrency, shared by all processes via Postgres) --------------
+AI_RATE_LIMIT_REQUESTS_PER_MINUTE = config('AI_RATE_LIMIT_REQUESTS_PER_MINUTE', default=50, cast=int)
+AI_RATE_LIMIT_TOKENS_PER_MINUTE = config('AI_RATE_LIMIT_TOKENS_PER_MINUTE', default=400_000, cast=int)
+AI_MAX_CONCURRENT_REQUESTS = config('AI_MAX_CONCURRENT_REQUESTS', default=4, cast=int)
+AI_LIMITER_LEASE_TIMEOUT = 15 * 60      # процесс өліп қалса, оның орны осыдан кейін босайды
+# Кезекте күту импорттың JOB_TIMEOUT-ынан қысқа болуы керек — әйтпесе күтіп тұрған импорт қайта алынып, екі рет жүреді.
+AI_LIMITER_MAX_WAIT = min(
+    config('AI_LIMITER_MAX_WAIT', default=10 * 60, cast=int), QUESTION_IMPORT_JOB_TIMEOUT - 60,
+)
+AI_LIMITER_POLL_INTERVAL = 1.0
 
 
 # Unfold settings
@@ -324,6 +371,23 @@ UNFOLD = {
                     },
                 ],
             },
+            {
+                'title': _('Question import'),
+                'separator': True,
+                'collapsible': True,
+                'items': [
+                    {
+                        'title': _('Import batches'),
+                        'icon': 'upload_file',
+                        'link': reverse_lazy('admin:teaching_importbatch_changelist'),
+                    },
+                    {
+                        'title': _('Import metrics'),
+                        'icon': 'monitoring',
+                        'link': reverse_lazy('admin:teaching_importbatch_metrics'),
+                    },
+                ],
+            },
         ],
     },
 
@@ -0,0 +1,18 @@
+from django.core.checks import Warning, register
+
+from core.utils.office import uno_missing
+
+
+@register()
+def check_office_converter(app_configs, **kwargs):
+    if not uno_missing():
+        return []
+
+    return [
+        Warning(
+            'OFFICE_CONVERTER_POOL_SIZE is set but the uno module is not importable.',
+            hint='Install python3-uno for the worker interpreter or set OFFICE_CONVERTER_POOL_SIZE=0; '
+                 'until then every document starts its own soffice process.',
+            id='core.W001',
+        ),
+    ]
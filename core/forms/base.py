@@ -35,3 +35,22 @@ class RichTextTextarea(forms.Textarea):
             default_attrs.update(attrs)
 
         super().__init__(attrs=default_attrs)
+
+
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    """Бірнеше файл қабылдайтын өріс: `cleaned_data` — жүктелген файлдар тізімі."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('widget', MultipleFileInput())
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        clean_file = super().clean
+        if isinstance(data, (list, tuple)) and data:
+            return [clean_file(item, initial) for item in data]
+
+        return [clean_file(data, initial)]
@@ -0,0 +1,46 @@
+# Generated by Django 6.0.5 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIRateLimit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.SlugField(max_length=64, unique=True, verbose_name='Name')),
+                ('requests', models.FloatField(default=0, verbose_name='Available requests')),
+                ('tokens', models.FloatField(default=0, verbose_name='Available tokens')),
+                ('refilled_at', models.DateTimeField(verbose_name='Refilled at')),
+            ],
+            options={
+                'verbose_name': 'AI rate limit',
+                'verbose_name_plural': 'AI rate limits',
+            },
+        ),
+        migrations.CreateModel(
+            name='AIRequestTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('limiter', models.SlugField(max_length=64, verbose_name='Limiter')),
+                ('key', models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Key')),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('running', 'Running')], default='waiting', max_length=16, verbose_name='Status')),
+                ('tokens', models.PositiveIntegerField(default=0, verbose_name='Estimated tokens')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('expires_at', models.DateTimeField(verbose_name='Expires at')),
+            ],
+            options={
+                'verbose_name': 'AI request ticket',
+                'verbose_name_plural': 'AI request tickets',
+                'ordering': ('pk',),
+                'indexes': [models.Index(fields=['limiter', 'status'], name='ai_ticket_queue_idx')],
+            },
+        ),
+    ]
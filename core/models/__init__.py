@@ -1,3 +1,4 @@
 from .base import BaseModel, TimeStampedModel, ActiveModel
+from .ai_limiter import AIRateLimit, AIRequestTicket
 
-__all__ = ['BaseModel', 'TimeStampedModel', 'ActiveModel']
+__all__ = ['BaseModel', 'TimeStampedModel', 'ActiveModel', 'AIRateLimit', 'AIRequestTicket']
@@ -0,0 +1,42 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+# -------------- AIRateLimit --------------
+class AIRateLimit(models.Model):
+    name = models.SlugField(_('Name'), max_length=64, unique=True)
+    requests = models.FloatField(_('Available requests'), default=0)
+    tokens = models.FloatField(_('Available tokens'), default=0)
+    refilled_at = models.DateTimeField(_('Refilled at'))
+
+    class Meta:
+        verbose_name = _('AI rate limit')
+        verbose_name_plural = _('AI rate limits')
+
+    def __str__(self):
+        return self.name
+
+
+# -------------- AIRequestTicket --------------
+class AIRequestTicket(models.Model):
+    class Status(models.TextChoices):
+        WAITING = 'waiting', _('Waiting')
+        RUNNING = 'running', _('Running')
+
+    limiter = models.SlugField(_('Limiter'), max_length=64)
+    key = models.CharField(_('Key'), max_length=64, blank=True, db_index=True)
+    status = models.CharField(_('Status'), choices=Status.choices, max_length=16, default=Status.WAITING)
+    tokens = models.PositiveIntegerField(_('Estimated tokens'), default=0)
+    created_at = models.DateTimeField(_('Created at'), auto_now_add=True)
+    expires_at = models.DateTimeField(_('Expires at'))
+
+    class Meta:
+        verbose_name = _('AI request ticket')
+        verbose_name_plural = _('AI request tickets')
+        ordering = ('pk',)
+        indexes = [
+            models.Index(fields=['limiter', 'status'], name='ai_ticket_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.limiter}#{self.pk}'
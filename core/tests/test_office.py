@@ -0,0 +1,31 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from core import checks
+from core.utils import office
+
+
+class ConverterPoolTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(office, '_uno_available', return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        office._uno_warning_logged = False
+
+    @override_settings(OFFICE_CONVERTER_POOL_SIZE=2)
+    def test_missing_uno_is_logged_once_and_reported_by_check(self):
+        with self.assertLogs('core.utils.office', 'WARNING') as logs:
+            self.assertIsNone(office.get_converter_pool())
+            self.assertIsNone(office.get_converter_pool())
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(office.converter_backend(), 'soffice')
+        self.assertEqual([message.id for message in checks.check_office_converter(None)], ['core.W001'])
+
+    @override_settings(OFFICE_CONVERTER_POOL_SIZE=0)
+    def test_disabled_pool_is_not_reported(self):
+        with self.assertNoLogs('core.utils.office', 'WARNING'):
+            self.assertIsNone(office.get_converter_pool())
+
+        self.assertEqual(checks.check_office_converter(None), [])
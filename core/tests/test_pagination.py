@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+from django.db.models import F, Value
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import AIRequestTicket
+from core.utils.pagination import keyset_page, offset_page
+
+
+class PaginationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        tickets = AIRequestTicket.objects.bulk_create(
+            AIRequestTicket(limiter='test', expires_at=now) for _index in range(11)
+        )
+        # Бір уақыттағы жолдар (`created_at` тең) реттің соңғы бағаны — `id` арқылы ажыратылады.
+        for index, ticket in enumerate(tickets):
+            AIRequestTicket.objects.filter(pk=ticket.pk).update(created_at=now - timedelta(minutes=index // 3))
+
+    def queryset(self):
+        return AIRequestTicket.objects.order_by('-created_at', 'id')
+
+    def expected(self):
+        return list(self.queryset().values_list('pk', flat=True))
+
+
+class KeysetPageTests(PaginationTestCase):
+    def test_forward_and_back_visit_every_row_once(self):
+        pages = [keyset_page(self.queryset(), page_size=4)]
+        while pages[-1].has_next:
+            pages.append(keyset_page(self.queryset(), cursor=pages[-1].next_cursor, page_size=4))
+
+        self.assertEqual([ticket.pk for page in pages for ticket in page], self.expected())
+        self.assertEqual([page.first_number for page in pages], [1, 5, 9])
+        self.assertFalse(pages[0].has_previous)
+
+        previous = keyset_page(self.queryset(), cursor=pages[-1].previous_cursor, page_size=4)
+        self.assertEqual([ticket.pk for ticket in previous], [ticket.pk for ticket in pages[1]])
+        self.assertEqual(previous.start_index, 4)
+
+    def test_cursor_from_other_filters_starts_over(self):
+        first = keyset_page(self.queryset(), page_size=4, state='a')
+
+        page = keyset_page(self.queryset(), cursor=first.next_cursor, page_size=4, state='b')
+
+        self.assertEqual(page.start_index, 0)
+        self.assertEqual([ticket.pk for ticket in page], self.expected()[:4])
+
+    def test_tampered_cursor_starts_over(self):
+        page = keyset_page(self.queryset(), cursor='not-a-cursor', page_size=4)
+
+        self.assertEqual([ticket.pk for ticket in page], self.expected()[:4])
+
+    def test_annotation_ordering_is_rejected(self):
+        queryset = AIRequestTicket.objects.annotate(rank=Value(1.0) * F('tokens')).order_by('-rank', 'id')
+
+        with self.assertRaises(ValueError):
+            keyset_page(queryset, page_size=4)
+
+
+class OffsetPageTests(PaginationTestCase):
+    def test_pages_stop_at_max_rows(self):
+        pages = [offset_page(self.queryset(), page_size=4, max_rows=6)]
+        while pages[-1].has_next:
+            pages.append(offset_page(self.queryset(), cursor=pages[-1].next_cursor, page_size=4, max_rows=6))
+
+        self.assertEqual([ticket.pk for page in pages for ticket in page], self.expected()[:6])
+
+        previous = offset_page(self.queryset(), cursor=pages[-1].previous_cursor, page_size=4, max_rows=6)
+        self.assertEqual([ticket.pk for ticket in previous], self.expected()[:4])
+
+    def test_keyset_cursor_is_not_an_offset_cursor(self):
+        keyset = keyset_page(self.queryset(), page_size=4)
+
+        page = offset_page(self.queryset(), cursor=keyset.next_cursor, page_size=4, max_rows=100)
+
+        self.assertEqual(page.start_index, 0)
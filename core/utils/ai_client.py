@@ -0,0 +1,285 @@
+import base64
+import hashlib
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import anthropic
+from django.conf import settings
+
+from core.utils.ai_limiter import LEASE_RENEW_INTERVAL, acquire_ai_slot, release_ai_slot, renew_ai_slot
+from core.utils.pdf import count_pages
+
+
+class AIReplayError(Exception):
+    pass
+
+
+# Құжат бетінің input токендері (мәтін + бет суреті), шамамен; нақты шығын жауаптан кейін есепке алынады.
+PDF_TOKENS_PER_PAGE = 3000
+CHARS_PER_TOKEN = 4
+
+
+_replay_scope = ''
+
+
+def set_replay_scope(name):
+    """Fixture-лерді ішкі қалтаға бөледі (мысалы, бенчмарктегі әр файл үшін) — барлық ағындарға ортақ."""
+    global _replay_scope
+    _replay_scope = name
+
+
+def _without_document_data(value):
+    if isinstance(value, dict):
+        if value.get('type') == 'base64':
+            return {key: item for key, item in value.items() if key != 'data'}
+        return {key: _without_document_data(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [_without_document_data(item) for item in value]
+
+    return value
+
+
+def request_fingerprint(request):
+    """Replay fixture-інің кілті: модель, промпт, схема. Құжат байттары кірмейді — soffice-тің PDF-і әр
+    конвертацияда сәл өзгеше (уақыт белгілері), сондықтан құжатты `set_replay_scope` ажыратады."""
+    stable = json.dumps(_without_document_data(request), sort_keys=True, default=str)
+    return hashlib.sha256(stable.encode('utf-8')).hexdigest()
+
+
+def _fixture_dir():
+    return Path(settings.AI_REPLAY_DIR) / _replay_scope
+
+
+def _iter_documents(value):
+    if isinstance(value, dict):
+        if value.get('type') == 'base64' and value.get('media_type') == 'application/pdf':
+            yield value.get('data', '')
+        for item in value.values():
+            yield from _iter_documents(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_documents(item)
+
+
+def estimate_request_tokens(request):
+    """Сұраудың input + output токендерінің алдын ала бағасы — rate limiter шелегінен алынатын сома."""
+    text = json.dumps(_without_document_data(request), default=str)
+    tokens = len(text) // CHARS_PER_TOKEN
+
+    for data in _iter_documents(request):
+        try:
+            tokens += count_pages(base64.standard_b64decode(data)) * PDF_TOKENS_PER_PAGE
+        except Exception:
+            # Оқылмайтын PDF-ті API-дің өзі қабылдамайды; бағаға өлшемі жеткілікті.
+            tokens += len(data) // CHARS_PER_TOKEN
+
+    # Output-тың нақты көлемі белгісіз; толығымен max_tokens алу кезекті бекер тоқтатар еді.
+    return tokens + request.get('max_tokens', 0) // 8
+
+
+# -------------- AnthropicBackend --------------
+class AnthropicBackend:
+    # Шын API-ға баратын сұраулар ортақ rate limiter арқылы өтеді.
+    rate_limited = True
+
+    def __init__(self):
+        # SDK-ның ішкі қайталаулары limiter-ді айналып өтер еді — қайталауды шақырушы жаңа орынмен жасайды.
+        self.client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY, max_retries=0)
+
+    def stream(self, **request):
+        return self.client.messages.stream(**request)
+
+
+# -------------- RecordingBackend --------------
+class _RecordingStream:
+    def __init__(self, stream, path):
+        self.stream = stream
+        self.path = path
+        self.first_event = 0.0
+        self.chunks = []
+
+    def __enter__(self):
+        self.started_at = time.monotonic()
+        self.inner = self.stream.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self.stream.__exit__(*exc_info)
+
+    def __iter__(self):
+        last = None
+        for event in self.inner:
+            now = time.monotonic()
+            if last is None:
+                self.first_event = round(now - self.started_at, 4)
+                last = now
+
+            if event.type == 'text':
+                self.chunks.append([round(now - last, 4), event.text])
+                last = now
+
+            yield event
+
+    def get_final_message(self):
+        message = self.inner.get_final_message()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({
+            'model': message.model,
+            'stop_reason': message.stop_reason,
+            'first_event': self.first_event,
+            'chunks': self.chunks,
+            'usage': message.usage.model_dump() if message.usage else {},
+        }, ensure_ascii=False), encoding='utf-8')
+        return message
+
+
+class RecordingBackend(AnthropicBackend):
+    """Шын API-ға жүгініп, ағынды (кідірістерімен) `AI_REPLAY_DIR`-ге fixture ретінде жазады."""
+
+    def stream(self, **request):
+        path = _fixture_dir() / f'{request_fingerprint(request)}.json'
+        return _RecordingStream(super().stream(**request), path)
+
+
+# -------------- ReplayBackend --------------
+class _ReplayStream:
+    def __init__(self, fixture, speed):
+        self.fixture = fixture
+        self.speed = speed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def _wait(self, delay):
+        if self.speed:
+            time.sleep(delay / self.speed)
+
+    def __iter__(self):
+        # Алғашқы оқиғаға дейінгі кідіріс — prefill (prompt cache әсері осында көрінеді).
+        self._wait(self.fixture.get('first_event', 0))
+        yield SimpleNamespace(type='message_start')
+
+        for delay, text in self.fixture['chunks']:
+            self._wait(delay)
+            yield SimpleNamespace(type='text', text=text)
+
+    def get_final_message(self):
+        text = ''.join(text for _delay, text in self.fixture['chunks'])
+        usage = self.fixture.get('usage') or {}
+        return SimpleNamespace(
+            model=self.fixture.get('model', ''),
+            stop_reason=self.fixture.get('stop_reason', 'end_turn'),
+            content=[SimpleNamespace(type='text', text=text)],
+            usage=SimpleNamespace(**{
+                'input_tokens': 0, 'output_tokens': 0,
+                'cache_creation_input_tokens': 0, 'cache_read_input_tokens': 0,
+                **usage,
+            }),
+        )
+
+
+class ReplayBackend:
+    """API кілті мен желісіз: `AI_REPLAY_DIR`-дегі жазылған ағындарды нақты кідірістерімен қайталайды.
+
+    Fixture сұрау кілті бойынша ізделеді; табылмаса және қалтада жалғыз fixture болса, сол қолданылады
+    (бенчмаркте бір жауапты әр файлға беру үшін). `AI_REPLAY_SPEED` — 1 нақты уақыт, 0 кідіріссіз.
+    """
+
+    rate_limited = False
+
+    def stream(self, **request):
+        directory = _fixture_dir()
+        path = directory / f'{request_fingerprint(request)}.json'
+
+        if not path.exists():
+            fixtures = sorted(directory.glob('*.json'))
+            if len(fixtures) != 1:
+                raise AIReplayError(f'No recorded response for this request in {directory}')
+            path = fixtures[0]
+
+        return _ReplayStream(json.loads(path.read_text(encoding='utf-8')), settings.AI_REPLAY_SPEED)
+
+
+# -------------- RateLimitedClient --------------
+class _RateLimitedStream:
+    def __init__(self, backend, request):
+        self.backend = backend
+        self.request = request
+        self.used_tokens = None
+
+    def __enter__(self):
+        self.ticket = acquire_ai_slot(estimate_request_tokens(self.request))
+        try:
+            self.manager = self.backend.stream(**self.request)
+            self.stream = self.manager.__enter__()
+        except BaseException as error:
+            release_ai_slot(self.ticket, retry_after=_retry_after(error))
+            raise
+
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            return self.manager.__exit__(exc_type, exc, tb)
+        finally:
+            release_ai_slot(self.ticket, used_tokens=self.used_tokens, retry_after=_retry_after(exc))
+
+    def __iter__(self):
+        renewed_at = time.monotonic()
+        for event in self.stream:
+            if time.monotonic() - renewed_at >= LEASE_RENEW_INTERVAL:
+                renew_ai_slot(self.ticket)
+                renewed_at = time.monotonic()
+            yield event
+
+    def get_final_message(self):
+        message = self.stream.get_final_message()
+        usage = message.usage
+        if usage is not None:
+            self.used_tokens = (
+                usage.input_tokens + usage.output_tokens + (getattr(usage, 'cache_creation_input_tokens', 0) or 0)
+            )
+        return message
+
+
+def _retry_after(error):
+    if not isinstance(error, anthropic.RateLimitError):
+        return None
+
+    try:
+        return float(error.response.headers.get('retry-after', 0)) or settings.AI_LIMITER_POLL_INTERVAL
+    except (TypeError, ValueError):
+        return settings.AI_LIMITER_POLL_INTERVAL
+
+
+class RateLimitedClient:
+    """Әр `stream` алдымен ортақ (Postgres) limiter-ден орын алады, біткенде нақты токен шығынымен босатады."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def stream(self, **request):
+        return _RateLimitedStream(self.backend, request)
+
+
+BACKENDS = {
+    'anthropic': AnthropicBackend,
+    'record': RecordingBackend,
+    'replay': ReplayBackend,
+}
+
+
+def get_ai_client():
+    """`AI_CLIENT_BACKEND` бойынша клиент: `stream(**request)` — `client.messages.stream`-пен бірдей интерфейс.
+    Шын API-ға баратын backend `RateLimitedClient`-ке оралады."""
+    backend = BACKENDS[settings.AI_CLIENT_BACKEND]()
+    if backend.rate_limited:
+        return RateLimitedClient(backend)
+
+    return backend
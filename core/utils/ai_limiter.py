@@ -0,0 +1,182 @@
+import time
+from contextvars import ContextVar
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from core.models import AIRateLimit, AIRequestTicket
+
+DEFAULT_LIMITER = 'anthropic'
+# Күтіп тұрған тикет әр сұраудан кейін осынша уақытқа ұзартылады; процесс өлсе, кезектен өзі түседі.
+WAITING_TICKET_TTL = 60
+MAX_POLL_INTERVAL = 10
+# Ұзақ stream кезінде RUNNING тикеттің lease-і осы аралықпен ұзартылады (`renew_ai_slot`).
+LEASE_RENEW_INTERVAL = 60
+
+_request_key = ContextVar('ai_request_key', default='')
+
+
+class AILimiterTimeout(Exception):
+    pass
+
+
+@contextmanager
+def ai_request_key(key):
+    """Осы блоктағы AI сұрауларының тикеттерін `key`-мен белгілейді (мысалы, импорт ID-і) — UI кезектегі
+    орнын сол кілт бойынша көрсетеді."""
+    token = _request_key.set(key)
+    try:
+        yield
+    finally:
+        _request_key.reset(token)
+
+
+def _per_second():
+    return settings.AI_RATE_LIMIT_REQUESTS_PER_MINUTE / 60, settings.AI_RATE_LIMIT_TOKENS_PER_MINUTE / 60
+
+
+def _locked_bucket(limiter, now):
+    bucket, _created = AIRateLimit.objects.select_for_update().get_or_create(name=limiter, defaults={
+        'requests': settings.AI_RATE_LIMIT_REQUESTS_PER_MINUTE,
+        'tokens': settings.AI_RATE_LIMIT_TOKENS_PER_MINUTE,
+        'refilled_at': now,
+    })
+
+    # 429-дан кейін `refilled_at` болашаққа қойылады — ол уақытқа дейін шелек толмайды.
+    if now > bucket.refilled_at:
+        requests_rate, tokens_rate = _per_second()
+        elapsed = (now - bucket.refilled_at).total_seconds()
+        bucket.requests = min(settings.AI_RATE_LIMIT_REQUESTS_PER_MINUTE, bucket.requests + elapsed * requests_rate)
+        bucket.tokens = min(settings.AI_RATE_LIMIT_TOKENS_PER_MINUTE, bucket.tokens + elapsed * tokens_rate)
+        bucket.refilled_at = now
+
+    return bucket
+
+
+def _refill_wait(bucket, tokens):
+    requests_rate, tokens_rate = _per_second()
+    return max((1 - bucket.requests) / requests_rate, (tokens - bucket.tokens) / tokens_rate, 0)
+
+
+def _try_acquire(ticket):
+    """Тикет кезектің басында тұрса, бос орын және шелекте жеткілікті сұрау/токен болса, оны іске қосады.
+    `(granted, position, wait)` қайтарады."""
+    now = timezone.now()
+    queue = AIRequestTicket.objects.filter(limiter=ticket.limiter)
+
+    with transaction.atomic():
+        # Шелек жолының құлпы бір limiter-дің барлық шешімін процестер арасында ретке келтіреді.
+        bucket = _locked_bucket(ticket.limiter, now)
+        queue.filter(expires_at__lt=now).exclude(pk=ticket.pk).delete()
+
+        position = queue.filter(status=AIRequestTicket.Status.WAITING, pk__lt=ticket.pk).count() + 1
+        running = queue.filter(status=AIRequestTicket.Status.RUNNING).count()
+        wait = _refill_wait(bucket, ticket.tokens)
+        granted = position == 1 and running < settings.AI_MAX_CONCURRENT_REQUESTS and not wait
+
+        if granted:
+            bucket.requests -= 1
+            bucket.tokens -= ticket.tokens
+            ticket.status = AIRequestTicket.Status.RUNNING
+            ticket.expires_at = now + timedelta(seconds=settings.AI_LIMITER_LEASE_TIMEOUT)
+        else:
+            ticket.expires_at = now + timedelta(seconds=WAITING_TICKET_TTL)
+
+        bucket.save(update_fields=['requests', 'tokens', 'refilled_at'])
+        # Тикет ұзақ кідірістен кейін өшіріліп кеткен болса, `save` оны сол ID-мен (сол орынға) қайта жазады.
+        ticket.save()
+
+    return granted, position, wait
+
+
+def acquire_ai_slot(tokens, *, limiter=DEFAULT_LIMITER, on_wait=None):
+    """AI сұрауына орын алады: бір уақыттағы сұраулар саны `AI_MAX_CONCURRENT_REQUESTS`-тан, ал минуттағы
+    сұраулар мен токендер `AI_RATE_LIMIT_*`-тан аспайды. Орын кезек ретімен (FIFO) беріледі.
+
+    `on_wait(position)` күту кезінде шақырылады. Тикетті қайтарады — оны `release_ai_slot`-қа беру керек.
+    """
+    tokens = min(int(tokens), settings.AI_RATE_LIMIT_TOKENS_PER_MINUTE)
+    ticket = AIRequestTicket.objects.create(
+        limiter=limiter, key=_request_key.get()[:64], tokens=tokens,
+        expires_at=timezone.now() + timedelta(seconds=WAITING_TICKET_TTL),
+    )
+    deadline = time.monotonic() + settings.AI_LIMITER_MAX_WAIT
+    last_position = None
+
+    try:
+        while True:
+            granted, position, wait = _try_acquire(ticket)
+            if granted:
+                return ticket
+
+            if on_wait is not None and position != last_position:
+                on_wait(position)
+            last_position = position
+
+            if time.monotonic() >= deadline:
+                raise AILimiterTimeout(f'No AI slot within {settings.AI_LIMITER_MAX_WAIT} s (position {position})')
+
+            time.sleep(min(max(wait, settings.AI_LIMITER_POLL_INTERVAL), MAX_POLL_INTERVAL))
+    except BaseException:
+        AIRequestTicket.objects.filter(pk=ticket.pk).delete()
+        raise
+
+
+def renew_ai_slot(ticket):
+    """Орын алған тикеттің lease-ін `AI_LIMITER_LEASE_TIMEOUT`-қа ұзартады — сұрау әлі жүріп жатқанда оның
+    орнын басқа процесс "өлген" деп алып қоймауы үшін."""
+    expires_at = timezone.now() + timedelta(seconds=settings.AI_LIMITER_LEASE_TIMEOUT)
+    try:
+        running = AIRequestTicket.objects.filter(pk=ticket.pk, status=AIRequestTicket.Status.RUNNING)
+        running.update(expires_at=expires_at)
+    except DatabaseError:
+        # Ұзарту сәтсіз болса, stream үзілмейді — келесі аралықта қайта тырысады.
+        pass
+
+
+def release_ai_slot(ticket, *, used_tokens=None, retry_after=None):
+    """Орынды босатады. `used_tokens` — нақты шығын: болжамнан айырмасы шелектен алынады (немесе қайтарылады).
+    `retry_after` (429 жауабы) шелекті барлық процестер үшін сонша секундқа тоқтатады."""
+    now = timezone.now()
+
+    try:
+        with transaction.atomic():
+            if used_tokens is not None or retry_after is not None:
+                bucket = _locked_bucket(ticket.limiter, now)
+                if used_tokens is not None:
+                    bucket.tokens -= used_tokens - ticket.tokens
+
+                if retry_after is not None:
+                    bucket.requests = min(bucket.requests, 0)
+                    bucket.tokens = min(bucket.tokens, 0)
+                    bucket.refilled_at = max(bucket.refilled_at, now + timedelta(seconds=retry_after))
+
+                bucket.save(update_fields=['requests', 'tokens', 'refilled_at'])
+
+            AIRequestTicket.objects.filter(pk=ticket.pk).delete()
+    except DatabaseError:
+        # Босату сәтсіз болса да, сұраудың нәтижесі жоғалмауы керек — тикет lease біткенде өзі өшеді.
+        pass
+
+
+def ai_queue_positions(keys, *, limiter=DEFAULT_LIMITER):
+    """`{key: орын}` — кілттің кезекте тұрған ең алдыңғы тикетінің орны (1 — келесі). Орын алған немесе
+    кезекте жоқ кілттер нәтижеге кірмейді."""
+    keys = set(keys)
+    positions = {}
+    now = timezone.now()
+    waiting = (
+        AIRequestTicket.objects
+        .filter(limiter=limiter, status=AIRequestTicket.Status.WAITING, expires_at__gte=now)
+        .order_by('pk')
+        .values_list('key', flat=True)
+    )
+
+    for position, key in enumerate(waiting, start=1):
+        if key in keys and key not in positions:
+            positions[key] = position
+
+    return positions
@@ -0,0 +1,10 @@
+import json
+import zlib
+
+
+def compress_json(data):
+    return zlib.compress(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 6)
+
+
+def decompress_json(blob):
+    return json.loads(zlib.decompress(bytes(blob)).decode('utf-8'))
@@ -29,11 +29,15 @@ def user_avatar_upload_path(instance, filename):
     )
 
 
-def ckeditor_image_upload_path(filename, file_hash):
-    extension = Path(filename).suffix
-
+def ckeditor_image_upload_path(file_hash, extension):
     return f'core/ckeditor/{file_hash}{extension}'
 
 
-def question_import_image_path(batch_id, index, extension):
-    return f'core/questions/imports/{batch_id}/{index}{extension}'
+def question_image_path(file_hash, extension):
+    return f'core/questions/images/{file_hash[:2]}/{file_hash}{extension}'
+
+
+def question_import_source_upload_path(instance, filename):
+    extension = Path(filename).suffix.lower()
+
+    return f'core/questions/imports/{instance.import_id}/source{extension}'
@@ -0,0 +1,136 @@
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from core.utils.office import OfficeConversionError, convert_document
+
+logger = logging.getLogger(__name__)
+
+VECTOR_CONTENT_TYPES = {
+    'image/x-emf': '.emf', 'image/emf': '.emf',
+    'image/x-wmf': '.wmf', 'image/wmf': '.wmf',
+}
+
+
+class ImageProcessingError(Exception):
+    pass
+
+
+@dataclass
+class ProcessedImage:
+    webp: bytes
+    width: int
+    height: int
+
+
+def _vector_suffix(blob, content_type):
+    if content_type in VECTOR_CONTENT_TYPES:
+        return VECTOR_CONTENT_TYPES[content_type]
+
+    if blob[40:44] == b' EMF':
+        return '.emf'
+
+    if blob[:4] == b'\xd7\xcd\xc6\x9a':
+        return '.wmf'
+
+    return None
+
+
+def _open_image(blob, content_type, allow_vector):
+    suffix = _vector_suffix(blob, content_type)
+    if suffix and not allow_vector:
+        raise ImageProcessingError(f'{suffix} images are converted only by the import worker')
+
+    if suffix:
+        # Pillow EMF/WMF-ті тек Windows-та сала алады — LibreOffice арқылы PNG-ге айналдырамыз.
+        try:
+            blob = convert_document(blob, source_suffix=suffix, target='png')
+        except OfficeConversionError as error:
+            raise ImageProcessingError(str(error)) from error
+
+    try:
+        image = Image.open(io.BytesIO(blob))
+        image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as error:
+        raise ImageProcessingError(str(error)) from error
+
+    return image
+
+
+def _is_graphic(image):
+    # Түсі аз суреттер (сызба, график, формула) PNG/lossless WebP-те әрі кіші, әрі анық шығады.
+    return image.getcolors(maxcolors=256) is not None
+
+
+def _encode(image, image_format, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def process_image(blob, content_type='', *, allow_vector=True):
+    """Суретті вебке дайындайды: EMF/WMF/TIFF/CMYK → RGB(A), ұзын қыры `IMAGE_MAX_DIMENSION`-нан аспайды,
+    EXIF/ICC метадеректері алынып тасталады. Тек WebP қайтарады — оны барлық қолдау көрсетілетін браузер
+    ашады, ал ешкім сұрамайтын PNG/JPEG көшірмесі сақтауды екі еселейтін еді.
+
+    Анимациялы суреттер үшін `None` қайтарады — олар өзгертусіз сақталуы керек. EMF/WMF LibreOffice пулын
+    қажет етеді, сондықтан веб-процестерде (`allow_vector=False`) `ImageProcessingError` көтереді.
+    """
+    image = _open_image(blob, content_type, allow_vector)
+
+    if getattr(image, 'is_animated', False):
+        return None
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('P', 'PA', 'LA') or 'transparency' in image.info:
+        image = image.convert('RGBA')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGB')
+
+    if image.mode == 'RGBA' and image.getextrema()[3][0] == 255:
+        image = image.convert('RGB')
+
+    max_dimension = settings.IMAGE_MAX_DIMENSION
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+    graphic = _is_graphic(image)
+    webp = _encode(image, 'WEBP', quality=settings.IMAGE_WEBP_QUALITY, lossless=graphic, method=4)
+    return ProcessedImage(webp=webp, width=image.width, height=image.height)
+
+
+def process_images(images):
+    """`[(blob, content_type), ...]` тізімін thread pool-да өңдейді (Pillow кодтау кезінде GIL-ды босатады).
+    Оқылмаған немесе анимациялы суреттің орнында `None` — шақырушы түпнұсқаны сақтайды."""
+    def process(image):
+        blob, content_type = image
+        try:
+            return process_image(blob, content_type)
+        except ImageProcessingError:
+            logger.warning('Could not process %s image, keeping the original', content_type or 'unknown', exc_info=True)
+            return None
+
+    if len(images) <= 1:
+        return [process(image) for image in images]
+
+    with ThreadPoolExecutor(max_workers=settings.IMAGE_PROCESSING_WORKERS) as executor:
+        return list(executor.map(process, images))
+
+
+def save_image_file(path, content):
+    saved_path = default_storage.save(path, ContentFile(content))
+    if saved_path != path:
+        # Бірдей мазмұнды файлды басқа процесс қатар жазып үлгерді — артық көшірмені өшіреміз.
+        default_storage.delete(saved_path)
+
+    return path
+
+
+def save_processed_image(base_path, processed):
+    """`<base_path>.webp` файлын жазып, жолын қайтарады."""
+    return save_image_file(f'{base_path}.webp', processed.webp)
@@ -0,0 +1,56 @@
+import json
+
+
+class JsonArrayItemStream:
+    """`{"<key>": [{...}, {...}]}` түріндегі JSON-ды бөлік-бөлігімен қабылдап, массивтің әр элементін
+    жабушы `}` келген сәтте-ақ parse етіп қайтарады (толық жауапты күтпей)."""
+
+    def __init__(self, key):
+        self.key = key
+        self.text = ''
+        self.position = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.string_start = None
+        self.last_string = None
+        self.array_depth = None
+        self.item_start = None
+
+    def feed(self, chunk):
+        self.text += chunk
+        items = []
+
+        for index in range(self.position, len(self.text)):
+            char = self.text[index]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        self.last_string = self.text[self.string_start + 1:index]
+                continue
+
+            if char == '"':
+                self.in_string = True
+                self.string_start = index
+            elif char in '{[':
+                if char == '[' and self.depth == 1 and self.last_string == self.key:
+                    self.array_depth = 2
+                elif char == '{' and self.array_depth is not None and self.depth == self.array_depth:
+                    self.item_start = index
+                self.depth += 1
+            elif char in '}]':
+                self.depth -= 1
+                if char == '}' and self.item_start is not None and self.depth == self.array_depth:
+                    items.append(json.loads(self.text[self.item_start:index + 1]))
+                    self.item_start = None
+                elif char == ']' and self.array_depth is not None and self.depth == 1:
+                    self.array_depth = None
+
+        self.position = len(self.text)
+        return items
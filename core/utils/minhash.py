@@ -0,0 +1,65 @@
+import hashlib
+import random
+
+from core.utils.text import normalize_html_text
+
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_SIZE = 5
+
+# Жолақ 4 жолдан: ұқсастығы ~0.5-тен жоғары жұптар кемінде бір себетте кездеседі, ал нақты шешімді
+# сигнатуралардың ұқсастығы (Jaccard бағасы) береді.
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 31) - 1
+_random = random.Random(20240611)
+_PERMUTATIONS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _index in range(NUM_PERMUTATIONS)]
+
+
+def _shingle_hashes(text):
+    if len(text) <= SHINGLE_SIZE:
+        shingles = {text}
+    else:
+        shingles = {text[index:index + SHINGLE_SIZE] for index in range(len(text) - SHINGLE_SIZE + 1)}
+
+    return [
+        int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for shingle in shingles
+    ]
+
+
+def minhash_signature(text):
+    """`NUM_PERMUTATIONS` 31-биттік мәннен тұратын MinHash сигнатурасы; бос мәтін үшін бос тізім."""
+    if not text:
+        return []
+
+    hashes = _shingle_hashes(text)
+    return [min((a * value + b) % _PRIME for value in hashes) & _MAX_HASH for a, b in _PERMUTATIONS]
+
+
+def lsh_buckets(signature):
+    """Әр жолаққа бір себет кілті (signed 64-бит) — бір себетке түскен сұрақтар ғана салыстырылады."""
+    if len(signature) != NUM_PERMUTATIONS:
+        return []
+
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        key = f'{band}:' + ','.join(map(str, rows))
+        buckets.append(int.from_bytes(hashlib.blake2b(key.encode('ascii'), digest_size=8).digest(), 'big', signed=True))
+
+    return buckets
+
+
+def html_signature(*parts):
+    """HTML бөліктерінің (сұрақ мәтіні, нұсқалар, ...) ортақ `(minhash, lsh_buckets)` жұбы."""
+    signature = minhash_signature(' '.join(filter(None, (normalize_html_text(part) for part in parts))))
+    return signature, lsh_buckets(signature)
+
+
+def signature_similarity(first, second):
+    """Екі сигнатура бойынша Jaccard ұқсастығының бағасы (0..1)."""
+    if not first or len(first) != len(second):
+        return 0.0
+
+    return sum(a == b for a, b in zip(first, second)) / len(first)
@@ -0,0 +1,311 @@
+import atexit
+import functools
+import logging
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FILTERS = {
+    'pdf': 'writer_pdf_Export',
+    'png': 'draw_png_Export',
+}
+
+
+class OfficeConversionError(Exception):
+    pass
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def convert_with_soffice(blob, *, source_suffix='.docx', target='pdf', timeout=120):
+    """Бір реттік `soffice --convert-to` — пул өшірулі немесе `uno` модулі жоқ кезде қолданылады."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source_path = Path(tmpdir) / f'source{source_suffix}'
+        source_path.write_bytes(blob)
+
+        profile_dir = Path(tmpdir) / 'lo_profile'
+        try:
+            subprocess.run(
+                [
+                    'soffice', '--headless', '--norestore',
+                    f'-env:UserInstallation=file://{profile_dir}',
+                    '--convert-to', target, '--outdir', tmpdir, str(source_path),
+                ],
+                check=True, capture_output=True, timeout=timeout,
+            )
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as error:
+            raise OfficeConversionError(str(error)) from error
+
+        target_path = source_path.with_suffix(f'.{target}')
+        if not target_path.exists():
+            raise OfficeConversionError(f'soffice produced no {target} output')
+
+        return target_path.read_bytes()
+
+
+# -------------- OfficeProcess --------------
+class OfficeProcess:
+    """Тұрақты профилі бар, UNO сокеті арқылы басқарылатын бір headless LibreOffice процесі."""
+
+    def __init__(self, startup_timeout=60):
+        self.startup_timeout = startup_timeout
+        self.profile_dir = Path(tempfile.mkdtemp(prefix='oiq-soffice-'))
+        self.process = None
+        self.desktop = None
+        self.conversions = 0
+
+    def start(self):
+        import uno
+
+        port = _free_port()
+        self.process = subprocess.Popen(
+            [
+                'soffice', '--headless', '--invisible', '--nologo', '--norestore', '--nodefault',
+                f'-env:UserInstallation=file://{self.profile_dir}',
+                f'--accept=socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext',
+            ],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            'com.sun.star.bridge.UnoUrlResolver', local_context,
+        )
+
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                context = resolver.resolve(
+                    f'uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext',
+                )
+                break
+            except Exception:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.process.kill()
+                    self.stop()
+                    raise OfficeConversionError('soffice did not start')
+                time.sleep(0.25)
+
+        self.desktop = context.ServiceManager.createInstanceWithContext('com.sun.star.frame.Desktop', context)
+        self.conversions = 0
+
+    def is_healthy(self):
+        if self.process is None or self.process.poll() is not None or self.desktop is None:
+            return False
+
+        try:
+            self.desktop.getComponents()
+        except Exception:
+            return False
+
+        return True
+
+    def convert(self, blob, source_suffix, target):
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def properties(**values):
+            result = []
+            for name, value in values.items():
+                prop = PropertyValue()
+                prop.Name = name
+                prop.Value = value
+                result.append(prop)
+            return tuple(result)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source_path = Path(tmpdir) / f'source{source_suffix}'
+            target_path = Path(tmpdir) / f'target.{target}'
+            source_path.write_bytes(blob)
+
+            document = self.desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(str(source_path)), '_blank', 0, properties(Hidden=True, ReadOnly=True),
+            )
+            if document is None:
+                raise OfficeConversionError('soffice could not open the document')
+
+            try:
+                document.storeToURL(
+                    uno.systemPathToFileUrl(str(target_path)), properties(FilterName=EXPORT_FILTERS[target]),
+                )
+            finally:
+                document.close(True)
+
+            self.conversions += 1
+            return target_path.read_bytes()
+
+    def stop(self):
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                pass
+            self.desktop = None
+
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+    def close(self):
+        self.stop()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+# -------------- OfficeConverterPool --------------
+class OfficeConverterPool:
+    """Бірнеше import қатар жүргенде ортақ қолданылатын LibreOffice процестер пулы.
+
+    Әр процесс профилін бір рет құрады (cold start бір рет төленеді), берер алдында health check
+    өтеді, `timeout`-тан асқан конвертацияда өлтіріліп қайта қосылады, `max_conversions`-тан кейін
+    жадты босату үшін ауыстырылады.
+    """
+
+    def __init__(self, size, max_conversions, timeout):
+        self.size = size
+        self.max_conversions = max_conversions
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.created = 0
+
+    def _acquire(self):
+        with self.lock:
+            if self.idle.empty() and self.created < self.size:
+                self.created += 1
+                return OfficeProcess()
+
+        return self.idle.get()
+
+    def _release(self, office):
+        self.idle.put(office)
+
+    def _ensure_ready(self, office):
+        if office.process is not None and office.conversions >= self.max_conversions:
+            office.stop()
+
+        if not office.is_healthy():
+            office.stop()
+            office.start()
+
+    def convert(self, blob, *, source_suffix='.docx', target='pdf'):
+        office = self._acquire()
+
+        try:
+            self._ensure_ready(office)
+
+            outcome = {}
+
+            def run():
+                try:
+                    outcome['result'] = office.convert(blob, source_suffix, target)
+                except Exception as error:
+                    outcome['error'] = error
+
+            worker = threading.Thread(target=run, daemon=True)
+            worker.start()
+            worker.join(self.timeout)
+
+            if worker.is_alive():
+                logger.warning('soffice conversion timed out after %ss, restarting the process', self.timeout)
+                office.process.kill()
+                office.stop()
+                raise OfficeConversionError('soffice conversion timed out')
+
+            if 'error' in outcome:
+                office.stop()
+                raise OfficeConversionError(str(outcome['error'])) from outcome['error']
+
+            return outcome['result']
+        except OfficeConversionError:
+            raise
+        except Exception as error:
+            office.stop()
+            raise OfficeConversionError(str(error)) from error
+        finally:
+            self._release(office)
+
+    def shutdown(self):
+        while not self.idle.empty():
+            self.idle.get_nowait().close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_uno_warning_logged = False
+
+
+@functools.cache
+def _uno_available():
+    try:
+        import uno  # noqa: F401
+    except ImportError:
+        return False
+
+    return True
+
+
+def uno_missing():
+    """Пул қосулы (`OFFICE_CONVERTER_POOL_SIZE > 0`), бірақ `uno` модулі жоқ — әр құжат бір реттік soffice-пен
+    түрлендіріледі."""
+    return settings.OFFICE_CONVERTER_POOL_SIZE > 0 and not _uno_available()
+
+
+def converter_backend():
+    """Құжаттарды қазір не түрлендіреді: `pool` немесе бір реттік `soffice`."""
+    return 'pool' if settings.OFFICE_CONVERTER_POOL_SIZE > 0 and _uno_available() else 'soffice'
+
+
+def get_converter_pool():
+    global _pool, _uno_warning_logged
+
+    if settings.OFFICE_CONVERTER_POOL_SIZE <= 0:
+        return None
+
+    if not _uno_available():
+        if not _uno_warning_logged:
+            _uno_warning_logged = True
+            logger.warning(
+                'OFFICE_CONVERTER_POOL_SIZE=%s but the uno module is not importable; '
+                'falling back to a one-shot soffice process per document',
+                settings.OFFICE_CONVERTER_POOL_SIZE,
+            )
+        return None
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = OfficeConverterPool(
+                size=settings.OFFICE_CONVERTER_POOL_SIZE,
+                max_conversions=settings.OFFICE_CONVERTER_MAX_CONVERSIONS,
+                timeout=settings.OFFICE_CONVERTER_TIMEOUT,
+            )
+            atexit.register(_pool.shutdown)
+
+    return _pool
+
+
+def convert_document(blob, *, source_suffix='.docx', target='pdf'):
+    pool = get_converter_pool()
+
+    if pool is None:
+        return convert_with_soffice(
+            blob, source_suffix=source_suffix, target=target, timeout=settings.OFFICE_CONVERTER_TIMEOUT,
+        )
+
+    return pool.convert(blob, source_suffix=source_suffix, target=target)
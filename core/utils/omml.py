@@ -0,0 +1,145 @@
+from html import escape
+
+M_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/math}'
+
+SYMBOLS = {
+    '×': r'\times ', '÷': r'\div ', '·': r'\cdot ', '±': r'\pm ', '∓': r'\mp ',
+    '≤': r'\le ', '≥': r'\ge ', '≠': r'\neq ', '≈': r'\approx ', '≡': r'\equiv ',
+    '∞': r'\infty ', '∈': r'\in ', '∉': r'\notin ', '⊂': r'\subset ', '∪': r'\cup ', '∩': r'\cap ',
+    '→': r'\to ', '⇒': r'\Rightarrow ', '⇔': r'\Leftrightarrow ', '∠': r'\angle ', '°': r'^{\circ}',
+    '⊥': r'\perp ', '∥': r'\parallel ', '△': r'\triangle ', '∅': r'\emptyset ',
+    'α': r'\alpha ', 'β': r'\beta ', 'γ': r'\gamma ', 'δ': r'\delta ', 'ε': r'\varepsilon ',
+    'θ': r'\theta ', 'λ': r'\lambda ', 'μ': r'\mu ', 'π': r'\pi ', 'ρ': r'\rho ', 'σ': r'\sigma ',
+    'τ': r'\tau ', 'φ': r'\varphi ', 'ω': r'\omega ', 'Δ': r'\Delta ', 'Σ': r'\Sigma ', 'Ω': r'\Omega ',
+    '{': r'\{', '}': r'\}', '%': r'\%', '&': r'\&', '#': r'\#',
+}
+
+NARY = {'∑': r'\sum', '∏': r'\prod', '∫': r'\int', '∬': r'\iint', '∭': r'\iiint', '∮': r'\oint'}
+ACCENTS = {'̄': r'\bar', '̂': r'\hat', '̃': r'\tilde', '⃗': r'\vec', '̇': r'\dot'}
+FUNCTIONS = {'sin', 'cos', 'tan', 'tg', 'cot', 'ctg', 'log', 'ln', 'lg', 'exp', 'lim', 'max', 'min'}
+
+
+def _text(value):
+    return ''.join(SYMBOLS.get(char, char) for char in value)
+
+
+def _child(element, name):
+    return element.find(f'{M_NS}{name}')
+
+
+def _property(element, property_name, name, default=None):
+    properties = _child(element, property_name)
+    if properties is None:
+        return default
+
+    node = properties.find(f'{M_NS}{name}')
+    if node is None:
+        return default
+
+    return node.get(f'{M_NS}val', default)
+
+
+def _group(element):
+    return '{' + _children(element) + '}' if element is not None else '{}'
+
+
+def _children(element):
+    if element is None:
+        return ''
+
+    return ''.join(_convert(child) for child in element)
+
+
+def _convert(element):
+    tag = element.tag.replace(M_NS, '') if element.tag.startswith(M_NS) else None
+
+    if tag is None:
+        return ''
+
+    if tag == 'r':
+        return ''.join(_text(node.text or '') for node in element.iter(f'{M_NS}t'))
+
+    if tag == 'f':
+        return r'\frac' + _group(_child(element, 'num')) + _group(_child(element, 'den'))
+
+    if tag == 'sSup':
+        return _group(_child(element, 'e')) + '^' + _group(_child(element, 'sup'))
+
+    if tag == 'sSub':
+        return _group(_child(element, 'e')) + '_' + _group(_child(element, 'sub'))
+
+    if tag == 'sSubSup':
+        return (
+            _group(_child(element, 'e'))
+            + '_' + _group(_child(element, 'sub'))
+            + '^' + _group(_child(element, 'sup'))
+        )
+
+    if tag == 'rad':
+        degree = _children(_child(element, 'deg'))
+        root = r'\sqrt[' + degree + ']' if degree else r'\sqrt'
+        return root + _group(_child(element, 'e'))
+
+    if tag == 'd':
+        opening = _property(element, 'dPr', 'begChr', '(')
+        closing = _property(element, 'dPr', 'endChr', ')')
+        separator = _property(element, 'dPr', 'sepChr', ',')
+        inner = separator.join(_children(part) for part in element.findall(f'{M_NS}e'))
+        return r'\left' + (SYMBOLS.get(opening, opening) or '.') + inner + r'\right' + (SYMBOLS.get(closing, closing) or '.')
+
+    if tag == 'nary':
+        symbol = NARY.get(_property(element, 'naryPr', 'chr', '∫'), r'\int')
+        lower = _children(_child(element, 'sub'))
+        upper = _children(_child(element, 'sup'))
+        limits = ('_{' + lower + '}' if lower else '') + ('^{' + upper + '}' if upper else '')
+        return symbol + limits + _group(_child(element, 'e'))
+
+    if tag == 'func':
+        name = _children(_child(element, 'fName')).strip()
+        prefix = '\\' + name if name in FUNCTIONS else r'\operatorname{' + name + '}'
+        return prefix + _group(_child(element, 'e'))
+
+    if tag == 'acc':
+        accent = ACCENTS.get(_property(element, 'accPr', 'chr', '̂'), r'\hat')
+        return accent + _group(_child(element, 'e'))
+
+    if tag == 'bar':
+        command = r'\underline' if _property(element, 'barPr', 'pos', 'top') == 'bot' else r'\overline'
+        return command + _group(_child(element, 'e'))
+
+    if tag == 'limLow':
+        return _children(_child(element, 'e')) + '_' + _group(_child(element, 'lim'))
+
+    if tag == 'limUpp':
+        return _children(_child(element, 'e')) + '^' + _group(_child(element, 'lim'))
+
+    if tag == 'm':
+        rows = [
+            ' & '.join(_children(cell) for cell in row.findall(f'{M_NS}e'))
+            for row in element.findall(f'{M_NS}mr')
+        ]
+        return r'\begin{matrix}' + r' \\ '.join(rows) + r'\end{matrix}'
+
+    if tag == 'eqArr':
+        rows = [_children(row) for row in element.findall(f'{M_NS}e')]
+        return r'\begin{cases}' + r' \\ '.join(rows) + r'\end{cases}'
+
+    if tag.endswith('Pr'):
+        return ''
+
+    return _children(element)
+
+
+def omml_to_latex(element):
+    """Word-тың OMML (`m:oMath`/`m:oMathPara`) элементін LaTeX жолына айналдырады."""
+    return _children(element).strip()
+
+
+def omml_to_html(element):
+    """OMML формуласын CKEditor-дағы `math-tex` span форматына (inline `\\(…\\)`, блок `\\[…\\]`) айналдырады."""
+    latex = escape(omml_to_latex(element), quote=False)
+
+    if element.tag == f'{M_NS}oMathPara':
+        return f'<span class="math-tex">\\[{latex}\\]</span>'
+
+    return f'<span class="math-tex">\\({latex}\\)</span>'
@@ -0,0 +1,158 @@
+from dataclasses import dataclass
+
+from django.core import signing
+from django.db.models import Q
+
+CURSOR_SALT = 'core.utils.pagination.cursor'
+OFFSET_CURSOR_SALT = 'core.utils.pagination.offset'
+FORWARD = 'next'
+BACKWARD = 'previous'
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    start_index: int = 0
+    next_cursor: str = ''
+    previous_cursor: str = ''
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return bool(self.next_cursor)
+
+    @property
+    def has_previous(self):
+        return bool(self.previous_cursor)
+
+    @property
+    def first_number(self):
+        return self.start_index + 1
+
+    @property
+    def last_number(self):
+        return self.start_index + len(self.object_list)
+
+
+def _ordering(queryset):
+    ordering = []
+    for item in queryset.query.order_by:
+        name = item.removeprefix('-')
+        # Есептелген (мысалы, float rank) мән JSON арқылы өткен соң дәл салыстырылмайды — беттер жол
+        # өткізіп не қайталап жіберуі мүмкін. Ондай ретке `offset_page`.
+        if name in queryset.query.annotations:
+            raise ValueError(f'Keyset pagination needs stored columns, "{name}" is an annotation')
+        ordering.append((name, item.startswith('-')))
+
+    return ordering
+
+
+def _cursor_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _row_key(obj, ordering):
+    return [_cursor_value(getattr(obj, name)) for name, _descending in ordering]
+
+
+def _keyset_filter(ordering, key, forward):
+    # (a, b) < (x, y)  =>  a < x OR (a = x AND b < y); әр бағанның бағыты өз салыстыруын таңдайды.
+    condition = Q()
+    equal = Q()
+    for (name, descending), value in zip(ordering, key):
+        lookup = 'lt' if descending == forward else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+
+    return condition
+
+
+def _encode_cursor(direction, key, start_index, state):
+    return signing.dumps({'d': direction, 'k': key, 's': start_index, 'f': state}, salt=CURSOR_SALT, compress=True)
+
+
+def _decode_cursor(cursor, state, salt=CURSOR_SALT):
+    try:
+        payload = signing.loads(cursor, salt=salt)
+    except signing.BadSignature:
+        return None
+
+    # Басқа сүзгілермен жасалған курсор бұл тізімге жатпайды — бірінші беттен басталады.
+    if payload.get('f') != state:
+        return None
+
+    return payload
+
+
+def _first_page(queryset, ordering, page_size, state):
+    rows = list(queryset[:page_size + 1])
+    page = rows[:page_size]
+    next_cursor = _encode_cursor(FORWARD, _row_key(page[-1], ordering), len(page), state) if len(rows) > page_size else ''
+    return KeysetPage(page, 0, next_cursor, '')
+
+
+def keyset_page(queryset, *, cursor=None, page_size, state=''):
+    """`queryset`-тің `order_by`-ы бойынша (соңғы баған бірегей болуы керек) OFFSET-сіз бет.
+
+    Курсор — беттің шеткі жолының реттеу мәндері, бағыты, басынан бергі орны және `state` (сүзгілер күйі);
+    қол қойылған, сондықтан URL-де өзгертілмейді. COUNT жасалмайды: келесі бет бар-жоғын `page_size + 1`
+    жол көрсетеді.
+    """
+    ordering = _ordering(queryset)
+    payload = _decode_cursor(cursor, state) if cursor else None
+    if payload is None:
+        return _first_page(queryset, ordering, page_size, state)
+
+    forward = payload['d'] == FORWARD
+    filtered = queryset.filter(_keyset_filter(ordering, payload['k'], forward))
+
+    if forward:
+        rows = list(filtered[:page_size + 1])
+        page = rows[:page_size]
+        if not page:
+            return _first_page(queryset, ordering, page_size, state)
+
+        start_index = payload['s']
+        has_next = len(rows) > page_size
+        has_previous = True
+    else:
+        rows = list(filtered.reverse()[:page_size + 1])
+        # Алдында толық бет жоқ (жолдар өшірілген) — бірінші бет толығымен көрсетіледі.
+        if len(rows) <= page_size:
+            return _first_page(queryset, ordering, page_size, state)
+
+        page = rows[:page_size][::-1]
+        start_index = max(payload['s'] - len(page), 0)
+        has_next = True
+        has_previous = True
+
+    next_cursor = _encode_cursor(FORWARD, _row_key(page[-1], ordering), start_index + len(page), state) if has_next else ''
+    previous_cursor = _encode_cursor(BACKWARD, _row_key(page[0], ordering), start_index, state) if has_previous else ''
+    return KeysetPage(page, start_index, next_cursor, previous_cursor)
+
+
+def offset_page(queryset, *, cursor=None, page_size, state='', max_rows):
+    """Есептелген рет (іздеу рейтингі) үшін OFFSET беттері; тереңдігі `max_rows`-пен шектеледі. Курсоры
+    `keyset_page`-тікі сияқты қол қойылған және `state`-ке байланған."""
+    payload = _decode_cursor(cursor, state, OFFSET_CURSOR_SALT) if cursor else None
+    start_index = min(max(payload['o'], 0), max_rows) if payload else 0
+    if start_index >= max_rows:
+        start_index = 0
+
+    limit = min(page_size, max_rows - start_index)
+    rows = list(queryset[start_index:start_index + limit + 1])
+    page = rows[:limit]
+
+    has_next = len(rows) > limit and start_index + limit < max_rows
+    next_cursor = signing.dumps(
+        {'o': start_index + limit, 'f': state}, salt=OFFSET_CURSOR_SALT,
+    ) if has_next else ''
+    previous_cursor = signing.dumps(
+        {'o': max(start_index - page_size, 0), 'f': state}, salt=OFFSET_CURSOR_SALT,
+    ) if start_index else ''
+    return KeysetPage(page, start_index, next_cursor, previous_cursor)
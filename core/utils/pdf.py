@@ -0,0 +1,126 @@
+import io
+import logging
+import mimetypes
+
+logger = logging.getLogger(__name__)
+
+
+class PdfError(Exception):
+    pass
+
+
+def _open_reader(pdf_bytes):
+    from pypdf import PdfReader
+
+    return PdfReader(io.BytesIO(pdf_bytes))
+
+
+def _iter_drawn_images(content_owner, resources, seen_forms, path=()):
+    """Салынған (Do/inline) суреттердің `page.images` кілттері — content stream-дегі салыну ретімен.
+    Form XObject ішіндегі inline суреттің кілті жоқ, ол `None` болып беріледі."""
+    from pypdf.generic import ContentStream
+
+    contents = content_owner.get_contents() if hasattr(content_owner, 'get_contents') else content_owner
+    if contents is None:
+        return
+
+    if not isinstance(contents, ContentStream):
+        contents = ContentStream(contents, content_owner.pdf if hasattr(content_owner, 'pdf') else None)
+
+    xobjects = resources.get('/XObject', {}) if resources else {}
+    xobjects = xobjects.get_object() if hasattr(xobjects, 'get_object') else xobjects
+
+    inline_index = 0
+    for operands, operator in contents.operations:
+        if operator == b'INLINE IMAGE':
+            yield None if path else f'~{inline_index}~'
+            inline_index += 1
+            continue
+
+        if operator != b'Do' or not operands:
+            continue
+
+        name = operands[0]
+        xobject = xobjects.get(name)
+        if xobject is None:
+            continue
+
+        xobject = xobject.get_object()
+        subtype = xobject.get('/Subtype')
+        if subtype == '/Image':
+            yield (*path, name) if path else name
+        elif subtype == '/Form' and id(xobject) not in seen_forms:
+            seen_forms.add(id(xobject))
+            form_resources = xobject.get('/Resources')
+            yield from _iter_drawn_images(
+                xobject, form_resources.get_object() if form_resources else resources, seen_forms, (*path, name),
+            )
+
+
+def _iter_page_images(page):
+    resources = page.get('/Resources')
+    return _iter_drawn_images(page, resources.get_object() if resources else None, set())
+
+
+def count_images_per_page(pdf_bytes):
+    """Әр беттегі салынған (Do/inline) суреттер саны — бет ретімен, беттегі салыну ретімен."""
+    reader = _open_reader(pdf_bytes)
+    return [sum(1 for _key in _iter_page_images(page)) for page in reader.pages]
+
+
+def _read_image(page, key):
+    if key is None:
+        return None
+
+    try:
+        image = page.images[key]
+    except Exception:
+        # Бұзылған немесе pypdf ашпайтын сурет (сирек кодек) — нөмірлеу жылжымауы үшін орны бос қалады.
+        logger.warning('Could not decode PDF image %s', key, exc_info=True)
+        return None
+
+    content_type, _encoding = mimetypes.guess_type(image.name)
+    return {'blob': image.data, 'content_type': content_type or 'image/png'}
+
+
+def extract_images(pdf_bytes):
+    """Құжаттағы суреттер `count_images_per_page` ретімен (бет, содан соң беттегі салыну реті), яғни
+    оқу ретімен: `{'blob', 'content_type'}` немесе оқылмаған сурет үшін `None`. JPEG қайта кодталмайды."""
+    from pypdf.errors import PyPdfError
+
+    images = []
+    try:
+        for page in _open_reader(pdf_bytes).pages:
+            # Бір сурет (мысалы, колонтитулдағы логотип) бетте бірнеше рет салынса, бір рет ашылады.
+            decoded = {}
+            for key in _iter_page_images(page):
+                if key not in decoded:
+                    decoded[key] = _read_image(page, key)
+                images.append(decoded[key])
+    except PyPdfError as error:
+        raise PdfError(str(error)) from error
+
+    return images
+
+
+def is_pdf(data):
+    # Спецификация `%PDF-` тақырыбының алдында 1024 байтқа дейін қоқыс болуына рұқсат етеді.
+    return b'%PDF-' in data[:1024]
+
+
+def split_page_range(pdf_bytes, first_page, last_page):
+    """[first_page, last_page] (0-ден басталатын, екеуі де қоса) беттерін жеке PDF етіп қайтарады."""
+    from pypdf import PdfWriter
+
+    reader = _open_reader(pdf_bytes)
+    writer = PdfWriter()
+    for index in range(first_page, last_page + 1):
+        writer.add_page(reader.pages[index])
+
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def count_pages(pdf_bytes):
+    return len(_open_reader(pdf_bytes).pages)
@@ -1,8 +1,13 @@
-from html import escape
+import re
+import unicodedata
+from html import escape, unescape
 from html.parser import HTMLParser
 
 SKIP_TAGS = {'img', 'table', 'ul', 'ol'}
 BLOCK_TAGS = {'p', 'div', 'li', 'br', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+_NON_WORD_RE = re.compile(r'[^\w]+')
 
 
 class QuestionTextPreviewParser(HTMLParser):
@@ -79,3 +84,16 @@ def question_text_preview(html, max_length=50):
     parser.feed(html or '')
 
     return parser.get_html()
+
+
+def html_to_plain_text(html):
+    """Тегтерсіз, entity-лері ашылған, бос орындары біріктірілген мәтін (регистр сақталады)."""
+    text = unescape(_TAG_RE.sub(' ', html or ''))
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def normalize_html_text(html):
+    """HTML-ді салыстыруға арналған мәтінге айналдырады: `html_to_plain_text`-ке қоса регистр, тыныс белгілері
+    және Unicode нұсқаларының айырмашылықтары жойылады."""
+    text = unicodedata.normalize('NFKC', html_to_plain_text(html)).casefold()
+    return _NON_WORD_RE.sub(' ', text).strip()
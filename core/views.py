@@ -1,4 +1,5 @@
 import hashlib
+from pathlib import Path
 
 from PIL import Image, UnidentifiedImageError
 from django.contrib.auth.decorators import login_required
@@ -9,6 +10,7 @@ from django.views.decorators.csrf import csrf_protect
 from django.views.decorators.http import require_POST
 
 from core.utils.files import ckeditor_image_upload_path
+from core.utils.images import ImageProcessingError, process_image, save_image_file, save_processed_image
 
 MAX_UPLOAD_SIZE = 5 * 1024 * 1024
 
@@ -31,12 +33,24 @@ def ckeditor_image_upload(request):
         return JsonResponse({'error': {'message': _('Please upload a valid image file.')}}, status=400)
 
     upload.seek(0)
-    file_hash = hashlib.sha256(upload.read()).hexdigest()
-    upload.seek(0)
+    blob = upload.read()
+    file_hash = hashlib.sha256(blob).hexdigest()
+
+    path = ckeditor_image_upload_path(file_hash, '.webp')
+    if default_storage.exists(path):
+        return JsonResponse({'url': default_storage.url(path)})
 
-    path = ckeditor_image_upload_path(upload.name, file_hash)
+    try:
+        # EMF/WMF-ті тек импорт воркері айналдырады — веб-процесте soffice пулы іске қосылмауы керек.
+        processed = process_image(blob, upload.content_type, allow_vector=False)
+    except ImageProcessingError:
+        return JsonResponse({'error': {'message': _('Please upload a valid image file.')}}, status=400)
 
-    if not default_storage.exists(path):
-        default_storage.save(path, upload)
+    if processed is None:
+        path = ckeditor_image_upload_path(file_hash, Path(upload.name).suffix.lower())
+        if not default_storage.exists(path):
+            save_image_file(path, blob)
+    else:
+        path = save_processed_image(ckeditor_image_upload_path(file_hash, ''), processed)
 
     return JsonResponse({'url': default_storage.url(path)})
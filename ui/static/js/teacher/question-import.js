@@ -48,30 +48,47 @@ function setupBlockFormsetControls(block, options) {
     });
 }
 
+function setupQuestionBlock(block) {
+    setupBlockFormsetControls(block, {
+        containerSelector: "[data-options-container]",
+        addButtonSelector: "[data-add-option-button]",
+        emptyTemplateSelector: "[data-option-empty-form]",
+        totalFormsSelector: "input[name$='-options-TOTAL_FORMS']",
+        rowSelector: "[data-option-row]",
+        removeSelector: "[data-remove-option]",
+    });
+
+    setupBlockFormsetControls(block, {
+        containerSelector: "[data-pairs-container]",
+        addButtonSelector: "[data-add-pair-button]",
+        emptyTemplateSelector: "[data-pair-empty-form]",
+        totalFormsSelector: "input[name$='-pairs-TOTAL_FORMS']",
+        rowSelector: "[data-pair-row]",
+        removeSelector: "[data-remove-pair]",
+    });
+}
+
 document.addEventListener("DOMContentLoaded", function () {
-    document.querySelectorAll("[data-question-block]").forEach(function (block) {
-        setupBlockFormsetControls(block, {
-            containerSelector: "[data-options-container]",
-            addButtonSelector: "[data-add-option-button]",
-            emptyTemplateSelector: "[data-option-empty-form]",
-            totalFormsSelector: "input[name$='-options-TOTAL_FORMS']",
-            rowSelector: "[data-option-row]",
-            removeSelector: "[data-remove-option]",
-        });
+    document.querySelectorAll("[data-question-block]").forEach(setupQuestionBlock);
 
-        setupBlockFormsetControls(block, {
-            containerSelector: "[data-pairs-container]",
-            addButtonSelector: "[data-add-pair-button]",
-            emptyTemplateSelector: "[data-pair-empty-form]",
-            totalFormsSelector: "input[name$='-pairs-TOTAL_FORMS']",
-            rowSelector: "[data-pair-row]",
-            removeSelector: "[data-remove-pair]",
-        });
+    document.body.addEventListener("htmx:afterSwap", function (event) {
+        event.target.querySelectorAll("[data-question-block]").forEach(setupQuestionBlock);
+    });
+
+    document.body.addEventListener("htmx:oobAfterSwap", function (event) {
+        if (event.target.id === "import-unsupported-list") {
+            event.target.closest("[data-unsupported-block]").classList.remove("hidden");
+        }
     });
 
     const confirmForm = document.getElementById("import-review-form");
     if (confirmForm) {
-        confirmForm.addEventListener("submit", function () {
+        confirmForm.addEventListener("submit", function (event) {
+            if (document.querySelector("[data-question-form]") && !window.confirm(confirmForm.dataset.unsavedMessage)) {
+                event.preventDefault();
+                return;
+            }
+
             const submitButton = confirmForm.querySelector("button[type='submit']");
             if (submitButton) {
                 submitButton.disabled = true;